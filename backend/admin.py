@@ -1,8 +1,18 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
 from users.models import User
-from .models import Task, TaskTemplate, Document, Payment, Contract, Act, ContractTemplate, Signature, Transaction, Review
+from . import cache as task_cache
+from . import search
+from .authentication import invalidate_users
+from .token_blacklist import revoke_user_tokens
+from .admin_base import LargeTableAdmin
+from .models import Task, TaskTemplate, Document, Payment, Contract, Act, Signature, Transaction, Review, RatingSummary
+
+
+# Простая регистрация из users.admin заменяется расширенной
+admin.site.unregister(User)
 
 
 @admin.register(User)
@@ -31,24 +41,32 @@ class CustomUserAdmin(BaseUserAdmin):
     actions = ['activate_users', 'deactivate_users']
     
     def activate_users(self, request, queryset):
-        queryset.update(is_active=True)
-        self.message_user(request, f'Активировано пользователей: {queryset.count()}')
+        user_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(is_active=True)
+        # update() не вызывает сигналы - сбрасываем кэш аутентификации явно
+        invalidate_users(*user_ids)
+        self.message_user(request, f'Активировано пользователей: {updated}')
     activate_users.short_description = 'Активировать выбранных пользователей'
     
     def deactivate_users(self, request, queryset):
-        queryset.update(is_active=False)
-        self.message_user(request, f'Деактивировано пользователей: {queryset.count()}')
+        user_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(is_active=False)
+        # Отзыв токенов заодно сбрасывает кэш аутентификации
+        for user_id in user_ids:
+            revoke_user_tokens(user_id)
+        self.message_user(request, f'Деактивировано пользователей: {updated}')
     deactivate_users.short_description = 'Деактивировать выбранных пользователей'
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(LargeTableAdmin):
     """Расширенная админ-панель для заданий с модерацией"""
     list_display = ['title', 'employer', 'freelancer', 'amount', 'status_badge', 'created_at']
+    list_select_related = ['employer', 'freelancer']
     list_filter = ['status', 'created_at', 'updated_at']
-    search_fields = ['title', 'description', 'employer__email', 'freelancer__email']
+    # title/description ищутся через search_vector (см. get_search_results)
+    search_fields = ['=employer__email', '=freelancer__email']
     readonly_fields = ['created_at', 'updated_at']
-    date_hierarchy = 'created_at'
     
     fieldsets = (
         ('Основная информация', {
@@ -64,10 +82,16 @@ class TaskAdmin(admin.ModelAdmin):
     
     actions = ['approve_tasks', 'reject_tasks', 'mark_in_progress', 'mark_completed']
     
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= search.filter_tasks(queryset, search_term)
+        return results, may_have_duplicates
+    
     def status_badge(self, obj):
         colors = {
             'draft': 'gray',
-            'published': 'blue',
+            'new': 'blue',
             'in_progress': 'orange',
             'completed': 'green',
             'cancelled': 'red',
@@ -79,35 +103,49 @@ class TaskAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Статус'
     
+    def _update_tasks(self, queryset, **fields):
+        """
+        Массовое update() без сигналов: кэш заданий участников и маркетплейса
+        (backend.cache) сбрасывается явно, иначе списки устаревают до истечения TTL
+        """
+        participants = queryset.values_list('employer_id', 'freelancer_id')
+        user_ids = {user_id for pair in participants for user_id in pair if user_id}
+        updated = queryset.update(updated_at=timezone.now(), **fields)
+        if updated:
+            task_cache.bump_on_commit(
+                task_cache.MARKET_SCOPE, *(task_cache.user_scope(user_id) for user_id in user_ids)
+            )
+        return updated
+
     def approve_tasks(self, request, queryset):
-        queryset.filter(status='draft').update(status='published')
-        self.message_user(request, f'Одобрено заданий: {queryset.count()}')
+        updated = self._update_tasks(queryset.filter(status='draft'), status='new')
+        self.message_user(request, f'Одобрено заданий: {updated}')
     approve_tasks.short_description = 'Одобрить задания (опубликовать)'
     
     def reject_tasks(self, request, queryset):
-        queryset.update(status='cancelled')
-        self.message_user(request, f'Отклонено заданий: {queryset.count()}')
+        updated = self._update_tasks(queryset, status='cancelled')
+        self.message_user(request, f'Отклонено заданий: {updated}')
     reject_tasks.short_description = 'Отклонить задания'
     
     def mark_in_progress(self, request, queryset):
-        queryset.update(status='in_progress')
-        self.message_user(request, f'Переведено в работу: {queryset.count()}')
+        updated = self._update_tasks(queryset, status='in_progress')
+        self.message_user(request, f'Переведено в работу: {updated}')
     mark_in_progress.short_description = 'Перевести в работу'
     
     def mark_completed(self, request, queryset):
-        queryset.update(status='completed')
-        self.message_user(request, f'Завершено заданий: {queryset.count()}')
+        updated = self._update_tasks(queryset, status='completed')
+        self.message_user(request, f'Завершено заданий: {updated}')
     mark_completed.short_description = 'Завершить задания'
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(LargeTableAdmin):
     """Админ-панель для управления транзакциями и выплатами"""
     list_display = ['id', 'user', 'transaction_type_badge', 'amount', 'status_badge', 'created_at']
+    list_select_related = ['user']
     list_filter = ['transaction_type', 'status', 'created_at']
     search_fields = ['user__email', 'description']
     readonly_fields = ['created_at', 'processed_at']
-    date_hierarchy = 'created_at'
     
     fieldsets = (
         ('Информация о транзакции', {
@@ -147,15 +185,14 @@ class TransactionAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Статус'
     
     def approve_transactions(self, request, queryset):
-        from django.utils import timezone
-        queryset.filter(status='pending').update(status='completed', processed_at=timezone.now())
-        self.message_user(request, f'Одобрено транзакций: {queryset.count()}')
+        # complete() обновляет снимки балансов в той же транзакции БД
+        approved = queryset.complete()
+        self.message_user(request, f'Одобрено транзакций: {approved}')
     approve_transactions.short_description = 'Одобрить транзакции'
     
     def reject_transactions(self, request, queryset):
-        from django.utils import timezone
-        queryset.filter(status='pending').update(status='failed', processed_at=timezone.now())
-        self.message_user(request, f'Отклонено транзакций: {queryset.count()}')
+        rejected = queryset.filter(status='pending').update(status='failed', processed_at=timezone.now())
+        self.message_user(request, f'Отклонено транзакций: {rejected}')
     reject_transactions.short_description = 'Отклонить транзакции'
 
 
@@ -176,8 +213,9 @@ class DocumentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(LargeTableAdmin):
     list_display = ['task', 'freelancer', 'amount', 'status', 'created_at']
+    list_select_related = ['task', 'freelancer']
     list_filter = ['status', 'created_at']
     search_fields = ['task__title', 'freelancer__email']
     readonly_fields = ['created_at', 'processed_at']
@@ -199,22 +237,23 @@ class ActAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
-@admin.register(ContractTemplate)
-class ContractTemplateAdmin(admin.ModelAdmin):
-    list_display = ['name', 'created_at']
-    list_filter = ['created_at']
-    search_fields = ['name']
-
-
 @admin.register(Signature)
 class SignatureAdmin(admin.ModelAdmin):
-    list_display = ['user', 'document_type', 'created_at']
-    list_filter = ['document_type', 'created_at']
+    list_display = ['user', 'document_type', 'signed_at']
+    list_filter = ['document_type', 'signed_at']
+    search_fields = ['user__email']
+
 
-    @admin.register(Review)
+@admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ['task', 'employer', 'freelancer', 'rating', 'created_at']
     list_filter = ['rating', 'created_at']
     search_fields = ['task__title', 'employer__email', 'freelancer__email', 'comment']
     readonly_fields = ['created_at']
+
+
+@admin.register(RatingSummary)
+class RatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'count', 'average']
+    readonly_fields = ['count', 'total', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5']
     search_fields = ['user__email']
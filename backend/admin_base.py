@@ -0,0 +1,64 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+# Ниже этого числа строк COUNT(*) достаточно дешев и считается точно
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """
+    Оценка числа строк по статистике PostgreSQL без COUNT(*).
+    Для таблицы без фильтров берется pg_class.reltuples, для отфильтрованной
+    выборки - оценка планировщика из EXPLAIN. На других СУБД возвращает None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # -1 - таблица еще ни разу не анализировалась
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор списка админки: на больших выборках число строк берется из оценки"""
+    threshold = ESTIMATED_COUNT_THRESHOLD
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.threshold:
+            return super().count
+        return estimate
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Базовая админка для больших таблиц: оценочный счетчик страниц,
+    без второго COUNT(*) по всей таблице и без date_hierarchy
+    (он строит навигацию отдельным запросом по датам).
+    Связанные объекты из list_display подключайте через list_select_related.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    estimated_count_threshold = ESTIMATED_COUNT_THRESHOLD
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        paginator = super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+        paginator.threshold = self.estimated_count_threshold
+        return paginator
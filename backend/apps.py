@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class BackendConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'backend'
+    verbose_name = 'Задания и документы'
+
+    def ready(self):
+        from . import signals  # noqa: F401
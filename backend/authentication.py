@@ -0,0 +1,87 @@
+import pickle
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .token_blacklist import get_revoked_before, is_revoked
+
+
+# Пользователь по user_id из токена: сначала кэш процесса (несколько секунд),
+# затем общий кэш (Redis), и только потом таблица users. Записи сбрасываются
+# сигналом при сохранении пользователя и явно в массовых действиях админки
+# (invalidate_users). Кэш процесса в других воркерах не сбрасывается - он живет
+# AUTH_USER_LOCAL_TIMEOUT секунд, это и есть максимальная задержка деактивации.
+KEY_PREFIX = 'auth:user'
+
+# user_id -> (истекает, pickle пользователя); каждый запрос получает свою копию
+_local = {}
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def _local_timeout():
+    return getattr(settings, 'AUTH_USER_LOCAL_TIMEOUT', 5)
+
+
+def get_cached_user(user_id):
+    """Пользователь из кэша или None"""
+    entry = _local.get(user_id)
+    if entry is not None:
+        expires, payload = entry
+        if expires > time.monotonic():
+            return pickle.loads(payload)
+        _local.pop(user_id, None)
+
+    user = cache.get(_key(user_id))
+    if user is not None and _local_timeout():
+        _local[user_id] = (time.monotonic() + _local_timeout(), pickle.dumps(user))
+    return user
+
+
+def cache_user(user):
+    timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+    if timeout:
+        cache.set(_key(user.pk), user, timeout)
+
+
+def invalidate_users(*user_ids):
+    """Сбрасывает кэш пользователей (в Redis и в кэше текущего процесса)"""
+    cache.delete_many([_key(user_id) for user_id in user_ids])
+    for user_id in user_ids:
+        _local.pop(user_id, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication без запроса к users на каждый API-вызов"""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = get_cached_user(user_id) if user_id is not None else None
+        if user is None:
+            # Промах: обычный поиск в БД со всеми проверками
+            user = super().get_user(validated_token)
+            # "Выйти везде" (backend.token_blacklist) - отметка кэшируется вместе с пользователем
+            user.tokens_revoked_before = get_revoked_before(user.pk)
+            cache_user(user)
+        else:
+            self.check_user(user, validated_token)
+
+        if is_revoked(validated_token.get('iat', 0), getattr(user, 'tokens_revoked_before', None)):
+            raise AuthenticationFailed(_('Token is blacklisted'), code='token_not_valid')
+        return user
+
+    def check_user(self, user, validated_token):
+        """Те же проверки, что в JWTAuthentication.get_user"""
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
@@ -0,0 +1,134 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from .db_router import cache_timeout
+
+
+# Кэш ответов TaskViewSet.list/retrieve.
+# Ключи содержат номера версий областей видимости: при изменении задания
+# сигналы (backend.signals) увеличивают версии затронутых пользователей и
+# маркетплейса, и старые ключи просто перестают читаться (истекают по TTL).
+KEY_PREFIX = 'tasks'
+MARKET_SCOPE = 'market'
+STATS_KEYS = {'hit': f'{KEY_PREFIX}:stats:hit', 'miss': f'{KEY_PREFIX}:stats:miss'}
+
+
+def _version_key(scope):
+    return f'{KEY_PREFIX}:v:{scope}'
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def get_versions(scopes):
+    """Текущие версии областей одним обращением к кэшу"""
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Начальная версия - время, чтобы после вытеснения ключа
+            # версия не совпала со старыми закэшированными ответами
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*scopes):
+    """Инвалидирует области видимости"""
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_on_commit(*scopes):
+    """
+    Инвалидирует области после коммита текущей транзакции (вне транзакции - сразу).
+    Сброс до коммита позволил бы параллельному GET прочитать старые строки
+    и закэшировать их уже под новой версией.
+    """
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def _params_hash(request):
+    params = sorted(request.query_params.lists())
+    return hashlib.md5(repr(params).encode('utf-8')).hexdigest()
+
+
+def is_market_request(request):
+    user = request.user
+    return not user.is_employer and request.query_params.get('scope') == MARKET_SCOPE
+
+
+def list_key(request):
+    """Ключ списка: маркетплейс общий для всех исполнителей, остальное - на пользователя"""
+    if is_market_request(request):
+        scopes = [MARKET_SCOPE]
+        owner = MARKET_SCOPE
+    else:
+        owner = request.user.id
+        scopes = [user_scope(owner)]
+        if not request.user.is_employer:
+            scopes.append(MARKET_SCOPE)
+    versions = '.'.join(str(v) for v in get_versions(scopes))
+    return f'{KEY_PREFIX}:list:{owner}:{versions}:{_params_hash(request)}'
+
+
+def detail_key(request, pk):
+    scopes = [user_scope(request.user.id)]
+    if not request.user.is_employer:
+        scopes.append(MARKET_SCOPE)
+    versions = '.'.join(str(v) for v in get_versions(scopes))
+    return f'{KEY_PREFIX}:detail:{request.user.id}:{pk}:{versions}:{_params_hash(request)}'
+
+
+def validators_key(request, pk=None):
+    """Ключ ETag/Last-Modified (backend.conditional) - под теми же версиями, что и сам ответ"""
+    key = list_key(request) if pk is None else detail_key(request, pk)
+    return f'{key}:validators'
+
+
+def _count(event):
+    key = STATS_KEYS[event]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_stats():
+    """Счетчики попаданий и промахов"""
+    values = cache.get_many(STATS_KEYS.values())
+    return {event: values.get(key, 0) for event, key in STATS_KEYS.items()}
+
+
+class TaskCacheMixin:
+    """Кэширует ответы list/retrieve; инвалидация - через сигналы на Task, Contract и Act"""
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(list_key(request), super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        key = detail_key(request, kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        return self._cached(key, super().retrieve, request, *args, **kwargs)
+
+    def _cached(self, key, handler, request, *args, **kwargs):
+        data = cache.get(key)
+        if data is not None:
+            _count('hit')
+            return Response(data)
+        _count('miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            # Ответ с реплики мог быть собран до инвалидации - храним его недолго
+            cache.set(key, response.data, cache_timeout(getattr(settings, 'TASK_CACHE_TIMEOUT', 300)))
+        return response
@@ -0,0 +1,104 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .db_router import cache_timeout
+
+
+# Условные GET для list/retrieve. До сериализации выполняется один агрегатный
+# запрос (COUNT и MAX по полям времени) по тому же queryset, что отдаст
+# эндпоинт; из результата, пользователя и параметров запроса строится слабый
+# ETag. Совпал If-None-Match - сразу 304, без выборки строк и сериализации.
+#
+# COUNT ловит удаления, MAX - вставки и изменения. Поля связанных моделей,
+# у которых нет времени изменения (профиль пользователя, шаблон), в ETag не
+# входят: их правка станет видна со следующим изменением самой строки.
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified для list и retrieve.
+
+    conditional_fields - поля времени (можно через связи: 'task__updated_at'),
+    по которым считается MAX. Видимость строк должна определяться get_queryset:
+    объектные права до 304 не проверяются.
+    """
+    conditional_fields = ('updated_at',)
+    validators_cache_timeout = 300
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def should_probe(self, request):
+        """False - отдать ответ без ETag (проба стоила бы дороже самого ответа)"""
+        return True
+
+    def get_validators_cache_key(self, request):
+        """Ключ кэша для результата пробы; None - проба на каждый запрос"""
+        return None
+
+    def get_probe_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset.order_by()
+
+    def get_validators(self, request):
+        """(etag, last_modified) или (None, None), если отдавать нечего"""
+        key = self.get_validators_cache_key(request)
+        validators = cache.get(key) if key else None
+        if validators is None:
+            validators = self.probe(request)
+            if key:
+                cache.set(key, validators, cache_timeout(self.validators_cache_timeout))
+        return validators
+
+    def probe(self, request):
+        """Один агрегатный запрос: COUNT и MAX по conditional_fields"""
+        maxima = {f'max_{index}': Max(field) for index, field in enumerate(self.conditional_fields)}
+        result = self.get_probe_queryset().aggregate(count=Count('pk'), **maxima)
+        if self.action == 'retrieve' and not result['count']:
+            # 404 отдаст обычный обработчик
+            return None, None
+
+        stamps = [result[key] for key in maxima]
+        params = sorted(request.query_params.lists())
+        source = repr((
+            self.__class__.__name__, self.action, request.user.pk, params,
+            result['count'], [stamp.isoformat() if stamp else None for stamp in stamps],
+        ))
+        etag = 'W/"%s"' % hashlib.md5(source.encode('utf-8')).hexdigest()
+        last_modified = max((stamp for stamp in stamps if stamp), default=None)
+        return etag, last_modified
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        if not self.should_probe(request):
+            return handler(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        # If-Modified-Since учитываем только для одного объекта: удаление строки
+        # из списка не сдвигает MAX, его видит только ETag (через COUNT)
+        # Last-Modified передается с точностью до секунды
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp if self.action == 'retrieve' else None
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Браузер хранит ответ, но каждый раз перепроверяет его по ETag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,119 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+# Чтение с реплик. Роутер сам реплику не выбирает: база для чтения задается
+# на время запроса (ReplicaReadMixin) или блока кода (read_from), все
+# остальное - Celery, админка, запись - идет в основную базу. После успешного
+# изменяющего запроса пользователь DATABASE_REPLICA_PIN_SECONDS секунд читает
+# с основной базы, чтобы увидеть свою запись, даже если реплика отстает.
+PRIMARY = 'default'
+PIN_KEY_PREFIX = 'db:pin'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5)
+
+
+def pin_to_primary(user_id):
+    cache.set(f'{PIN_KEY_PREFIX}:{user_id}', 1, pin_seconds())
+
+
+def is_pinned(user_id):
+    return cache.get(f'{PIN_KEY_PREFIX}:{user_id}') is not None
+
+
+def read_alias():
+    """База для чтения, заданная на время текущего запроса или блока read_from (или None)"""
+    return _read_alias.get()
+
+
+def reading_from_replica():
+    return _read_alias.get() not in (None, PRIMARY)
+
+
+def cache_timeout(timeout):
+    """
+    TTL для кэша ответа: прочитанное с реплики может отставать, поэтому
+    кэшируется не дольше окна закрепления за основной базой
+    """
+    return min(timeout, pin_seconds()) if reading_from_replica() else timeout
+
+
+@contextmanager
+def read_from(alias):
+    """Чтение внутри блока идет в alias (например, отчеты в Celery)"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Запись и миграции - только основная база; чтение - по _read_alias"""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None:
+            # Связанные объекты читаются из той же базы, что и сам объект
+            return None
+        if connections[PRIMARY].in_atomic_block:
+            # Внутри транзакции читаем то, что в ней же записали
+            return PRIMARY
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется в основную базу
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
+
+
+class ReplicaReadMixin:
+    """Безопасные запросы ViewSet читают с реплики, остальные - с основной базы"""
+
+    def get_read_alias(self, request):
+        replicas = get_replicas()
+        if not replicas or request.method not in SAFE_METHODS:
+            return PRIMARY
+        if request.user.is_authenticated and is_pinned(request.user.pk):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # После аутентификации: закрепление зависит от пользователя
+        self._read_alias_token = _read_alias.set(self.get_read_alias(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (get_replicas() and request.method not in SAFE_METHODS
+                and response.status_code < 400 and request.user.is_authenticated):
+            pin_to_primary(request.user.pk)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            token = getattr(self, '_read_alias_token', None)
+            if token is not None:
+                _read_alias.reset(token)
+                self._read_alias_token = None
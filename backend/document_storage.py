@@ -0,0 +1,107 @@
+import hashlib
+import json
+
+from django.core.files.base import ContentFile
+
+from .pdf_generator import PDFGenerator
+
+
+# Хранилище сформированных PDF с адресацией по содержимому:
+# файл лежит по пути <upload_to>/<aa>/<sha256>.pdf, одинаковые байты хранятся один раз.
+# Документ дополнительно хранит хэш входных данных - если он не изменился,
+# reportlab не вызывается вовсе.
+CHUNK_SIZE = 64 * 1024
+
+
+def input_hash(kind, inputs):
+    """SHA-256 входных данных документа с учетом версии макета"""
+    payload = json.dumps(
+        [kind, PDFGenerator.LAYOUT_VERSION, inputs],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def content_name(field_file, digest):
+    prefix = field_file.field.upload_to.rstrip('/')
+    return f'{prefix}/{digest[:2]}/{digest}.pdf'
+
+
+def file_sha256(field_file, name=None):
+    """SHA-256 сохраненного файла, читается блоками"""
+    digest = hashlib.sha256()
+    with field_file.storage.open(name or field_file.name, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_pdf(field_file, data):
+    """Сохраняет байты по их SHA-256 (если такого файла еще нет) и возвращает хэш"""
+    digest = hashlib.sha256(data).hexdigest()
+    name = content_name(field_file, digest)
+    storage = field_file.storage
+    if storage.exists(name) and file_sha256(field_file, name) != digest:
+        # Файл под этим именем поврежден - перезаписываем
+        storage.delete(name)
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(data))
+    field_file.name = name
+    return digest
+
+
+def is_intact(document):
+    """Совпадает ли файл в хранилище с хэшем, записанным при формировании"""
+    if not document.pdf_file or not document.pdf_sha256:
+        return False
+    try:
+        return file_sha256(document.pdf_file) == document.pdf_sha256
+    except FileNotFoundError:
+        return False
+
+
+def has_content_name(document):
+    """
+    Лежит ли файл документа по адресу своего pdf_sha256. Файл не читается:
+    store_pdf проверяет байты при записи, поэтому проверка годится для
+    пакетных операций; одиночная подпись по-прежнему хэширует файл (is_intact).
+    """
+    if not document.pdf_file or not document.pdf_sha256:
+        return False
+    return document.pdf_file.name == content_name(document.pdf_file, document.pdf_sha256)
+
+
+def render_pdf(document, kind, inputs, render):
+    """
+    Формирует PDF документа через render(document), если входные данные изменились.
+    Возвращает True, если вызывался reportlab; при совпадении хэша входных данных
+    с этим или другим документом того же типа используется готовый файл.
+    Поля pdf_file, pdf_sha256 и input_hash заполняются, но не сохраняются.
+    """
+    key = input_hash(kind, inputs)
+    if document.input_hash == key and is_intact(document):
+        return False
+
+    cached = (
+        type(document).objects.filter(input_hash=key).exclude(pdf_sha256='')
+        .exclude(pk=document.pk).values_list('pdf_file', 'pdf_sha256').first()
+    )
+    if cached and document.pdf_file.storage.exists(cached[0]):
+        document.pdf_file.name, document.pdf_sha256 = cached
+        rendered = False
+    else:
+        pdf = render(document)
+        document.pdf_sha256 = store_pdf(document.pdf_file, pdf.read())
+        rendered = True
+    document.input_hash = key
+    return rendered
+
+
+def render_contract(contract):
+    generator = PDFGenerator()
+    return render_pdf(contract, 'contract', generator.contract_inputs(contract), generator.generate_contract)
+
+
+def render_act(act):
+    generator = PDFGenerator()
+    return render_pdf(act, 'act', generator.act_inputs(act), generator.generate_act)
@@ -0,0 +1,130 @@
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, parse_etags
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def document_etag(field_file):
+    """Сильный ETag файла: меняется при любой перезаписи (имя, размер, время изменения)"""
+    storage = field_file.storage
+    try:
+        modified = storage.get_modified_time(field_file.name).timestamp()
+    except NotImplementedError:
+        modified = ''
+    raw = f'{field_file.name}:{field_file.size}:{modified}'
+    return '"%s"' % hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def _parse_range(header, size):
+    """
+    Разбирает заголовок Range. Поддерживается один диапазон байтов:
+    возвращает (start, end) включительно, None - отдать файл целиком,
+    False - диапазон невыполним (416).
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Несколько диапазонов или другие единицы - отдаем весь файл, это допустимо
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N - последние N байт
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class _FileRange:
+    """Файловый объект, ограниченный диапазоном байтов; FileResponse читает его блоками"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def serve_document(request, field_file, filename=None, digest=None):
+    """
+    Отдает файл документа после проверки прав во вьюхе.
+    При DOCUMENT_ACCEL_PREFIX передачу выполняет nginx (X-Accel-Redirect),
+    иначе файл стримится через FileResponse с поддержкой Range.
+    digest - SHA-256 содержимого (если известен), используется как ETag.
+    """
+    if not field_file:
+        raise Http404('Файл не сформирован')
+    try:
+        size = field_file.size
+    except FileNotFoundError:
+        raise Http404('Файл не найден')
+
+    etag = f'"{digest}"' if digest else document_etag(field_file)
+    filename = filename or field_file.name.rsplit('/', 1)[-1]
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    accel_prefix = getattr(settings, 'DOCUMENT_ACCEL_PREFIX', '')
+    if accel_prefix:
+        # nginx сам обработает Range и отдаст байты из internal-локации
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(field_file.name)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header:
+        if_range = request.META.get('HTTP_IF_RANGE')
+        # If-Range с устаревшим ETag - файл изменился, отдаем целиком
+        if not if_range or etag in parse_etags(if_range):
+            byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = field_file.storage.open(field_file.name, 'rb')
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(
+            _FileRange(file, start, end - start + 1), status=206,
+            as_attachment=True, filename=filename
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(file, as_attachment=True, filename=filename)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,228 @@
+import csv
+import re
+import zipfile
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+from .db_router import read_alias
+from .pagination import keyset_filter
+
+
+# Выгрузки для бухгалтерии: строки читаются из БД порциями по EXPORT_CHUNK_SIZE
+# (keyset по (created_at, id), без серверного курсора) и сразу пишутся в ответ,
+# поэтому память не зависит от объема выгрузки - в том числе при
+# DB_CONNECTION_MODE=pooler, где серверные курсоры отключены.
+EXPORT_CHUNK_SIZE = 2000
+
+PAYMENT_COLUMNS = [
+    ('id', 'ID'),
+    ('created_at', 'Создана'),
+    ('processed_at', 'Проведена'),
+    ('task_id', 'ID задания'),
+    ('task__title', 'Задание'),
+    ('freelancer__email', 'Исполнитель'),
+    ('amount', 'Сумма'),
+    ('status', 'Статус'),
+    ('failure_reason', 'Причина отказа'),
+]
+
+TRANSACTION_COLUMNS = [
+    ('id', 'ID'),
+    ('created_at', 'Создана'),
+    ('processed_at', 'Проведена'),
+    ('user__email', 'Пользователь'),
+    ('transaction_type', 'Тип'),
+    ('amount', 'Сумма'),
+    ('status', 'Статус'),
+    ('task_id', 'ID задания'),
+    ('description', 'Описание'),
+]
+
+
+def filter_period(queryset, date_from=None, date_to=None, status=None):
+    """Период по created_at (включительно) и статус; границы - начало суток, чтобы работал индекс"""
+    if date_from:
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+    if date_to:
+        next_day = datetime.combine(date_to + timedelta(days=1), time.min)
+        queryset = queryset.filter(created_at__lt=timezone.make_aware(next_day))
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def iter_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """Кортежи значений без создания моделей; choices заменяются подписями"""
+    fields = [field for field, _ in columns]
+    model = queryset.model
+    displays = {}
+    for index, field in enumerate(fields):
+        if '__' not in field:
+            choices = model._meta.get_field(field).choices
+            if choices:
+                displays[index] = dict(choices)
+
+    # created_at и id дописываются в конец строки - по ним следующая порция
+    queryset = queryset.order_by('created_at', 'id').values_list(*fields, 'created_at', 'id')
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        for row in chunk:
+            row = list(row[:-2])
+            for index, labels in displays.items():
+                row[index] = labels.get(row[index], row[index])
+            yield row
+        if len(chunk) < chunk_size:
+            break
+        chunk = list(keyset_filter(queryset, chunk[-1][-2:], '>')[:chunk_size])
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+class _Echo:
+    """Буфер для csv.writer: возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+# Начало ячейки, которое Excel/LibreOffice считают формулой (CSV injection)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    """Текст ячейки CSV; строки, похожие на формулу, экранируются апострофом. Числа не меняются"""
+    text = _text(value)
+    if isinstance(value, str) and text.startswith(_FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def stream_csv(rows, headers):
+    # BOM и ';' - чтобы Excel с русской локалью сразу открыл файл по колонкам
+    writer = csv.writer(_Echo(), delimiter=';')
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+class _ZipStream:
+    """Неперематываемый поток для zipfile: накапливает записанные байты до выдачи в ответ"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+_XLSX_STATIC = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+# Символы, недопустимые в XML 1.0
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_XML_INVALID.sub('', _text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return ('<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>').encode('utf-8')
+
+
+def stream_xlsx(rows, headers, flush_every=EXPORT_CHUNK_SIZE):
+    """
+    Минимальный XLSX (один лист, строки inlineStr) без сторонних библиотек.
+    Лист пишется в zip построчно, сжатые байты отдаются каждые flush_every строк.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(headers))
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row))
+                if count % flush_every == 0:
+                    yield stream.pop()
+            sheet.write(b'</sheetData></worksheet>')
+    yield stream.pop()
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export_response(queryset, columns, file_format, filename):
+    """StreamingHttpResponse с выгрузкой queryset в CSV или XLSX"""
+    stream, content_type = FORMATS[file_format]
+    headers = [title for _, title in columns]
+    # Ответ читается после выхода из dispatch, когда база запроса (ReplicaReadMixin)
+    # уже сброшена - закрепляем ее за queryset, иначе выгрузка пойдет в основную базу
+    alias = read_alias()
+    if alias is not None:
+        queryset = queryset.using(alias)
+    response = StreamingHttpResponse(stream(iter_rows(queryset, columns), headers), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
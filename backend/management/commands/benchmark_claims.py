@@ -0,0 +1,86 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend.models import Task
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест Task.claim: N исполнителей одновременно разбирают M заданий. '
+        'Выводит claims/sec и число двойных назначений (должно быть 0). Нужен PostgreSQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--claimers', type=int, default=16)
+        parser.add_argument('--tasks', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            raise CommandError('SQLite не поддерживает конкурентную запись - запустите на PostgreSQL')
+
+        claimers, task_count = options['claimers'], options['tasks']
+        prefix = f'bench-claims-{int(time.time())}'
+        employer = User.objects.create_user(username=f'{prefix}-employer', is_employer=True)
+        freelancers = [
+            User.objects.create_user(username=f'{prefix}-freelancer-{i}', is_freelancer=True)
+            for i in range(claimers)
+        ]
+        Task.objects.bulk_create(
+            Task(employer=employer, title=f'{prefix} {i}', description='benchmark',
+                 amount=100, status='new')
+            for i in range(task_count)
+        )
+        task_ids = list(Task.objects.filter(employer=employer).values_list('id', flat=True))
+
+        wins = Counter()
+        attempts = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(claimers)
+
+        def claim_all(freelancer):
+            order = task_ids[:]
+            random.shuffle(order)
+            won, tried = [], 0
+            barrier.wait()
+            try:
+                for task_id in order:
+                    tried += 1
+                    if Task(pk=task_id).claim(freelancer):
+                        won.append(task_id)
+            finally:
+                connection.close()
+            with lock:
+                wins.update(won)
+                attempts[freelancer.pk] = tried
+
+        threads = [threading.Thread(target=claim_all, args=(f,)) for f in freelancers]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        double_assigned = sum(1 for count in wins.values() if count > 1)
+        unclaimed = task_count - len(wins)
+        assigned_in_db = Task.objects.filter(employer=employer, status='in_progress').count()
+
+        self.stdout.write(f'Исполнителей: {claimers}, заданий: {task_count}')
+        self.stdout.write(f'Попыток: {sum(attempts.values())} за {elapsed:.2f} с '
+                          f'({sum(attempts.values()) / elapsed:.0f} попыток/с)')
+        self.stdout.write(f'Успешных назначений: {sum(wins.values())} '
+                          f'({sum(wins.values()) / elapsed:.0f} claims/s)')
+        self.stdout.write(f'Двойных назначений: {double_assigned}, не назначено: {unclaimed}, '
+                          f'в работе по БД: {assigned_in_db}')
+
+        Task.objects.filter(employer=employer).delete()
+        User.objects.filter(username__startswith=prefix).delete()
+
+        if double_assigned or unclaimed:
+            raise CommandError('Обнаружены двойные назначения или потерянные задания')
@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Задержка API-запроса с новым соединением к БД на каждый запрос (CONN_MAX_AGE=0) '
+        'и с переиспользуемым соединением (CONN_MAX_AGE из аргумента, с проверкой). '
+        'Жизненный цикл соединений - как у WSGI-обработчика. Нужен PostgreSQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--url', default='/api/payments/')
+        parser.add_argument('--max-age', type=int, default=60)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            raise CommandError('У SQLite нет затрат на подключение - запустите на PostgreSQL')
+
+        user = User.objects.create_user(username=f'bench-conn-{int(time.time())}', is_employer=True)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        saved = {conn.alias: conn.settings_dict['CONN_MAX_AGE'] for conn in connections.all()}
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                results = [
+                    ('новое соединение', self.run(client, options, 0)),
+                    (f'CONN_MAX_AGE={options["max_age"]}', self.run(client, options, options['max_age'])),
+                ]
+        finally:
+            for conn in connections.all():
+                conn.close()
+                conn.settings_dict['CONN_MAX_AGE'] = saved[conn.alias]
+            user.delete()
+
+        self.stdout.write(f'{options["url"]}, запросов: {options["requests"]}')
+        for name, (timings, connects) in results:
+            quantiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f'{name:>20}: p50 {quantiles[49]:.2f} мс, p95 {quantiles[94]:.2f} мс, '
+                f'подключений: {connects}'
+            )
+        saved_ms = statistics.median(results[0][1][0]) - statistics.median(results[1][1][0])
+        self.stdout.write(self.style.SUCCESS(f'Переиспользование соединения экономит {saved_ms:.2f} мс на p50'))
+
+    def run(self, client, options, max_age):
+        """Время запросов в мс и число открытых соединений"""
+        for conn in connections.all():
+            conn.close()
+            conn.settings_dict['CONN_MAX_AGE'] = max_age
+
+        connects = 0
+
+        def count(sender, **kwargs):
+            nonlocal connects
+            connects += 1
+
+        connection_created.connect(count)
+        timings = []
+        try:
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                # Тестовый клиент отключает close_old_connections - вызываем, как WSGI-обработчик
+                close_old_connections()
+                response = client.get(options['url'])
+                close_old_connections()
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f'{options["url"]} вернул {response.status_code}')
+        finally:
+            connection_created.disconnect(count)
+        return timings, connects
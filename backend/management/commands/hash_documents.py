@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from backend.document_storage import file_sha256
+from backend.models import Contract, Act
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет pdf_sha256 для договоров и актов, сформированных до хранения по хэшу. '
+        'Без хэша документ не пройдет проверку целостности при подписании.'
+    )
+
+    def handle(self, *args, **options):
+        for model in (Contract, Act):
+            documents = model.objects.filter(pdf_sha256='').exclude(pdf_file='').exclude(pdf_file=None)
+            updated, missing = [], 0
+            for document in documents.only('id', 'pdf_file').iterator():
+                try:
+                    document.pdf_sha256 = file_sha256(document.pdf_file)
+                except FileNotFoundError:
+                    missing += 1
+                    continue
+                updated.append(document)
+            model.objects.bulk_update(updated, ['pdf_sha256'], batch_size=500)
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: записано хэшей {len(updated)}, файлов не найдено {missing}'
+            ))
@@ -0,0 +1,56 @@
+from datetime import timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from backend.token_blacklist import blacklist_jti
+
+
+BLACKLIST_TABLE = 'token_blacklist_blacklistedtoken'
+OUTSTANDING_TABLE = 'token_blacklist_outstandingtoken'
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит еще не истекшие отозванные refresh-токены из таблиц '
+        'rest_framework_simplejwt.token_blacklist в Redis (backend.token_blacklist). '
+        'Таблицы читаются напрямую, приложение token_blacklist может быть уже отключено.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--drop-tables', action='store_true',
+            help='После переноса удалить таблицы token_blacklist'
+        )
+
+    def handle(self, *args, **options):
+        tables = set(connection.introspection.table_names())
+        if not {BLACKLIST_TABLE, OUTSTANDING_TABLE} <= tables:
+            self.stdout.write('Таблиц token_blacklist нет - переносить нечего')
+            return
+
+        imported = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT o.jti, o.expires_at FROM {BLACKLIST_TABLE} b '
+                f'JOIN {OUTSTANDING_TABLE} o ON o.id = b.token_id WHERE o.expires_at > %s',
+                [timezone.now()]
+            )
+            while True:
+                rows = cursor.fetchmany(options['batch_size'])
+                if not rows:
+                    break
+                for jti, expires_at in rows:
+                    if timezone.is_naive(expires_at):
+                        expires_at = timezone.make_aware(expires_at, dt_timezone.utc)
+                    blacklist_jti(jti, expires_at.timestamp())
+                imported += len(rows)
+                self.stdout.write(f'Перенесено: {imported}')
+
+            if options['drop_tables']:
+                cursor.execute(f'DROP TABLE {BLACKLIST_TABLE}')
+                cursor.execute(f'DROP TABLE {OUTSTANDING_TABLE}')
+
+        self.stdout.write(self.style.SUCCESS(f'Отозванных токенов перенесено в Redis: {imported}'))
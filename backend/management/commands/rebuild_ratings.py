@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from backend.models import Review, RatingSummary
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает RatingSummary всех исполнителей по таблице отзывов. '
+        'На PostgreSQL запись отзывов на время пересчета блокируется (чтение - нет); '
+        'на других базах команду нужно запускать, когда отзывы не изменяются.'
+    )
+
+    def handle(self, *args, **options):
+        histogram = {
+            f'rating_{i}': Count('id', filter=Q(rating=i)) for i in range(1, 6)
+        }
+
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # SHARE: новые и измененные отзывы ждут коммита пересчета,
+                # поэтому ни один отзыв не теряется между агрегацией и заменой сводок
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LOCK TABLE {connection.ops.quote_name(Review._meta.db_table)} IN SHARE MODE')
+            rows = (
+                Review.objects.order_by()
+                .values('freelancer_id')
+                .annotate(count=Count('id'), total=Sum('rating'), **histogram)
+            )
+            summaries = [
+                RatingSummary(user_id=row.pop('freelancer_id'), **row) for row in rows
+            ]
+            RatingSummary.objects.all().delete()
+            RatingSummary.objects.bulk_create(summaries, batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано рейтингов: {len(summaries)}'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import search
+from backend.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Заполняет tasks.search_vector для существующих заданий (пачками по id)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--only-missing', action='store_true', help='Только задания без search_vector')
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Полнотекстовый поиск доступен только на PostgreSQL')
+
+        queryset = Task.objects.order_by('id')
+        if options['only_missing']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        chunk_size = options['chunk_size']
+        last_id, updated = 0, 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            updated += search.update_search_vector(Task.objects.filter(id__in=ids))
+            last_id = ids[-1]
+            self.stdout.write(f'Обновлено: {updated}')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово, обновлено заданий: {updated}'))
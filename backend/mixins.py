@@ -0,0 +1,148 @@
+import re
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+# Поле вида source='get_status_display' читает обычную колонку status
+_DISPLAY_SOURCE_RE = re.compile(r'^get_(\w+)_display$')
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос выполнил больше SQL-запросов, чем разрешено бюджетом эндпоинта"""
+
+
+class _QueryPlan:
+    """Набор select_related/prefetch_related/only(), выведенный из сериализатора"""
+
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = set()
+        self.only = set()
+        # False, если сериализатор читает что-то кроме колонок модели
+        # (методы, свойства, source через точку) - тогда only() не применяем
+        self.only_is_safe = True
+
+
+def _collect_plan(serializer, model, prefix, plan):
+    """Рекурсивно обходит поля сериализатора и заполняет план запроса"""
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or '.' in field.source:
+            plan.only_is_safe = False
+            continue
+
+        name = field.source
+        match = _DISPLAY_SOURCE_RE.match(name)
+        if match:
+            name = match.group(1)
+
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            plan.only_is_safe = False
+            continue
+
+        path = prefix + name
+
+        if not model_field.is_relation:
+            plan.only.add(path)
+            continue
+
+        if model_field.many_to_many or model_field.one_to_many:
+            plan.prefetch_related.add(path)
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            # Вложенный сериализатор по FK/OneToOne - JOIN и рекурсия
+            plan.select_related.add(path)
+            if model_field.concrete:
+                plan.only.add(path)
+            _collect_plan(field, model_field.related_model, path + '__', plan)
+        elif model_field.concrete:
+            # PrimaryKeyRelatedField читает только <name>_id
+            plan.only.add(path)
+        else:
+            plan.only_is_safe = False
+
+
+class QueryOptimizationMixin:
+    """
+    Миксин для ViewSet: автоматически добавляет select_related/prefetch_related/only()
+    по объявленным полям сериализатора и проверяет бюджет SQL-запросов.
+
+    Бюджет задается атрибутом query_budget (число или словарь {action: число})
+    и проверяется, только если включен settings.QUERY_BUDGET_ENFORCE.
+    """
+    query_budget = None
+    optimize_only = True
+
+    _query_plans = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.optimize_queryset(queryset)
+
+    def optimize_queryset(self, queryset):
+        """Применяет к queryset план, построенный по сериализатору текущего action"""
+        serializer_class = self.get_serializer_class()
+        plan = self._get_query_plan(serializer_class, queryset.model)
+
+        if plan.select_related:
+            queryset = queryset.select_related(*sorted(plan.select_related))
+        if plan.prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(plan.prefetch_related))
+        # only() только на чтение: методы модели в действиях (publish, assign...)
+        # могут обращаться к любым полям
+        if (self.optimize_only and plan.only_is_safe
+                and self.request.method in SAFE_METHODS):
+            queryset = queryset.only(*sorted(plan.only))
+        return queryset
+
+    def _get_query_plan(self, serializer_class, model):
+        key = (serializer_class, model)
+        plan = self._query_plans.get(key)
+        if plan is None:
+            plan = _QueryPlan()
+            serializer = serializer_class(context=self.get_serializer_context())
+            _collect_plan(serializer, model, '', plan)
+            self._query_plans[key] = plan
+        return plan
+
+    def get_query_budget(self):
+        """Возвращает лимит SQL-запросов для текущего action или None"""
+        budget = self.query_budget
+        if isinstance(budget, dict):
+            budget = budget.get(getattr(self, 'action', None))
+        if budget is None:
+            budget = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+        return budget
+
+    def dispatch(self, request, *args, **kwargs):
+        if not getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+            return super().dispatch(request, *args, **kwargs)
+
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Запросы считаются на всех базах: чтение может идти с реплики (backend.db_router)
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(count_query))
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.get_query_budget()
+        if budget is not None and len(queries) > budget:
+            raise QueryBudgetExceeded(
+                f'{self.__class__.__name__}.{getattr(self, "action", None)}: '
+                f'{len(queries)} SQL-запросов при бюджете {budget}'
+            )
+        return response
@@ -1,4 +1,7 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction as db_transaction
+from django.utils import timezone
 from users.models import User
 
 
@@ -27,28 +30,53 @@ class Task(models.Model):
         ('in_progress', 'В работе'),
         ('completed', 'Выполнено'),
         ('cancelled', 'Отменено'),
-                ('draft', 'Черновик'),
+        ('draft', 'Черновик'),
     ]
     
     employer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_tasks')
-    freelancer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_t
-        template = models.ForeignKey(TaskTemplate, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks')asks')
+    freelancer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_tasks')
+    template = models.ForeignKey(TaskTemplate, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks')
     title = models.CharField(max_length=200)
     description = models.TextField()
     amount = models.DecimalField(max_digits=10, decimal_places=2)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')    created_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deadline = models.DateTimeField(null=True, blank=True)
+    # Полнотекстовый индекс title/description, поддерживается backend.signals (backend.search)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         db_table = 'tasks'
         verbose_name = 'Задание'
         verbose_name_plural = 'Задания'
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Keyset-пагинация ленты по (created_at, id), см. TaskFeedPagination
+            models.Index(fields=['-created_at', '-id'], name='tasks_created_id_idx'),
+            models.Index(fields=['employer', '-created_at', '-id'], name='tasks_employer_created_idx'),
+            models.Index(fields=['freelancer', '-created_at', '-id'], name='tasks_freelancer_created_idx'),
+            # Маркетплейс: только открытые задания
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='tasks_new_created_idx',
+                condition=models.Q(status='new'),
+            ),
+            GinIndex(fields=['search_vector'], name='tasks_search_vector_gin'),
+            # Поиск измененных заданий для дневных сводок (backend.rollups)
+            models.Index(fields=['updated_at'], name='tasks_updated_idx'),
+        ]
     
     def __str__(self):
         return f'{self.title} - {self.employer}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Значения из БД нужны сигналам для точной инвалидации кэша (backend.signals)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def publish(self):
         """Опубликовать задание"""
         if self.status == 'draft':
@@ -57,6 +85,20 @@ class Task(models.Model):
             return True
         return False
     
+    def claim(self, freelancer):
+        """
+        Атомарно взять задание в работу: один UPDATE ... WHERE id=%s AND status='new'.
+        Из нескольких одновременных исполнителей задание получит только один.
+        """
+        updated = Task.objects.filter(pk=self.pk, status='new').update(
+            freelancer=freelancer, status='in_progress', updated_at=timezone.now()
+        )
+        if not updated:
+            return False
+        self.freelancer = freelancer
+        self.status = 'in_progress'
+        return True
+    
     def can_be_published(self):
         """Проверка возможности публикации"""
         return self.status == 'draft' and self.title and self.description and self.amount
@@ -97,23 +139,78 @@ class Payment(models.Model):
     freelancer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    failure_reason = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
+    # Меняется при любой смене статуса, в том числе pending -> processing (ETag списка выплат)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'payments'
         verbose_name = 'Выплата'
         verbose_name_plural = 'Выплаты'
+        indexes = [
+            # Очередь выплат: воркеры выбирают pending по порядку создания
+            models.Index(fields=['created_at'], name='payments_pending_idx', condition=models.Q(status='pending')),
+            # Поиск зависших выплат (backend.tasks.reap_stuck_payments)
+            models.Index(fields=['updated_at'], name='payments_processing_idx',
+                         condition=models.Q(status='processing')),
+            # Выгрузка за период (backend.exports)
+            models.Index(fields=['created_at', 'id'], name='payments_created_id_idx'),
+            # Проведенные выплаты для дневных сводок (backend.rollups)
+            models.Index(fields=['processed_at'], name='payments_processed_idx',
+                         condition=models.Q(status='completed')),
+        ]
     
     def __str__(self):
         return f'Выплата {self.amount} для {self.freelancer}'
 
 
 
+class PendingSignatureQuerySet(models.QuerySet):
+    """Общие выборки для договоров и актов"""
+    document_type = None
+
+    def awaiting_signature(self, user):
+        """
+        Документы в статусе pending_signature, которые пользователь еще не подписал.
+        Фильтр по статусу попадает в частичный индекс, подписи исключаются
+        анти-джойном (NOT EXISTS) по уникальному индексу signatures.
+        """
+        signed = Signature.objects.filter(
+            user=user, document_type=self.document_type, document_id=models.OuterRef('pk')
+        )
+        return self.filter(status='pending_signature').exclude(models.Exists(signed))
+
+
+class ContractQuerySet(PendingSignatureQuerySet):
+    document_type = 'contract'
+
+    def awaiting_signature(self, user):
+        return (
+            super().awaiting_signature(user)
+            .filter(models.Q(employer=user) | models.Q(freelancer=user))
+            .select_related('task', 'employer', 'freelancer')
+        )
+
+
+class ActQuerySet(PendingSignatureQuerySet):
+    document_type = 'act'
+
+    def awaiting_signature(self, user):
+        return (
+            super().awaiting_signature(user)
+            .filter(models.Q(task__employer=user) | models.Q(task__freelancer=user))
+            .select_related('task__employer', 'task__freelancer', 'contract')
+        )
+
+
 class Contract(models.Model):
     """Модель договора"""
     STATUS_CHOICES = [
         ('draft', 'Черновик'),
+        ('generating', 'Формируется'),
+        ('generation_failed', 'Ошибка формирования'),
         ('pending_signature', 'Ожидает подписи'),
         ('signed', 'Подписан'),
         ('cancelled', 'Отменен'),
@@ -132,16 +229,32 @@ class Contract(models.Model):
     
     # PDF файл
     pdf_file = models.FileField(upload_to='contracts/', null=True, blank=True)
+    # Адресация по содержимому (backend.document_storage): SHA-256 байтов PDF
+    # и хэш входных данных, по которому повторный рендер пропускается
+    pdf_sha256 = models.CharField(max_length=64, blank=True)
+    input_hash = models.CharField(max_length=64, blank=True, db_index=True)
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    # Фоновое формирование PDF (backend.tasks)
+    generation_task_id = models.CharField(max_length=255, blank=True)
+    generation_error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ContractQuerySet.as_manager()
+    
     class Meta:
         db_table = 'contracts'
         verbose_name = 'Договор'
         verbose_name_plural = 'Договоры'
         ordering = ['-created_at']
+        indexes = [
+            # Входящие на подпись (awaiting_signature) - по обеим сторонам договора
+            models.Index(fields=['employer', '-created_at'], name='contracts_pending_employer_idx',
+                         condition=models.Q(status='pending_signature')),
+            models.Index(fields=['freelancer', '-created_at'], name='contracts_pending_fl_idx',
+                         condition=models.Q(status='pending_signature')),
+        ]
     
     def __str__(self):
         return f'Договор №{self.contract_number}'
@@ -156,6 +269,8 @@ class Act(models.Model):
     """Модель акта выполненных работ"""
     STATUS_CHOICES = [
         ('draft', 'Черновик'),
+        ('generating', 'Формируется'),
+        ('generation_failed', 'Ошибка формирования'),
         ('pending_signature', 'Ожидает подписи'),
         ('signed', 'Подписан'),
         ('cancelled', 'Отменен'),
@@ -172,16 +287,29 @@ class Act(models.Model):
     
     # PDF файл
     pdf_file = models.FileField(upload_to='acts/', null=True, blank=True)
+    # Адресация по содержимому (backend.document_storage): SHA-256 байтов PDF
+    # и хэш входных данных, по которому повторный рендер пропускается
+    pdf_sha256 = models.CharField(max_length=64, blank=True)
+    input_hash = models.CharField(max_length=64, blank=True, db_index=True)
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    # Фоновое формирование PDF (backend.tasks)
+    generation_task_id = models.CharField(max_length=255, blank=True)
+    generation_error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ActQuerySet.as_manager()
+    
     class Meta:
         db_table = 'acts'
         verbose_name = 'Акт'
         verbose_name_plural = 'Акты'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['task'], name='acts_pending_task_idx',
+                         condition=models.Q(status='pending_signature')),
+        ]
     
     def __str__(self):
         return f'Акт №{self.act_number}'
@@ -205,6 +333,8 @@ class Signature(models.Model):
     
     # Данные подписи
     signature_data = models.TextField(help_text='Данные электронной подписи')
+    # SHA-256 PDF на момент подписания
+    document_sha256 = models.CharField(max_length=64, blank=True)
     signed_at = models.DateTimeField(auto_now_add=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     
@@ -219,6 +349,31 @@ class Signature(models.Model):
     def __str__(self):
         return f'Подпись {self.user} - {self.document_type} #{self.document_id}'
 
+    def matches(self, document):
+        """Подписан ли именно текущий PDF документа"""
+        return bool(self.document_sha256) and self.document_sha256 == document.pdf_sha256
+
+
+class TransactionQuerySet(models.QuerySet):
+    def complete(self):
+        """
+        Переводит pending-транзакции в completed и в той же транзакции БД
+        обновляет снимки балансов. Возвращает число завершенных транзакций.
+        """
+        with db_transaction.atomic():
+            rows = list(
+                self.filter(status='pending').select_for_update()
+                .values_list('id', 'user_id', 'transaction_type', 'amount')
+            )
+            deltas = {}
+            for _, user_id, transaction_type, amount in rows:
+                deltas[user_id] = deltas.get(user_id, 0) + Balance.signed(transaction_type, amount)
+            updated = Transaction.objects.filter(id__in=[row[0] for row in rows]).update(
+                status='completed', processed_at=timezone.now()
+            )
+            Balance.apply(deltas)
+        return updated
+
 
 class Transaction(models.Model):
     """Модель транзакций для пополнения баланса и выплат"""
@@ -248,25 +403,209 @@ class Transaction(models.Model):
         verbose_name = 'Транзакция'
         verbose_name_plural = 'Транзакции'
         ordering = ['-created_at']
+        indexes = [
+            # Выгрузка за период (backend.exports)
+            models.Index(fields=['created_at', 'id'], name='transactions_created_id_idx'),
+        ]
+    
+    objects = TransactionQuerySet.as_manager()
     
     def __str__(self):
         return f'{self.get_transaction_type_display()} - {self.amount} руб. ({self.user.email})'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Прежние статус, сумма и тип нужны сигналам, обновляющим Balance (backend.signals)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class Balance(models.Model):
+    """Снимок баланса пользователя: сумма завершенных транзакций с учетом знака"""
+    # Знак транзакции для баланса пользователя
+    SIGNS = {'deposit': 1, 'payout': -1, 'payment': -1}
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='balance')
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Баланс')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'balances'
+        verbose_name = 'Баланс'
+        verbose_name_plural = 'Балансы'
+    
+    def __str__(self):
+        return f'{self.user}: {self.amount} руб.'
+    
+    @classmethod
+    def signed(cls, transaction_type, amount):
+        return cls.SIGNS[transaction_type] * amount
+    
+    @classmethod
+    def signed_amount_expression(cls):
+        """SQL-выражение суммы транзакции со знаком - для сверки с журналом"""
+        return models.Case(
+            *[models.When(transaction_type=t, then=models.F('amount') * sign) for t, sign in cls.SIGNS.items()],
+            output_field=models.DecimalField(max_digits=14, decimal_places=2),
+        )
+    
+    @classmethod
+    def apply(cls, deltas):
+        """Атомарно прибавляет {user_id: сумма} к балансам через F()"""
+        # Строки блокируются в порядке user_id: параллельные транзакции с теми же
+        # пользователями не захватывают их навстречу друг другу (взаимоблокировка)
+        for user_id in sorted(deltas):
+            delta = deltas[user_id]
+            if not delta:
+                continue
+            cls.objects.get_or_create(user_id=user_id)
+            cls.objects.filter(user_id=user_id).update(
+                amount=models.F('amount') + delta, updated_at=timezone.now()
+            )
+
 
 class Review(models.Model):
-    \"\"\"Модель отзыва о работе исполнителя\"\"\"
+    """Модель отзыва о работе исполнителя"""
     task = models.OneToOneField(Task, on_delete=models.CASCADE, related_name='review')
     employer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='given_reviews')
     freelancer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_reviews')
     rating = models.IntegerField(choices=[(i, str(i)) for i in range(1, 6)], verbose_name='Оценка')
     comment = models.TextField(verbose_name='Комментарий', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # По нему сводки (backend.rollups) находят измененные отзывы
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'reviews'
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at'], name='reviews_updated_idx'),
+        ]
 
     def __str__(self):
         return f'Отзыв {self.rating} для {self.freelancer} от {self.employer}'
+
+    # Отзыв и RatingSummary (сигналы) пишутся одной транзакцией: rebuild_ratings,
+    # заблокировав таблицу отзывов, видит либо оба изменения, либо ни одного
+    def save(self, *args, **kwargs):
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Прежние freelancer/rating нужны для пересчета RatingSummary при изменении отзыва
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class RatingSummary(models.Model):
+    """Денормализованный рейтинг исполнителя, обновляется сигналами на Review"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    count = models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')
+    total = models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'rating_summaries'
+        verbose_name = 'Рейтинг исполнителя'
+        verbose_name_plural = 'Рейтинги исполнителей'
+
+    def __str__(self):
+        return f'Рейтинг {self.user}: {self.average}'
+
+    @property
+    def average(self):
+        if not self.count:
+            return None
+        return round(self.total / self.count, 2)
+
+    @property
+    def histogram(self):
+        return {i: getattr(self, f'rating_{i}') for i in range(1, 6)}
+
+    @classmethod
+    def apply(cls, user_id, rating, sign=1):
+        """Добавляет (sign=1) или убирает (sign=-1) одну оценку атомарным UPDATE с F()"""
+        if sign > 0:
+            cls.objects.get_or_create(user_id=user_id)
+        cls.objects.filter(user_id=user_id).update(**{
+            'count': models.F('count') + sign,
+            'total': models.F('total') + sign * rating,
+            f'rating_{rating}': models.F(f'rating_{rating}') + sign,
+        })
+
+
+class EmployerDailyStats(models.Model):
+    """
+    Дневная сводка работодателя (заполняется backend.rollups).
+    Счетчики заданий - по дню создания задания и его текущему статусу,
+    расходы - по дню проведения выплаты.
+    """
+    employer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    tasks_created = models.PositiveIntegerField(default=0)
+    tasks_draft = models.PositiveIntegerField(default=0)
+    tasks_new = models.PositiveIntegerField(default=0)
+    tasks_in_progress = models.PositiveIntegerField(default=0)
+    tasks_completed = models.PositiveIntegerField(default=0)
+    tasks_cancelled = models.PositiveIntegerField(default=0)
+    spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payments_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'stats_employer_daily'
+        verbose_name = 'Дневная сводка работодателя'
+        verbose_name_plural = 'Дневные сводки работодателей'
+        constraints = [
+            models.UniqueConstraint(fields=['employer', 'day'], name='stats_employer_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.employer} {self.day}'
+
+
+class FreelancerDailyStats(models.Model):
+    """Дневная сводка исполнителя: выплаты по дню проведения, отзывы по дню создания"""
+    freelancer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='freelancer_daily_stats')
+    day = models.DateField()
+    payouts_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payouts_count = models.PositiveIntegerField(default=0)
+    reviews_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'stats_freelancer_daily'
+        verbose_name = 'Дневная сводка исполнителя'
+        verbose_name_plural = 'Дневные сводки исполнителей'
+        constraints = [
+            models.UniqueConstraint(fields=['freelancer', 'day'], name='stats_freelancer_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.freelancer} {self.day}'
+
+
+class RollupWatermark(models.Model):
+    """До какого момента источник уже учтен в сводках"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DateTimeField()
+
+    class Meta:
+        db_table = 'stats_watermarks'
+        verbose_name = 'Отметка сводок'
+        verbose_name_plural = 'Отметки сводок'
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
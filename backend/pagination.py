@@ -0,0 +1,134 @@
+import base64
+import binascii
+
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def keyset_filter(queryset, position, operator):
+    """
+    Строки по одну сторону от позиции (created_at, id): operator '<' или '>'.
+    Сравнение строк (created_at, id) < (...) PostgreSQL использует как границу
+    диапазона индекса (created_at, id), в отличие от OR из двух условий;
+    created_at <= (>=) - та же граница для частичных и составных индексов,
+    где сравнение строк не подходит.
+    """
+    created_at, pk = position
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    table = quote(queryset.model._meta.db_table)
+    value = queryset.model._meta.get_field('created_at').get_db_prep_value(created_at, connection)
+    condition = RawSQL(
+        f'({table}.{quote("created_at")}, {table}.{quote("id")}) {operator} (%s, %s)',
+        (value, pk), output_field=BooleanField(),
+    )
+    bound = {'<': 'created_at__lte', '>': 'created_at__gte'}[operator]
+    return queryset.filter(condition, **{bound: created_at})
+
+
+class TaskFeedPagination(PageNumberPagination):
+    """
+    Пагинация ленты заданий.
+
+    Без параметра cursor работает как обычная PageNumberPagination.
+    С параметром cursor (пустое значение - первая страница) включается keyset-режим
+    по (created_at, id): WHERE (created_at, id) < (последняя строка) вместо OFFSET,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    Полный COUNT(*) в keyset-режиме отключается параметром count=false.
+
+    Если у view есть get_keyset_branches(queryset), лента собирается из нескольких
+    выборок (например, OR двух условий): каждая читает свою страницу по своему
+    индексу, результаты сливаются по (created_at, id).
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Неверный курсор'
+    keyset_ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.count = queryset.count() if self.include_count(request) else None
+
+        position = self.decode_cursor(request)
+        get_branches = getattr(view, 'get_keyset_branches', None)
+        branches = get_branches(queryset) if get_branches else [queryset]
+
+        # Берем на одну строку больше, чтобы узнать, есть ли следующая страница
+        rows = {}
+        for branch in branches:
+            branch = branch.order_by(*self.keyset_ordering)
+            if position is not None:
+                branch = self.filter_before(branch, position)
+            rows.update((row.pk, row) for row in branch[:page_size + 1])
+        rows = sorted(rows.values(), key=lambda row: (row.created_at, row.pk), reverse=True)[:page_size + 1]
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = (rows[-1].created_at, rows[-1].pk) if self.has_next else None
+        return rows
+
+    def filter_before(self, queryset, position):
+        """Строки после позиции курсора (лента идет от новых к старым)"""
+        return keyset_filter(queryset, position, '<')
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, 'true').lower() not in ('false', '0')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            created_at, pk = decoded.rsplit('|', 1)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def encode_cursor(self, position):
+        created_at, pk = position
+        raw = f'{created_at.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['next_cursor'] = self.get_next_cursor()
+        payload['results'] = data
+        return Response(payload)
@@ -0,0 +1,52 @@
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class PayoutGateway:
+    """
+    Интерфейс платежного шлюза выплат.
+
+    payout() получает список выплат вида {'id', 'freelancer_id', 'amount', 'idempotency_key'}
+    и возвращает {payment_id: None} для успешных и {payment_id: 'текст ошибки'} для отклоненных.
+    Ключ идемпотентности строится из id выплаты (idempotency_key()): повторная отправка
+    той же выплаты (после reap_stuck_payments) не должна приводить к второму переводу.
+    """
+
+    def payout(self, payments):
+        raise NotImplementedError
+
+
+def idempotency_key(payment_id):
+    return f'payment-{payment_id}'
+
+
+class FakePayoutGateway(PayoutGateway):
+    """
+    Локальный шлюз для разработки и тестов: ничего не отправляет, запоминает
+    последние выплаты и, как настоящий шлюз, не переводит повторно по тому же ключу
+    """
+    sent = deque(maxlen=1000)
+    keys = deque(maxlen=1000)
+    fail_ids = set()
+
+    def payout(self, payments):
+        results = {}
+        for payment in payments:
+            if payment['id'] in self.fail_ids:
+                results[payment['id']] = 'Отклонено тестовым шлюзом'
+                continue
+            if payment['idempotency_key'] not in self.keys:
+                self.keys.append(payment['idempotency_key'])
+                self.sent.append(payment['id'])
+            results[payment['id']] = None
+        return results
+
+
+def get_payout_gateway():
+    """Шлюз из settings.PAYOUT_GATEWAY"""
+    if not settings.PAYOUT_GATEWAY:
+        raise ImproperlyConfigured('PAYOUT_GATEWAY не задан - выплаты не могут быть отправлены')
+    return import_string(settings.PAYOUT_GATEWAY)()
@@ -10,6 +10,33 @@ from django.core.files.base import ContentFile
 
 class PDFGenerator:
     """Генератор PDF документов"""
+    # Увеличивайте при изменении макета: меняет хэши входных данных
+    # и заставляет перерисовать ранее сформированные документы
+    LAYOUT_VERSION = 1
+    
+    @staticmethod
+    def contract_inputs(contract):
+        """Все значения, которые попадают в PDF договора"""
+        return {
+            'contract_number': contract.contract_number,
+            'contract_date': contract.contract_date,
+            'employer': contract.employer.telegram_id or contract.employer.phone,
+            'freelancer': contract.freelancer.telegram_id or contract.freelancer.phone,
+            'work_description': contract.work_description,
+            'amount': contract.amount,
+            'deadline': contract.deadline,
+        }
+    
+    @staticmethod
+    def act_inputs(act):
+        """Все значения, которые попадают в PDF акта"""
+        return {
+            'act_number': act.act_number,
+            'act_date': act.act_date,
+            'contract_number': act.contract.contract_number,
+            'work_performed': act.work_performed,
+            'amount': act.amount,
+        }
     
     def __init__(self):
         self.buffer = BytesIO()
@@ -17,7 +44,8 @@ class PDFGenerator:
     
     def generate_contract(self, contract):
         """Генерирует PDF договора"""
-        self.canvas = canvas.Canvas(self.buffer, pagesize=A4)
+        self.canvas = canvas.Canvas(self.buffer, pagesize=A4, invariant=1)
+        self._draw_contract_skeleton(self.canvas)
         width, height = A4
         
         # Заголовок
@@ -30,53 +58,26 @@ class PDFGenerator:
         self.canvas.drawString(2*cm, height - 3*cm, 
                               f'от {contract.contract_date.strftime("%d.%m.%Y")}')
         
-        y = height - 5*cm
-        
         # Стороны договора
-        self.canvas.setFont('Helvetica-Bold', 12)
-        self.canvas.drawString(2*cm, y, 'Заказчик:')
-        y -= 0.7*cm
+        y = height - 5*cm - 0.7*cm
         self.canvas.setFont('Helvetica', 11)
         self.canvas.drawString(2*cm, y, f'{contract.employer.telegram_id or contract.employer.phone}')
         
-        y -= 1.5*cm
-        self.canvas.setFont('Helvetica-Bold', 12)
-        self.canvas.drawString(2*cm, y, 'Исполнитель:')
-        y -= 0.7*cm
-        self.canvas.setFont('Helvetica', 11)
+        y -= 1.5*cm + 0.7*cm
         self.canvas.drawString(2*cm, y, f'{contract.freelancer.telegram_id or contract.freelancer.phone}')
         
         # Предмет договора
-        y -= 2*cm
-        self.canvas.setFont('Helvetica-Bold', 12)
-        self.canvas.drawString(2*cm, y, '1. ПРЕДМЕТ ДОГОВОРА')
-        
-        y -= 1*cm
-        self.canvas.setFont('Helvetica', 11)
+        y -= 2*cm + 1*cm
         # Разбиваем текст на строки
         text = f'Исполнитель обязуется выполнить следующие работы: {contract.work_description}'
         self._draw_multiline_text(text, 2*cm, y, width - 4*cm)
         
         # Стоимость и сроки
-        y -= 3*cm
-        self.canvas.setFont('Helvetica-Bold', 12)
-        self.canvas.drawString(2*cm, y, '2. СТОИМОСТЬ И СРОКИ')
-        
-        y -= 1*cm
-        self.canvas.setFont('Helvetica', 11)
+        y -= 3*cm + 1*cm
         self.canvas.drawString(2*cm, y, f'Стоимость работ: {contract.amount} руб.')
         y -= 0.7*cm
         self.canvas.drawString(2*cm, y, f'Срок выполнения: {contract.deadline.strftime("%d.%m.%Y")}')
         
-        # Подписи
-        y = 5*cm
-        self.canvas.setFont('Helvetica', 11)
-        self.canvas.drawString(2*cm, y, '_' * 30)
-        self.canvas.drawString(2*cm, y - 0.7*cm, 'Заказчик')
-        
-        self.canvas.drawString(width - 10*cm, y, '_' * 30)
-        self.canvas.drawString(width - 10*cm, y - 0.7*cm, 'Исполнитель')
-        
         self.canvas.save()
         pdf = self.buffer.getvalue()
         self.buffer.close()
@@ -84,7 +85,8 @@ class PDFGenerator:
     
     def generate_act(self, act):
         """Генерирует PDF акта"""
-        self.canvas = canvas.Canvas(self.buffer, pagesize=A4)
+        self.canvas = canvas.Canvas(self.buffer, pagesize=A4, invariant=1)
+        self._draw_act_skeleton(self.canvas)
         width, height = A4
         
         # Заголовок
@@ -92,11 +94,8 @@ class PDFGenerator:
         self.canvas.drawCentredString(width / 2, height - 2*cm, 
                                      f'АКТ №{act.act_number}')
         
-        self.canvas.setFont('Helvetica', 12)
-        self.canvas.drawCentredString(width / 2, height - 2.7*cm, 
-                                     'приемки-передачи выполненных работ')
-        
         # Дата
+        self.canvas.setFont('Helvetica', 12)
         self.canvas.drawString(2*cm, height - 4*cm, 
                               f'от {act.act_date.strftime("%d.%m.%Y")}')
         
@@ -107,12 +106,7 @@ class PDFGenerator:
         self.canvas.drawString(2*cm, y, f'к Договору №{act.contract.contract_number}')
         
         # Выполненные работы
-        y -= 2*cm
-        self.canvas.setFont('Helvetica-Bold', 12)
-        self.canvas.drawString(2*cm, y, 'ВЫПОЛНЕННЫЕ РАБОТЫ')
-        
-        y -= 1*cm
-        self.canvas.setFont('Helvetica', 11)
+        y -= 2*cm + 1*cm
         text = act.work_performed
         self._draw_multiline_text(text, 2*cm, y, width - 4*cm)
         
@@ -121,20 +115,53 @@ class PDFGenerator:
         self.canvas.setFont('Helvetica-Bold', 12)
         self.canvas.drawString(2*cm, y, f'ИТОГО: {act.amount} руб.')
         
-        # Подписи
-        y = 5*cm
-        self.canvas.setFont('Helvetica', 11)
-        self.canvas.drawString(2*cm, y, '_' * 30)
-        self.canvas.drawString(2*cm, y - 0.7*cm, 'Заказчик')
-        
-        self.canvas.drawString(width - 10*cm, y, '_' * 30)
-        self.canvas.drawString(width - 10*cm, y - 0.7*cm, 'Исполнитель')
-        
         self.canvas.save()
         pdf = self.buffer.getvalue()
         self.buffer.close()
         return ContentFile(pdf, name=f'act_{act.act_number}.pdf')
     
+    def _draw_contract_skeleton(self, target):
+        """Статический слой договора: разделы, подписи"""
+        width, height = A4
+        y = height - 5*cm
+        
+        target.setFont('Helvetica-Bold', 12)
+        target.drawString(2*cm, y, 'Заказчик:')
+        y -= 0.7*cm + 1.5*cm
+        target.drawString(2*cm, y, 'Исполнитель:')
+        
+        y -= 0.7*cm + 2*cm
+        target.drawString(2*cm, y, '1. ПРЕДМЕТ ДОГОВОРА')
+        
+        y -= 1*cm + 3*cm
+        target.drawString(2*cm, y, '2. СТОИМОСТЬ И СРОКИ')
+        
+        self._draw_signatures(target)
+    
+    def _draw_act_skeleton(self, target):
+        """Статический слой акта: подзаголовок, раздел, подписи"""
+        width, height = A4
+        
+        target.setFont('Helvetica', 12)
+        target.drawCentredString(width / 2, height - 2.7*cm, 
+                                 'приемки-передачи выполненных работ')
+        
+        target.setFont('Helvetica-Bold', 12)
+        target.drawString(2*cm, height - 7.5*cm, 'ВЫПОЛНЕННЫЕ РАБОТЫ')
+        
+        self._draw_signatures(target)
+    
+    def _draw_signatures(self, target):
+        """Линии подписей сторон"""
+        width, height = A4
+        y = 5*cm
+        target.setFont('Helvetica', 11)
+        target.drawString(2*cm, y, '_' * 30)
+        target.drawString(2*cm, y - 0.7*cm, 'Заказчик')
+        
+        target.drawString(width - 10*cm, y, '_' * 30)
+        target.drawString(width - 10*cm, y - 0.7*cm, 'Исполнитель')
+    
     def _draw_multiline_text(self, text, x, y, max_width):
         """Вспомогательный метод для разбиения текста на строки"""
         words = text.split()
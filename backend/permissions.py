@@ -0,0 +1,10 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsTaskParticipant(BasePermission):
+    """Доступ к заданию и его документам - только работодателю, исполнителю и персоналу"""
+
+    def has_object_permission(self, request, view, obj):
+        task = getattr(obj, 'task', obj)
+        user = request.user
+        return user.is_staff or user.id in (task.employer_id, task.freelancer_id)
@@ -0,0 +1,180 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    Task, Payment, Review, EmployerDailyStats, FreelancerDailyStats, RollupWatermark
+)
+
+
+# Дневные сводки для дашбордов. Каждый источник обрабатывается от своей отметки
+# (RollupWatermark): находятся пары (пользователь, день), затронутые строками,
+# измененными после отметки, и эти дни пересчитываются целиком из источника.
+# Пересчет идемпотентен, поэтому повторный запуск ничего не испортит.
+# Удаления строк не отслеживаются: удаленное задание или отзыв уйдут из сводки
+# при следующем изменении того же дня.
+
+# Строки моложе этого не обрабатываются: даем закоммититься транзакциям,
+# которые получили время раньше, чем завершились
+ROLLUP_LAG = timedelta(minutes=5)
+EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+TASK_STATUSES = ['draft', 'new', 'in_progress', 'completed', 'cancelled']
+
+
+def _employer_tasks(user_ids, start, end):
+    histogram = {
+        f'tasks_{status}': Count('id', filter=Q(status=status)) for status in TASK_STATUSES
+    }
+    return (
+        Task.objects.filter(employer_id__in=user_ids, created_at__gte=start, created_at__lt=end)
+        .order_by().values('employer_id')
+        .annotate(tasks_created=Count('id'), **histogram)
+        .values_list('employer_id', 'tasks_created', *histogram)
+    )
+
+
+def _employer_spend(user_ids, start, end):
+    return (
+        Payment.objects.filter(
+            status='completed', task__employer_id__in=user_ids,
+            processed_at__gte=start, processed_at__lt=end
+        )
+        .order_by().values('task__employer_id')
+        .annotate(spend=Sum('amount'), payments_count=Count('id'))
+        .values_list('task__employer_id', 'spend', 'payments_count')
+    )
+
+
+def _freelancer_payouts(user_ids, start, end):
+    return (
+        Payment.objects.filter(
+            status='completed', freelancer_id__in=user_ids,
+            processed_at__gte=start, processed_at__lt=end
+        )
+        .order_by().values('freelancer_id')
+        .annotate(payouts_amount=Sum('amount'), payouts_count=Count('id'))
+        .values_list('freelancer_id', 'payouts_amount', 'payouts_count')
+    )
+
+
+def _freelancer_reviews(user_ids, start, end):
+    return (
+        Review.objects.filter(freelancer_id__in=user_ids, created_at__gte=start, created_at__lt=end)
+        .order_by().values('freelancer_id')
+        .annotate(reviews_count=Count('id'), rating_total=Sum('rating'))
+        .values_list('freelancer_id', 'reviews_count', 'rating_total')
+    )
+
+
+# name: (источник изменений, поле времени изменения, поле пользователя, поле дня,
+#        пересчет дня, модель сводки, поле пользователя в сводке, обновляемые поля)
+SOURCES = {
+    'employer_tasks': (
+        Task.objects.all(), 'updated_at', 'employer_id', 'created_at', _employer_tasks,
+        EmployerDailyStats, 'employer',
+        ['tasks_created'] + [f'tasks_{status}' for status in TASK_STATUSES],
+    ),
+    'employer_spend': (
+        Payment.objects.filter(status='completed'), 'processed_at', 'task__employer_id', 'processed_at',
+        _employer_spend, EmployerDailyStats, 'employer', ['spend', 'payments_count'],
+    ),
+    'freelancer_payouts': (
+        Payment.objects.filter(status='completed'), 'processed_at', 'freelancer_id', 'processed_at',
+        _freelancer_payouts, FreelancerDailyStats, 'freelancer', ['payouts_amount', 'payouts_count'],
+    ),
+    'freelancer_reviews': (
+        Review.objects.all(), 'updated_at', 'freelancer_id', 'created_at', _freelancer_reviews,
+        FreelancerDailyStats, 'freelancer', ['reviews_count', 'rating_total'],
+    ),
+}
+
+
+def day_bounds(day):
+    """Начало дня и начало следующего в текущем часовом поясе"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+def _update_source(name, until):
+    changes, changed_field, user_field, day_field, aggregate, model, key, fields = SOURCES[name]
+
+    watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(
+        name=name, defaults={'value': EPOCH}
+    )
+    if watermark.value >= until:
+        return 0
+
+    affected = (
+        changes.filter(**{f'{changed_field}__gt': watermark.value, f'{changed_field}__lte': until})
+        .exclude(**{f'{user_field}__isnull': True})
+        .annotate(day=TruncDate(day_field))
+        .order_by().values_list(user_field, 'day').distinct()
+    )
+    users_by_day = defaultdict(set)
+    for user_id, day in affected.iterator():
+        users_by_day[day].add(user_id)
+
+    rows = []
+    for day, user_ids in users_by_day.items():
+        values = {row[0]: row[1:] for row in aggregate(user_ids, *day_bounds(day))}
+        for user_id in user_ids:
+            # Пользователь без строк за день (все удалены) получает нули
+            counters = values.get(user_id) or [0] * len(fields)
+            rows.append(model(**{
+                f'{key}_id': user_id, 'day': day,
+                **{field: value or 0 for field, value in zip(fields, counters)},
+            }))
+
+    model.objects.bulk_create(
+        rows, batch_size=1000,
+        update_conflicts=True, unique_fields=[key, 'day'], update_fields=fields,
+    )
+    watermark.value = until
+    watermark.save(update_fields=['value'])
+    return len(rows)
+
+
+def update_rollups(until=None):
+    """Досчитывает все сводки до момента until (по умолчанию - сейчас минус ROLLUP_LAG)"""
+    until = until or timezone.now() - ROLLUP_LAG
+    updated = {}
+    for name in SOURCES:
+        # Каждый источник - своя транзакция: отметка двигается вместе с записанными днями
+        with transaction.atomic():
+            updated[name] = _update_source(name, until)
+    return updated
+
+
+def _period_days(queryset, fields):
+    return list(queryset.order_by('day').values('day', *fields))
+
+
+def employer_stats(user, date_from, date_to):
+    """Сводка работодателя за период - только из EmployerDailyStats"""
+    fields = ['tasks_created'] + [f'tasks_{status}' for status in TASK_STATUSES] + ['spend', 'payments_count']
+    rows = EmployerDailyStats.objects.filter(employer=user, day__gte=date_from, day__lte=date_to)
+    totals = rows.aggregate(**{field: Sum(field) for field in fields})
+    totals = {field: value or 0 for field, value in totals.items()}
+    totals['spend'] = Decimal(totals['spend'])
+    totals['tasks_by_status'] = {status: totals.pop(f'tasks_{status}') for status in TASK_STATUSES}
+    return {'totals': totals, 'days': _period_days(rows, fields)}
+
+
+def freelancer_stats(user, date_from, date_to):
+    """Сводка исполнителя за период - только из FreelancerDailyStats"""
+    fields = ['payouts_amount', 'payouts_count', 'reviews_count', 'rating_total']
+    rows = FreelancerDailyStats.objects.filter(freelancer=user, day__gte=date_from, day__lte=date_to)
+    totals = rows.aggregate(**{field: Sum(field) for field in fields})
+    totals = {field: value or 0 for field, value in totals.items()}
+    totals['payouts_amount'] = Decimal(totals['payouts_amount'])
+    totals['average_rating'] = (
+        round(totals['rating_total'] / totals['reviews_count'], 2) if totals['reviews_count'] else None
+    )
+    return {'totals': totals, 'days': _period_days(rows, fields)}
@@ -0,0 +1,48 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Q
+
+
+# Полнотекстовый поиск по заданиям (PostgreSQL, столбец tasks.search_vector с GIN-индексом)
+SEARCH_CONFIG = 'russian'
+
+
+def is_supported():
+    return connection.vendor == 'postgresql'
+
+
+def task_search_vector():
+    """Заголовок важнее описания: веса A и B"""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vector(queryset):
+    """Пересчитывает search_vector одним UPDATE; на других СУБД ничего не делает"""
+    if not is_supported():
+        return 0
+    return queryset.update(search_vector=task_search_vector())
+
+
+def _query(text):
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def filter_tasks(queryset, text):
+    """Фильтр по запросу без сортировки; без PostgreSQL - icontains"""
+    if not is_supported():
+        return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text))
+    return queryset.filter(search_vector=_query(text))
+
+
+def search_tasks(queryset, text):
+    """Фильтр по запросу с сортировкой по релевантности"""
+    queryset = filter_tasks(queryset, text)
+    if not is_supported():
+        return queryset
+    return (
+        queryset.annotate(rank=SearchRank(F('search_vector'), _query(text)))
+        .order_by('-rank', '-created_at', '-id')
+    )
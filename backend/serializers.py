@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Task, TaskTemplate, Document, Payment, Transaction, Review
+from .models import Task, TaskTemplate, Document, Payment, Contract, Act, Transaction, Review, RatingSummary
 from users.models import User
 
 class UserSerializer(serializers.ModelSerializer):
@@ -8,6 +8,15 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'phone', 'telegram_id', 'is_freelancer', 'is_employer']
         read_only_fields = ['id']
 
+class RatingSummarySerializer(serializers.ModelSerializer):
+    average = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    
+    class Meta:
+        model = RatingSummary
+        fields = ['count', 'total', 'average', 'histogram']
+        read_only_fields = fields
+
 class TaskTemplateSerializer(serializers.ModelSerializer):
     class Meta:
         model = TaskTemplate
@@ -89,6 +98,120 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError('Черновик можно только опубликовать')
         return value
 
+class BulkTaskFromTemplateSerializer(serializers.Serializer):
+    """N одинаковых заданий из шаблона; amount и deadline переопределяют шаблон"""
+    count = serializers.IntegerField(min_value=1, max_value=500)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    deadline = serializers.DateTimeField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        template = self.context['template']
+        if attrs.get('amount') is None and template.default_amount is None:
+            raise serializers.ValidationError({'amount': 'В шаблоне нет суммы по умолчанию'})
+        return attrs
+
+class TaskImportRowSerializer(serializers.Serializer):
+    """Строка CSV-импорта; пустые поля берутся из шаблона"""
+    title = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    description = serializers.CharField(required=False, allow_blank=True)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    deadline = serializers.DateTimeField(required=False, allow_null=True)
+
+    def to_internal_value(self, data):
+        # Пустая ячейка CSV - значит "не задано"
+        data = {key: value for key, value in data.items() if key and value not in ('', None)}
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        template = self.context.get('template')
+        for field in ('title', 'description', 'amount'):
+            if not attrs.get(field):
+                default = getattr(template, 'default_amount' if field == 'amount' else field, None)
+                if default in ('', None):
+                    raise serializers.ValidationError({field: 'Обязательное поле'})
+                attrs[field] = default
+        return attrs
+
+class TaskImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    template_id = serializers.IntegerField(required=False, allow_null=True)
+
+class BulkContractSerializer(serializers.Serializer):
+    """Список заданий для массового формирования договоров"""
+    task_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500
+    )
+
+class BulkSignSerializer(serializers.Serializer):
+    """Задания, договоры и акты которых подписываются одним запросом"""
+    contracts = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500
+    )
+    acts = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500
+    )
+
+    def validate(self, attrs):
+        if not attrs['contracts'] and not attrs['acts']:
+            raise serializers.ValidationError('Укажите contracts или acts')
+        return attrs
+
+class TaskBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'status']
+        read_only_fields = fields
+
+class CounterpartyMixin:
+    """Вторая сторона документа относительно текущего пользователя"""
+    
+    def get_counterparty(self, obj):
+        employer, freelancer = self.get_parties(obj)
+        user = self.context['request'].user
+        other = freelancer if user.id == employer.id else employer
+        return UserSerializer(other).data if other else None
+
+class ContractInboxSerializer(CounterpartyMixin, serializers.ModelSerializer):
+    task = TaskBriefSerializer(read_only=True)
+    counterparty = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Contract
+        fields = ['id', 'contract_number', 'task', 'counterparty', 'amount', 'status', 'created_at']
+        read_only_fields = fields
+    
+    def get_parties(self, obj):
+        return obj.employer, obj.freelancer
+
+class ActInboxSerializer(CounterpartyMixin, serializers.ModelSerializer):
+    task = TaskBriefSerializer(read_only=True)
+    contract_number = serializers.CharField(source='contract.contract_number', read_only=True)
+    counterparty = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Act
+        fields = ['id', 'act_number', 'contract_number', 'task', 'counterparty', 'amount', 'status', 'created_at']
+        read_only_fields = fields
+    
+    def get_parties(self, obj):
+        return obj.task.employer, obj.task.freelancer
+
+class PeriodSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError({'date_to': 'Конец периода раньше начала'})
+        return attrs
+
+class ExportParamsSerializer(PeriodSerializer):
+    """Параметры выгрузки: формат (не "format" - его занимает DRF), период по created_at, статус"""
+    file_format = serializers.ChoiceField(choices=['csv', 'xlsx'], default='csv')
+    status = serializers.CharField(required=False, max_length=20)
+
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
@@ -104,7 +227,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = ['id', 'task', 'freelancer', 'amount', 'status', 'status_display', 
                  'created_at', 'processed_at']
-        read_only_fields = ['id', 'created_at', 'processed_at']Add ReviewSerializer for task feedback and freelancer rating
+        read_only_fields = ['id', 'created_at', 'processed_at']
 
 class TransactionSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
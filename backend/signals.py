@@ -0,0 +1,120 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from users.models import User
+
+from . import cache as task_cache
+from . import search
+from .authentication import invalidate_users
+from .models import Task, Contract, Act, Review, RatingSummary, Transaction, Balance
+
+
+def _task_scopes(*user_ids):
+    return [task_cache.user_scope(user_id) for user_id in set(user_ids) if user_id]
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_cache(sender, instance, **kwargs):
+    """Сбрасывает кэш участников задания и маркетплейса, если задание в нем было или стало"""
+    loaded = getattr(instance, '_loaded_values', {})
+    scopes = _task_scopes(
+        instance.employer_id, instance.freelancer_id, loaded.get('freelancer_id')
+    )
+    if instance.status == 'new' or loaded.get('status') == 'new':
+        scopes.append(task_cache.MARKET_SCOPE)
+    task_cache.bump_on_commit(*scopes)
+
+
+@receiver(post_save, sender=Task)
+def update_task_search_vector(sender, instance, created, **kwargs):
+    """Пересчитывает search_vector, если изменились заголовок или описание"""
+    loaded = getattr(instance, '_loaded_values', {})
+    if not created and (loaded.get('title'), loaded.get('description')) == (instance.title, instance.description):
+        return
+    search.update_search_vector(Task.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def invalidate_contract_cache(sender, instance, **kwargs):
+    task_cache.bump_on_commit(*_task_scopes(instance.employer_id, instance.freelancer_id))
+
+
+@receiver(post_save, sender=Act)
+@receiver(post_delete, sender=Act)
+def invalidate_act_cache(sender, instance, **kwargs):
+    participants = Task.objects.filter(pk=instance.task_id).values_list('employer_id', 'freelancer_id').first()
+    if participants:
+        task_cache.bump_on_commit(*_task_scopes(*participants))
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитывает новую оценку; при изменении отзыва сначала вычитает прежнюю"""
+    loaded = getattr(instance, '_loaded_values', {})
+    if not created:
+        old = (loaded.get('freelancer_id'), loaded.get('rating'))
+        if old == (instance.freelancer_id, instance.rating):
+            return
+        if all(old):
+            RatingSummary.apply(*old, sign=-1)
+    RatingSummary.apply(instance.freelancer_id, instance.rating)
+    instance._loaded_values = {'freelancer_id': instance.freelancer_id, 'rating': instance.rating}
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    RatingSummary.apply(instance.freelancer_id, instance.rating, sign=-1)
+
+
+BALANCE_FIELDS = ('status', 'user_id', 'transaction_type', 'amount')
+
+
+def _add_balance_delta(deltas, values, sign):
+    """Вклад завершенной транзакции (словарь полей BALANCE_FIELDS) в баланс"""
+    if values.get('status') != 'completed':
+        return
+    delta = sign * Balance.signed(values['transaction_type'], values['amount'])
+    deltas[values['user_id']] = deltas.get(values['user_id'], 0) + delta
+
+
+@receiver(post_save, sender=Transaction)
+def update_balance_on_save(sender, instance, created, **kwargs):
+    """
+    Учитывает в балансе изменение транзакции через save(): переход в completed,
+    а также правку суммы, типа, пользователя или статуса завершенной транзакции
+    (прежний вклад вычитается, новый прибавляется)
+    """
+    loaded = getattr(instance, '_loaded_values', {})
+    current = {field: getattr(instance, field) for field in BALANCE_FIELDS}
+    deltas = {}
+    if not created and 'status' in loaded:
+        # Поля, не загруженные из БД (only/defer), считаются неизменными
+        _add_balance_delta(deltas, {field: loaded.get(field, current[field]) for field in BALANCE_FIELDS}, -1)
+    _add_balance_delta(deltas, current, 1)
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if deltas:
+        Balance.apply(deltas)
+    instance._loaded_values = {**loaded, **current}
+
+
+@receiver(post_delete, sender=Transaction)
+def update_balance_on_delete(sender, instance, origin=None, **kwargs):
+    """Удаление завершенной транзакции вычитает ее вклад из баланса"""
+    if isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        # Удаляется сам пользователь - снимок баланса удаляется вместе с ним
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    values = {field: loaded.get(field, getattr(instance, field)) for field in BALANCE_FIELDS}
+    deltas = {}
+    _add_balance_delta(deltas, values, -1)
+    if deltas:
+        Balance.apply(deltas)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user(sender, instance, **kwargs):
+    """Сбрасывает кэш пользователя для CachedJWTAuthentication (роли, пароль, is_active)"""
+    invalidate_users(instance.pk)
@@ -0,0 +1,89 @@
+import codecs
+import csv
+import time
+
+from django.db import transaction
+
+from . import cache as task_cache
+from . import search
+from .models import Task
+from .serializers import TaskImportRowSerializer
+
+
+# Сколько строк вставляется одним bulk_create
+IMPORT_CHUNK_SIZE = 500
+# Ошибок в ответе не больше этого числа, остальные только считаются
+MAX_REPORTED_ERRORS = 100
+
+
+def bulk_create_tasks(tasks):
+    """
+    Вставляет задания одним bulk_create. bulk_create не вызывает сигналы,
+    поэтому search_vector и кэш заданий обновляются здесь же.
+    """
+    if not tasks:
+        return tasks
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        search.update_search_vector(Task.objects.filter(pk__in=[task.pk for task in tasks]))
+    task_cache.bump(*{task_cache.user_scope(task.employer_id) for task in tasks})
+    if any(task.status == 'new' for task in tasks):
+        task_cache.bump(task_cache.MARKET_SCOPE)
+    return tasks
+
+
+def create_from_template(template, count, amount=None, deadline=None):
+    """N черновиков по шаблону"""
+    tasks = [
+        Task(
+            employer_id=template.employer_id, template=template, title=template.title,
+            description=template.description,
+            amount=amount if amount is not None else template.default_amount,
+            deadline=deadline
+        )
+        for _ in range(count)
+    ]
+    return bulk_create_tasks(tasks)
+
+
+def import_csv(file, employer, template=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Импорт заданий из CSV (колонки title, description, amount, deadline).
+    Файл читается построчно, валидные строки вставляются пачками по chunk_size,
+    поэтому в памяти одновременно не больше одной пачки.
+    Возвращает отчет: создано, ошибки по номерам строк, время и строк в секунду.
+    """
+    started = time.perf_counter()
+    created = rows = failed = 0
+    errors = []
+    chunk = []
+
+    # utf-8-sig: файлы из Excel начинаются с BOM
+    reader = csv.DictReader(codecs.iterdecode(file, 'utf-8-sig'))
+    try:
+        for line, row in enumerate(reader, start=2):
+            rows += 1
+            serializer = TaskImportRowSerializer(data=row, context={'template': template})
+            if not serializer.is_valid():
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': line, 'errors': serializer.errors})
+                continue
+            chunk.append(Task(employer=employer, template=template, **serializer.validated_data))
+            if len(chunk) >= chunk_size:
+                created += len(bulk_create_tasks(chunk))
+                chunk = []
+    except (UnicodeDecodeError, csv.Error) as exc:
+        failed += 1
+        errors.append({'row': reader.line_num, 'errors': {'file': [str(exc)]}})
+    created += len(bulk_create_tasks(chunk))
+
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': rows,
+        'created': created,
+        'failed': failed,
+        'errors': errors,
+        'elapsed': round(elapsed, 3),
+        'rows_per_sec': round(rows / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,333 @@
+import logging
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from celery import group, shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import User
+
+from .models import Contract, Act, Balance, Payment, Transaction
+from .document_storage import render_act, render_contract
+from .payouts import get_payout_gateway, idempotency_key
+from .rollups import update_rollups
+
+
+logger = logging.getLogger(__name__)
+
+# Сколько договоров рендерит одна задача при массовом формировании
+CONTRACT_BATCH_CHUNK_SIZE = 25
+
+
+def _enqueue(task, document):
+    """Ставит формирование PDF в очередь после коммита и возвращает id задачи Celery"""
+    job_id = str(uuid.uuid4())
+    # updated_at - начало формирования, по нему находятся зависшие документы
+    type(document).objects.filter(pk=document.pk).update(
+        status='generating', generation_task_id=job_id, generation_error='', updated_at=timezone.now()
+    )
+    document.status = 'generating'
+    document.generation_task_id = job_id
+    document.generation_error = ''
+    transaction.on_commit(lambda: task.apply_async(args=[document.pk], task_id=job_id))
+    return job_id
+
+
+def _stall_cutoff():
+    return timezone.now() - timedelta(seconds=settings.DOCUMENT_GENERATION_TIMEOUT)
+
+
+def can_regenerate(document):
+    """Формирование можно запустить заново после ошибки или если воркер пропал, не записав результат"""
+    if document.status == 'generation_failed':
+        return True
+    return document.status == 'generating' and document.updated_at < _stall_cutoff()
+
+
+def enqueue_contract_generation(contract):
+    """Запускает фоновое формирование PDF договора"""
+    return _enqueue(generate_contract_pdf, contract)
+
+
+def enqueue_contract_batch(contracts):
+    """
+    Сохраняет договоры одним bulk_create и ставит формирование PDF в очередь пачками.
+    Пачки выполняются параллельно воркерами Celery (prefork - пул процессов),
+    id пачки записывается в generation_task_id каждого договора.
+    """
+    if not contracts:
+        return contracts
+
+    chunks = []
+    for start in range(0, len(contracts), CONTRACT_BATCH_CHUNK_SIZE):
+        job_id = str(uuid.uuid4())
+        chunk = contracts[start:start + CONTRACT_BATCH_CHUNK_SIZE]
+        for contract in chunk:
+            contract.status = 'generating'
+            contract.generation_task_id = job_id
+        chunks.append((job_id, chunk))
+
+    Contract.objects.bulk_create(contracts)
+
+    jobs = group(
+        render_contract_batch.s([contract.pk for contract in chunk]).set(task_id=job_id)
+        for job_id, chunk in chunks
+    )
+    transaction.on_commit(jobs.apply_async)
+    return contracts
+
+
+def enqueue_act_generation(act):
+    """Запускает фоновое формирование PDF акта"""
+    return _enqueue(generate_act_pdf, act)
+
+
+def _render(document, render):
+    try:
+        render(document)
+    except Exception as exc:
+        type(document).objects.filter(pk=document.pk).update(
+            status='generation_failed', generation_error=str(exc), updated_at=timezone.now()
+        )
+        raise
+    document.status = 'pending_signature'
+    document.generation_error = ''
+    document.save(update_fields=[
+        'pdf_file', 'pdf_sha256', 'input_hash', 'status', 'generation_error', 'updated_at'
+    ])
+
+
+@shared_task
+def generate_contract_pdf(contract_id):
+    """Формирует PDF договора и переводит его в статус ожидания подписи"""
+    contract = Contract.objects.select_related('employer', 'freelancer').get(pk=contract_id)
+    _render(contract, render_contract)
+
+
+@shared_task
+def generate_act_pdf(act_id):
+    """Формирует PDF акта и переводит его в статус ожидания подписи"""
+    act = Act.objects.select_related('contract').get(pk=act_id)
+    _render(act, render_act)
+
+
+@shared_task
+def render_contract_batch(contract_ids):
+    """Формирует PDF для пачки договоров; ошибка одного договора не останавливает остальные"""
+    contracts = Contract.objects.select_related('employer', 'freelancer').filter(pk__in=contract_ids)
+    rendered = []
+    failed = {}
+    for contract in contracts:
+        try:
+            render_contract(contract)
+        except Exception as exc:
+            failed[contract.pk] = str(exc)
+            continue
+        contract.status = 'pending_signature'
+        contract.generation_error = ''
+        contract.updated_at = timezone.now()
+        rendered.append(contract)
+
+    Contract.objects.bulk_update(
+        rendered, ['pdf_file', 'pdf_sha256', 'input_hash', 'status', 'generation_error', 'updated_at']
+    )
+    for pk, error in failed.items():
+        Contract.objects.filter(pk=pk).update(
+            status='generation_failed', generation_error=error, updated_at=timezone.now()
+        )
+    return {'rendered': len(rendered), 'failed': failed}
+
+
+@shared_task
+def reap_stalled_generations():
+    """Переводит зависшие в generating договоры и акты в generation_failed"""
+    cutoff = _stall_cutoff()
+    reaped = 0
+    for model in (Contract, Act):
+        reaped += model.objects.filter(status='generating', updated_at__lt=cutoff).update(
+            status='generation_failed', generation_error='Превышено время формирования',
+            updated_at=timezone.now()
+        )
+    if reaped:
+        logger.warning('Stalled document generations marked as failed: %s', reaped)
+    return reaped
+
+
+@shared_task
+def reconcile_balances(fix=False):
+    """
+    Сверяет снимки Balance с журналом завершенных транзакций.
+    Расхождения пишутся в лог; с fix=True снимок перезаписывается значением из журнала.
+    """
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    ledger = (
+        Transaction.objects.filter(user_id=OuterRef('user_id'), status='completed')
+        .order_by().values('user_id')
+        .annotate(total=Sum(Balance.signed_amount_expression()))
+        .values('total')
+    )
+    # Снимок и журнал читаются одним запросом - согласованно
+    mismatched = {
+        user_id: (amount, expected)
+        for user_id, amount, expected in Balance.objects.annotate(
+            expected=Coalesce(Subquery(ledger), zero)
+        ).exclude(amount=F('expected')).values_list('user_id', 'amount', 'expected')
+    }
+    missing = User.objects.filter(transactions__status='completed', balance__isnull=True).distinct()
+    for user_id in missing.values_list('id', flat=True):
+        mismatched[user_id] = (None, None)
+
+    for user_id, (amount, expected) in mismatched.items():
+        logger.warning('Баланс пользователя %s расходится с журналом: снимок %s, журнал %s',
+                       user_id, amount, expected)
+
+    if fix and mismatched:
+        with transaction.atomic():
+            # Снимки блокируются (в порядке user_id, как в Balance.apply) до пересчета:
+            # параллельный Balance.apply ждет, а не теряет свое приращение
+            balances = {
+                balance.user_id: balance
+                for balance in Balance.objects.filter(user_id__in=mismatched)
+                .order_by('user_id').select_for_update()
+            }
+            totals = dict(
+                Transaction.objects.filter(user_id__in=mismatched, status='completed')
+                .order_by().values('user_id')
+                .annotate(total=Sum(Balance.signed_amount_expression()))
+                .values_list('user_id', 'total')
+            )
+            now = timezone.now()
+            for user_id, balance in balances.items():
+                balance.amount = totals.get(user_id, Decimal('0'))
+                balance.updated_at = now
+            Balance.objects.bulk_update(balances.values(), ['amount', 'updated_at'])
+            Balance.objects.bulk_create(
+                [Balance(user_id=user_id, amount=total) for user_id, total in totals.items()
+                 if user_id not in balances],
+                ignore_conflicts=True,
+            )
+    return {str(user_id): [str(amount), str(expected)] for user_id, (amount, expected) in mismatched.items()}
+
+
+def claim_pending_payments(batch_size):
+    """
+    Забирает пачку pending-выплат: SELECT ... FOR UPDATE SKIP LOCKED и перевод в processing.
+    Строки, заблокированные другим воркером, пропускаются, поэтому параллельные
+    воркеры получают непересекающиеся пачки.
+    """
+    with transaction.atomic():
+        ids = list(
+            Payment.objects.filter(status='pending').order_by('created_at')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            Payment.objects.filter(id__in=ids).update(status='processing', updated_at=timezone.now())
+    return ids
+
+
+def _settle_payments(payments, results):
+    """
+    Сохраняет результат шлюза: статусы выплат и транзакции оплаты заданий.
+    Учитываются только выплаты, которые все еще в processing: если выплату
+    вернул в очередь reap_stuck_payments и ее уже провел другой воркер,
+    повторно она не проводится и баланс не списывается.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Блокировка строк: параллельный воркер с той же выплатой ждет и затем видит новый статус
+        processing = set(
+            Payment.objects.filter(id__in=[p['id'] for p in payments], status='processing')
+            .select_for_update().values_list('id', flat=True)
+        )
+        paid, failed = [], []
+        for payment in payments:
+            if payment['id'] not in processing:
+                continue
+            (paid if payment['id'] in results and results[payment['id']] is None else failed).append(payment)
+
+        Payment.objects.filter(id__in=[p['id'] for p in paid]).update(
+            status='completed', processed_at=now, updated_at=now, failure_reason=''
+        )
+        # Один UPDATE на каждый текст ошибки, а не на каждую выплату
+        by_reason = {}
+        for payment in failed:
+            by_reason.setdefault(results.get(payment['id']) or 'Нет ответа шлюза', []).append(payment['id'])
+        for reason, ids in by_reason.items():
+            Payment.objects.filter(id__in=ids).update(
+                status='failed', processed_at=now, updated_at=now, failure_reason=reason
+            )
+        # Оплата задания списывается с баланса работодателя
+        Transaction.objects.bulk_create([
+            Transaction(
+                user_id=p['task__employer_id'], transaction_type='payment', amount=p['amount'],
+                status='completed', task_id=p['task_id'], processed_at=now,
+                description=f'Выплата #{p["id"]} исполнителю'
+            )
+            for p in paid
+        ])
+        deltas = {}
+        for p in paid:
+            user_id = p['task__employer_id']
+            deltas[user_id] = deltas.get(user_id, 0) + Balance.signed('payment', p['amount'])
+        Balance.apply(deltas)
+    return len(paid), len(failed)
+
+
+@shared_task
+def process_pending_payments(batch_size=None, max_batches=None):
+    """Обрабатывает очередь выплат пачками до ее опустошения; можно запускать на нескольких воркерах"""
+    batch_size = batch_size or settings.PAYOUT_BATCH_SIZE
+    gateway = get_payout_gateway()
+    processed = {'completed': 0, 'failed': 0}
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        ids = claim_pending_payments(batch_size)
+        if not ids:
+            break
+        batches += 1
+        payments = list(
+            Payment.objects.filter(id__in=ids)
+            .values('id', 'freelancer_id', 'amount', 'task_id', 'task__employer_id')
+        )
+        for payment in payments:
+            payment['idempotency_key'] = idempotency_key(payment['id'])
+        try:
+            results = gateway.payout(payments)
+        except Exception as exc:
+            logger.exception('Ошибка шлюза выплат')
+            results = {p['id']: str(exc) for p in payments}
+        completed, failed = _settle_payments(payments, results)
+        processed['completed'] += completed
+        processed['failed'] += failed
+
+    return processed
+
+
+@shared_task
+def reap_stuck_payments():
+    """
+    Возвращает в очередь выплаты, зависшие в processing (воркер упал между
+    claim_pending_payments и _settle_payments). Повторная отправка безопасна:
+    id выплаты - ключ идемпотентности шлюза.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.PAYOUT_PROCESSING_TIMEOUT)
+    reaped = Payment.objects.filter(status='processing', updated_at__lt=cutoff).update(
+        status='pending', updated_at=timezone.now()
+    )
+    if reaped:
+        logger.warning('Stuck payouts returned to the queue: %s', reaped)
+    return reaped
+
+
+@shared_task
+def update_daily_rollups():
+    """Досчитывает дневные сводки дашбордов от сохраненных отметок (запускается beat)"""
+    return update_rollups()
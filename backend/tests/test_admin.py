@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты админки больших таблиц
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from backend import cache as task_cache
+from backend.admin_base import EstimatedCountPaginator, estimate_count
+from backend.models import Task, Transaction
+
+User = get_user_model()
+
+
+class LargeTableAdminTest(TestCase):
+    """Тесты LargeTableAdmin на списках транзакций и заданий"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.client.force_login(self.admin)
+
+    def _changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow(self):
+        """Тест: пользователи в списке транзакций подгружаются JOIN-ом"""
+        url = reverse('admin:backend_transaction_changelist')
+        Transaction.objects.create(user=self.employer, transaction_type='deposit', amount=100)
+        baseline = self._changelist_queries(url)
+
+        for i in range(10):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com')
+            Transaction.objects.create(user=user, transaction_type='deposit', amount=100)
+
+        self.assertEqual(self._changelist_queries(url), baseline)
+
+    def test_action_reports_updated_rows(self):
+        """Тест: действие сообщает число строк из update(), а не пересчитывает выборку"""
+        tasks = [
+            Task.objects.create(title=f'Task {i}', description='D', amount=100,
+                                employer=self.employer, status='new')
+            for i in range(3)
+        ]
+        response = self.client.post(reverse('admin:backend_task_changelist'), {
+            'action': 'mark_completed',
+            '_selected_action': [task.pk for task in tasks],
+        })
+
+        messages = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertIn('Завершено заданий: 3', messages)
+        self.assertEqual(Task.objects.filter(status='completed').count(), 3)
+
+    def test_exact_count_below_threshold(self):
+        """Тест: маленькие выборки считаются точно"""
+        for i in range(3):
+            Transaction.objects.create(user=self.employer, transaction_type='deposit', amount=100)
+        queryset = Transaction.objects.all()
+
+        if connection.vendor != 'postgresql':
+            self.assertIsNone(estimate_count(queryset))
+        self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 3)
+
+    def test_approve_publishes_drafts(self):
+        """Тест: одобрение переводит черновики в статус new (маркетплейс)"""
+        draft = Task.objects.create(title='Draft', description='D', amount=100,
+                                    employer=self.employer, status='draft')
+        self.client.post(reverse('admin:backend_task_changelist'), {
+            'action': 'approve_tasks', '_selected_action': [draft.pk],
+        })
+        draft.refresh_from_db()
+        self.assertEqual(draft.status, 'new')
+
+    def test_actions_invalidate_task_cache(self):
+        """Тест: массовые действия сбрасывают кэш заданий участников и маркетплейса"""
+        task = Task.objects.create(title='Task', description='D', amount=100,
+                                   employer=self.employer, status='new')
+        scopes = [task_cache.MARKET_SCOPE, task_cache.user_scope(self.employer.pk)]
+        before = task_cache.get_versions(scopes)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:backend_task_changelist'), {
+                'action': 'reject_tasks', '_selected_action': [task.pk],
+            })
+        after = task_cache.get_versions(scopes)
+        self.assertTrue(all(new != old for new, old in zip(after, before)))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты кэша пользователя в JWT-аутентификации
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from backend.authentication import invalidate_users
+from backend.tests.utils import reset_auth_state
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    """Тесты CachedJWTAuthentication"""
+
+    def setUp(self):
+        reset_auth_state()
+        self.addCleanup(reset_auth_state)
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = reverse('transaction-balance')
+
+    def _users_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query['sql'] for query in queries if '"users"' in query['sql']]
+
+    def test_user_resolved_from_cache(self):
+        """Тест: таблица users читается только при первом запросе"""
+        self.assertEqual(len(self._users_queries()), 1)
+        self.assertEqual(self._users_queries(), [])
+
+    def test_profile_change_invalidates(self):
+        """Тест: save() пользователя сбрасывает кэш"""
+        self._users_queries()
+        self.user.is_freelancer = True
+        self.user.save()
+        self.assertEqual(len(self._users_queries()), 1)
+
+    def test_admin_deactivation(self):
+        """Тест: деактивация в админке сразу закрывает доступ"""
+        self._users_queries()
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pass')
+        self.client.force_login(admin)
+        self.client.post(reverse('admin:users_user_changelist'), {
+            'action': 'deactivate_users', '_selected_action': [self.user.pk],
+        })
+        self.client.logout()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_without_invalidation_is_cached(self):
+        """Тест: update() в обход сигналов виден только после invalidate_users"""
+        self._users_queries()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        invalidate_users(self.user.pk)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты снимков баланса
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Transaction, Balance
+from backend.tasks import reconcile_balances
+
+User = get_user_model()
+
+
+class BalanceSnapshotTest(APITestCase):
+    """Тесты Balance и TransactionQuerySet.complete"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='finance', email='finance@example.com', password='pass')
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_complete_updates_balance(self):
+        """Тест: массовое одобрение транзакций обновляет снимок"""
+        Transaction.objects.create(user=self.user, amount=Decimal('1000.00'), transaction_type='deposit')
+        Transaction.objects.create(user=self.user, amount=Decimal('300.00'), transaction_type='payout')
+        Transaction.objects.create(
+            user=self.user, amount=Decimal('50.00'), transaction_type='deposit', status='failed'
+        )
+
+        approved = Transaction.objects.all().complete()
+
+        self.assertEqual(approved, 2)
+        self.assertEqual(Balance.objects.get(user=self.user).amount, Decimal('700.00'))
+        # Повторное одобрение ничего не меняет
+        self.assertEqual(Transaction.objects.all().complete(), 0)
+        self.assertEqual(Balance.objects.get(user=self.user).amount, Decimal('700.00'))
+
+    def test_save_to_completed_updates_balance(self):
+        """Тест: перевод одной транзакции в completed через save()"""
+        tx = Transaction.objects.create(user=self.user, amount=Decimal('500.00'), transaction_type='deposit')
+        tx = Transaction.objects.get(pk=tx.pk)
+        tx.status = 'completed'
+        tx.save()
+        tx.save()
+        self.assertEqual(Balance.objects.get(user=self.user).amount, Decimal('500.00'))
+
+    def test_balance_endpoint(self):
+        """Тест: баланс читается одним запросом"""
+        Transaction.objects.create(
+            user=self.user, amount=Decimal('750.50'), transaction_type='deposit', status='completed'
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('transaction-balance'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['balance'], Decimal('750.50'))
+
+    def test_reconcile_finds_and_fixes_drift(self):
+        """Тест: сверка находит расхождение и исправляет его"""
+        Transaction.objects.create(
+            user=self.user, amount=Decimal('100.00'), transaction_type='deposit', status='completed'
+        )
+        self.assertEqual(reconcile_balances(), {})
+
+        Balance.objects.filter(user=self.user).update(amount=Decimal('999.00'))
+        mismatches = reconcile_balances(fix=True)
+
+        self.assertIn(str(self.user.id), mismatches)
+        self.assertEqual(Balance.objects.get(user=self.user).amount, Decimal('100.00'))
+        self.assertEqual(reconcile_balances(), {})
+
+    def test_reconcile_updates_snapshot_in_place(self):
+        """Тест: сверка исправляет существующий снимок, не пересоздавая его"""
+        balance = Balance.objects.create(user=self.user, amount=Decimal('42.00'))
+        reconcile_balances(fix=True)
+        fixed = Balance.objects.get(user=self.user)
+        self.assertEqual(fixed.pk, balance.pk)
+        self.assertEqual(fixed.amount, Decimal('0.00'))
+
+    def test_edit_and_delete_completed_transaction(self):
+        """Тест: правка и удаление завершенной транзакции меняют снимок"""
+        tx = Transaction.objects.create(
+            user=self.user, amount=Decimal('100.00'), transaction_type='deposit', status='completed'
+        )
+        tx = Transaction.objects.get(pk=tx.pk)
+        tx.amount = Decimal('250.00')
+        tx.save()
+        self.assertEqual(Balance.objects.get(user=self.user).amount, Decimal('250.00'))
+
+        tx.transaction_type = 'payout'
+        tx.save()
+        self.assertEqual(Balance.objects.get(user=self.user).amount, Decimal('-250.00'))
+
+        Transaction.objects.get(pk=tx.pk).delete()
+        self.assertEqual(Balance.objects.get(user=self.user).amount, Decimal('0.00'))
+        self.assertEqual(reconcile_balances(), {})
+
+    def test_delete_user_with_completed_transactions(self):
+        """Тест: удаление пользователя не пересоздает его снимок баланса"""
+        Transaction.objects.create(
+            user=self.user, amount=Decimal('100.00'), transaction_type='deposit', status='completed'
+        )
+        self.user.delete()
+        self.assertFalse(Balance.objects.exists())
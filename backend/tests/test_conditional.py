@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты условных GET (ETag / Last-Modified)
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task, Payment, Transaction
+
+User = get_user_model()
+
+
+class ConditionalGetTest(APITestCase):
+    """Тесты ConditionalGetMixin на заданиях, выплатах и транзакциях"""
+
+    def setUp(self):
+        # Инвалидация кэша заданий идет после коммита, а тест не коммитит - ответы прошлых тестов не нужны
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='Description', amount=1000,
+            employer=self.employer, freelancer=self.freelancer, status='in_progress'
+        )
+        self.client.force_authenticate(user=self.employer)
+
+    def test_not_modified_without_serialization(self):
+        """Тест: совпавший ETag - 304 после одного агрегатного запроса"""
+        Payment.objects.create(task=self.task, freelancer=self.freelancer, amount=1000)
+        url = reverse('payment-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_task_validators_cached(self):
+        """Тест: ETag заданий хранится под версиями кэша - 304 без запросов к БД"""
+        url = reverse('task-list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes(self):
+        """Тест: ETag меняется при изменении, удалении и с другими параметрами"""
+        url = reverse('task-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = 'Renamed'
+            self.task.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            extra = Task.objects.create(title='Extra', description='D', amount=1, employer=self.employer)
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            extra.delete()
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+        self.assertNotEqual(self.client.get(url, {'page_size': 5})['ETag'], self.client.get(url)['ETag'])
+
+    def test_retrieve(self):
+        """Тест: деталь отвечает на If-None-Match и If-Modified-Since, чужое задание - 404"""
+        url = reverse('task-detail', args=[self.task.id])
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other = User.objects.create_user(
+            username='other', email='other@example.com', password='pass', is_employer=True
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_payment_status_and_nested_task(self):
+        """Тест: ETag выплат видит смену статуса и изменение вложенного задания"""
+        payment = Payment.objects.create(task=self.task, freelancer=self.freelancer, amount=1000)
+        url = reverse('payment-list')
+        etag = self.client.get(url)['ETag']
+
+        Payment.objects.filter(pk=payment.pk).update(status='processing', updated_at=timezone.now())
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+
+        Task.objects.filter(pk=self.task.pk).update(status='completed', updated_at=timezone.now())
+        third = self.client.get(url, HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(third.status_code, status.HTTP_200_OK)
+
+    def test_transactions(self):
+        """Тест: завершение транзакции меняет ETag"""
+        Transaction.objects.create(user=self.employer, transaction_type='deposit', amount=500)
+        url = reverse('transaction-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Transaction.objects.filter(user=self.employer).complete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
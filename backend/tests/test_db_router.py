@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты чтения с реплик (backend.db_router)
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory, force_authenticate
+from rest_framework import status
+from backend import db_router
+from backend.models import Task
+from backend.views import TaskViewSet
+
+User = get_user_model()
+
+REPLICAS = ['replica_1']
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, DATABASE_REPLICA_PIN_SECONDS=5)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    """Тесты выбора базы роутером (без запросов к базе)"""
+
+    def test_reads_follow_alias(self):
+        """Тест: чтение идет в заданную базу, вне запроса API - в основную"""
+        self.assertEqual(Task.objects.all().db, 'default')
+        with db_router.read_from('replica_1'):
+            self.assertEqual(Task.objects.all().db, 'replica_1')
+            self.assertEqual(router.db_for_write(Task), 'default')
+            self.assertTrue(db_router.reading_from_replica())
+            self.assertEqual(db_router.cache_timeout(300), 5)
+        self.assertEqual(db_router.cache_timeout(300), 300)
+
+    def test_no_migrations_on_replica(self):
+        """Тест: миграции не применяются к репликам"""
+        self.assertTrue(router.allow_migrate('default', 'backend'))
+        self.assertFalse(router.allow_migrate('replica_1', 'backend'))
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, DATABASE_REPLICA_PIN_SECONDS=5)
+class ReplicaReadMixinTest(APITestCase):
+    """Тесты ReplicaReadMixin: безопасные запросы - реплика, после записи - основная база"""
+
+    def setUp(self):
+        # id пользователей в тестовой БД переиспользуются - закрепления прошлых тестов не нужны
+        cache.clear()
+        self.client = APIClient()
+        self.factory = APIRequestFactory()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='D', amount=100, employer=self.employer, status='draft'
+        )
+
+    def _read_alias(self, method):
+        request = getattr(self.factory, method)('/')
+        force_authenticate(request, user=self.employer)
+        view = TaskViewSet(action_map={'get': 'list', 'post': 'create'})
+        return view.get_read_alias(view.initialize_request(request))
+
+    def test_safe_methods_read_from_replica(self):
+        """Тест: GET читает с реплики, POST - с основной базы"""
+        self.assertEqual(self._read_alias('get'), 'replica_1')
+        self.assertEqual(self._read_alias('post'), 'default')
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self._read_alias('get'), 'default')
+
+    def test_write_pins_user_to_primary(self):
+        """Тест: после успешного изменения пользователь читает с основной базы"""
+        self.client.force_authenticate(user=self.employer)
+        response = self.client.post(reverse('task-publish', args=[self.task.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(db_router.is_pinned(self.employer.pk))
+        self.assertEqual(self._read_alias('get'), 'default')
+
+        response = self.client.get(reverse('task-detail', args=[self.task.id]))
+        self.assertEqual(response.data['status'], 'new')
+
+    def test_export_stream_reads_from_replica(self):
+        """Тест: потоковая выгрузка читает с реплики, хотя строки читаются после dispatch"""
+        self.client.force_authenticate(user=self.employer)
+        with patch('backend.exports.iter_rows', return_value=iter([])) as iter_rows:
+            response = self.client.get(reverse('payment-export'))
+            b''.join(response.streaming_content)
+        self.assertEqual(iter_rows.call_args.args[0].db, 'replica_1')
+
+    def test_failed_write_does_not_pin(self):
+        """Тест: отклоненный запрос не закрепляет пользователя"""
+        self.client.force_authenticate(user=self.employer)
+        self.client.post(reverse('task-publish', args=[self.task.id + 100]))
+        self.assertFalse(db_router.is_pinned(self.employer.pk))
+        self.assertIsNone(db_router._read_alias.get())
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты формирования договоров и актов
+"""
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task, Contract, Act, Payment, Signature
+from backend.tasks import generate_act_pdf, generate_contract_pdf, reap_stalled_generations, render_contract_batch
+from backend import document_storage, throttling
+
+User = get_user_model()
+
+
+class ContractGenerationTest(APITestCase):
+    """Тесты фонового формирования договора"""
+
+    def setUp(self):
+        # id пользователей между тестами переиспользуются - ведра ограничителя начинаем заново
+        throttling.get_buckets().clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='Description', amount=5000,
+            employer=self.employer, freelancer=self.freelancer, status='in_progress'
+        )
+        self.client.force_authenticate(user=self.employer)
+
+    def test_generate_contract_returns_job(self):
+        """Тест: эндпоинт отвечает 202 и ставит задачу в очередь"""
+        url = reverse('task-generate-contract', args=[self.task.id])
+        with patch('backend.tasks.generate_contract_pdf.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'generating')
+        contract = Contract.objects.get(task=self.task)
+        self.assertEqual(contract.generation_task_id, response.data['job_id'])
+        apply_async.assert_called_once_with(args=[contract.id], task_id=response.data['job_id'])
+
+    def test_worker_renders_contract(self):
+        """Тест: задача Celery формирует PDF и меняет статус"""
+        with patch('backend.tasks.generate_contract_pdf.apply_async'):
+            self.client.post(reverse('task-generate-contract', args=[self.task.id]))
+        contract = Contract.objects.get(task=self.task)
+
+        generate_contract_pdf(contract.id)
+
+        contract.refresh_from_db()
+        self.assertEqual(contract.status, 'pending_signature')
+        self.assertTrue(contract.pdf_file)
+
+        response = self.client.get(reverse('task-documents-status', args=[self.task.id]))
+        self.assertEqual(response.data['contract']['status'], 'pending_signature')
+        self.assertTrue(response.data['contract']['pdf_file'].endswith(
+            reverse('task-download-contract', args=[self.task.id])
+        ))
+        self.assertIsNone(response.data['act'])
+
+    def test_stalled_generation_can_be_retried(self):
+        """Тест: договор, зависший в generating после падения воркера, формируется заново"""
+        url = reverse('task-generate-contract', args=[self.task.id])
+        with patch('backend.tasks.generate_contract_pdf.apply_async'):
+            self.client.post(url)
+            self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+            started = timezone.now() - timedelta(seconds=settings.DOCUMENT_GENERATION_TIMEOUT + 1)
+            Contract.objects.filter(task=self.task).update(updated_at=started)
+            self.assertEqual(self.client.post(url).status_code, status.HTTP_202_ACCEPTED)
+
+        Contract.objects.filter(task=self.task).update(updated_at=started)
+        self.assertEqual(reap_stalled_generations(), 1)
+        contract = Contract.objects.get(task=self.task)
+        self.assertEqual(contract.status, 'generation_failed')
+        self.assertEqual(reap_stalled_generations(), 0)
+
+    def test_worker_reports_failure(self):
+        """Тест: ошибка формирования сохраняется в документе"""
+        with patch('backend.tasks.generate_contract_pdf.apply_async'):
+            self.client.post(reverse('task-generate-contract', args=[self.task.id]))
+        contract = Contract.objects.get(task=self.task)
+
+        with patch('backend.pdf_generator.PDFGenerator.generate_contract', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                generate_contract_pdf(contract.id)
+
+        contract.refresh_from_db()
+        self.assertEqual(contract.status, 'generation_failed')
+        self.assertEqual(contract.generation_error, 'boom')
+
+
+class BulkContractGenerationTest(APITestCase):
+    """Тесты массового формирования договоров"""
+
+    def setUp(self):
+        # id пользователей между тестами переиспользуются - ведра ограничителя начинаем заново
+        throttling.get_buckets().clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.tasks = [
+            Task.objects.create(
+                title=f'Task {i}', description='Description', amount=5000,
+                employer=self.employer, freelancer=self.freelancer, status='in_progress'
+            )
+            for i in range(30)
+        ]
+        self.url = reverse('task-generate-contracts')
+        self.client.force_authenticate(user=self.employer)
+
+    def test_bulk_generate_contracts(self):
+        """Тест: договоры создаются одним запросом, ответ содержит результат по каждому заданию"""
+        no_freelancer = Task.objects.create(
+            title='Open', description='Description', amount=1000, employer=self.employer, status='new'
+        )
+        task_ids = [task.id for task in self.tasks] + [no_freelancer.id, 999999]
+
+        with patch('backend.tasks.group') as group:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, {'task_ids': task_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        results = response.data['results']
+        self.assertEqual(Contract.objects.count(), 30)
+        self.assertEqual(results[self.tasks[0].id]['status'], 'generating')
+        self.assertEqual(results[no_freelancer.id], {'error': 'no freelancer'})
+        self.assertEqual(results[999999], {'error': 'not found'})
+        # 30 договоров - две пачки по 25
+        self.assertEqual(len(list(group.call_args.args[0])), 2)
+        group.return_value.apply_async.assert_called_once()
+
+    def test_existing_contract_is_reported(self):
+        """Тест: повторный запрос не создает дубликатов"""
+        with patch('backend.tasks.group'):
+            self.client.post(self.url, {'task_ids': [self.tasks[0].id]}, format='json')
+            response = self.client.post(self.url, {'task_ids': [self.tasks[0].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['results'][self.tasks[0].id], {'error': 'contract exists'})
+        self.assertEqual(Contract.objects.count(), 1)
+
+        with patch('backend.tasks.group'):
+            response = self.client.post(
+                self.url, {'task_ids': [self.tasks[0].id, self.tasks[1].id]}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['results'][self.tasks[0].id], {'error': 'contract exists'})
+        self.assertEqual(Contract.objects.count(), 2)
+
+    def test_render_contract_batch(self):
+        """Тест: воркер формирует PDF для всей пачки"""
+        with patch('backend.tasks.group'):
+            self.client.post(self.url, {'task_ids': [task.id for task in self.tasks[:3]]}, format='json')
+        contract_ids = list(Contract.objects.values_list('id', flat=True))
+
+        result = render_contract_batch(contract_ids)
+
+        self.assertEqual(result, {'rendered': 3, 'failed': {}})
+        self.assertEqual(Contract.objects.filter(status='pending_signature').count(), 3)
+
+
+class DocumentDownloadTest(APITestCase):
+    """Тесты скачивания PDF договора"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, DOCUMENT_ACCEL_PREFIX='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='Description', amount=5000,
+            employer=self.employer, freelancer=self.freelancer, status='in_progress'
+        )
+        self.contract = Contract.objects.create(
+            task=self.task, contract_number='C-1', employer=self.employer, freelancer=self.freelancer,
+            contract_date=date.today(), work_description='Работы', amount=5000,
+            deadline=date.today(), status='pending_signature'
+        )
+        self.content = b'%PDF-1.4 ' + bytes(range(256)) * 4
+        self.contract.pdf_file.save('contract_C-1.pdf', ContentFile(self.content))
+        self.url = reverse('task-download-contract', args=[self.task.id])
+        self.client.force_authenticate(user=self.freelancer)
+
+    def test_download_full_file(self):
+        """Тест: участник получает файл целиком со строгим ETag"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('contract_C-1.pdf', response['Content-Disposition'])
+
+    def test_range_request(self):
+        """Тест: Range отдает 206 с нужным куском"""
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+    def test_revalidation(self):
+        """Тест: совпавший ETag дает 304 без тела"""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_stranger_forbidden(self):
+        """Тест: чужой пользователь не может скачать договор"""
+        stranger = User.objects.create_user(
+            username='stranger', email='stranger@example.com', password='pass', is_employer=True
+        )
+        self.client.force_authenticate(user=stranger)
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND))
+
+    def test_accel_redirect(self):
+        """Тест: с DOCUMENT_ACCEL_PREFIX байты отдает nginx"""
+        with override_settings(DOCUMENT_ACCEL_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.contract.pdf_file.name}')
+        self.assertEqual(response.content, b'')
+
+
+class ContentAddressedStorageTest(APITestCase):
+    """Тесты хранения PDF по хэшу содержимого"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='Description', amount=5000,
+            employer=self.employer, freelancer=self.freelancer, status='in_progress'
+        )
+        self.contract = Contract.objects.create(
+            task=self.task, contract_number='C-1', employer=self.employer, freelancer=self.freelancer,
+            contract_date=date(2024, 1, 10), work_description='Работы', amount=5000,
+            deadline=date(2024, 2, 10), status='generating'
+        )
+
+    def test_unchanged_inputs_skip_render(self):
+        """Тест: повторное формирование с теми же данными не вызывает reportlab"""
+        generate_contract_pdf(self.contract.id)
+        self.contract.refresh_from_db()
+        name, digest = self.contract.pdf_file.name, self.contract.pdf_sha256
+        self.assertEqual(len(digest), 64)
+        self.assertIn(digest, name)
+
+        with patch('backend.pdf_generator.PDFGenerator.generate_contract') as render:
+            generate_contract_pdf(self.contract.id)
+        render.assert_not_called()
+        self.contract.refresh_from_db()
+        self.assertEqual(self.contract.pdf_file.name, name)
+
+    def test_identical_bytes_stored_once(self):
+        """Тест: одинаковый результат рендера пишется в хранилище один раз"""
+        generate_contract_pdf(self.contract.id)
+        self.contract.refresh_from_db()
+        first = self.contract.pdf_file.name
+
+        Contract.objects.filter(pk=self.contract.pk).update(input_hash='')
+        generate_contract_pdf(self.contract.id)
+        self.contract.refresh_from_db()
+        self.assertEqual(self.contract.pdf_file.name, first)
+
+        Contract.objects.filter(pk=self.contract.pk).update(amount=6000)
+        generate_contract_pdf(self.contract.id)
+        self.contract.refresh_from_db()
+        self.assertNotEqual(self.contract.pdf_file.name, first)
+
+    def test_signature_records_hash(self):
+        """Тест: подпись фиксирует хэш PDF, подмененный файл не подписывается"""
+        generate_contract_pdf(self.contract.id)
+        self.contract.refresh_from_db()
+        url = reverse('task-sign-contract', args=[self.task.id])
+        self.client.force_authenticate(user=self.freelancer)
+
+        with open(self.contract.pdf_file.path, 'ab') as file:
+            file.write(b'tampered')
+        self.assertFalse(document_storage.is_intact(self.contract))
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        Contract.objects.filter(pk=self.contract.pk).update(input_hash='')
+        generate_contract_pdf(self.contract.id)
+        self.contract.refresh_from_db()
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        signature = Signature.objects.get(document_type='contract', document_id=self.contract.id)
+        self.assertTrue(signature.matches(self.contract))
+
+    def test_sign_act_records_hash(self):
+        """Тест: подпись акта фиксирует хэш PDF и создает выплату"""
+        act = Act.objects.create(
+            task=self.task, contract=self.contract, act_number='A-1', act_date=date(2024, 2, 10),
+            work_performed='Работы', amount=5000, status='generating'
+        )
+        generate_act_pdf(act.id)
+        act.refresh_from_db()
+        self.client.force_authenticate(user=self.freelancer)
+
+        response = self.client.post(reverse('task-sign-act', args=[self.task.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        signature = Signature.objects.get(document_type='act', document_id=act.id)
+        self.assertTrue(signature.matches(act))
+        self.assertTrue(Payment.objects.filter(task=self.task, status='pending').exists())
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты выгрузки выплат и транзакций
+"""
+import csv
+import io
+import zipfile
+from datetime import timedelta
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.exports import PAYMENT_COLUMNS, iter_rows
+from backend.models import Task, Payment, Transaction
+
+User = get_user_model()
+
+
+class ExportTest(APITestCase):
+    """Тесты эндпоинтов export"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task; "quoted"', description='Description', amount=1000,
+            employer=self.employer, freelancer=self.freelancer, status='completed'
+        )
+        for i in range(5):
+            Payment.objects.create(
+                task=self.task, freelancer=self.freelancer, amount=100 + i,
+                status='completed' if i % 2 else 'pending'
+            )
+        old = Payment.objects.create(task=self.task, freelancer=self.freelancer, amount=1, status='completed')
+        Payment.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+        self.client.force_authenticate(user=self.employer)
+
+    def _csv_rows(self, response):
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(content), delimiter=';'))
+
+    def test_csv_export(self):
+        """Тест: CSV потоком, с заголовком и подписями статусов"""
+        response = self.client.get(reverse('payment-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('payments.csv', response['Content-Disposition'])
+
+        rows = self._csv_rows(response)
+        self.assertEqual(rows[0][0], 'ID')
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[-1][4], 'Task; "quoted"')
+        self.assertEqual({row[7] for row in rows[1:]}, {'Ожидает', 'Выполнено'})
+
+    def test_filters(self):
+        """Тест: период и статус"""
+        today = timezone.localdate()
+        response = self.client.get(reverse('payment-export'), {
+            'date_from': (today - timedelta(days=1)).isoformat(), 'date_to': today.isoformat(),
+            'status': 'completed',
+        })
+        self.assertEqual(len(self._csv_rows(response)), 1 + 2)
+
+        response = self.client.get(reverse('payment-export'), {'date_from': today, 'date_to': today - timedelta(days=1)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_only_own_rows(self):
+        """Тест: пользователь выгружает только свои транзакции"""
+        Transaction.objects.create(user=self.employer, transaction_type='deposit', amount=500)
+        Transaction.objects.create(user=self.freelancer, transaction_type='deposit', amount=700)
+        rows = self._csv_rows(self.client.get(reverse('transaction-export')))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][3], 'employer@example.com')
+
+    def test_xlsx_export(self):
+        """Тест: XLSX - корректный zip с листом, числа пишутся числами"""
+        response = self.client.get(reverse('payment-export'), {'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('xl/workbook.xml', archive.namelist())
+        ns = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        rows = sheet.findall('.//x:row', ns)
+        self.assertEqual(len(rows), 7)
+        amount_cell = rows[1].findall('x:c', ns)[6]
+        self.assertEqual(amount_cell.find('x:v', ns).text, '1.00')
+
+    def test_rows_read_in_keyset_chunks(self):
+        """Тест: строки читаются порциями по (created_at, id), без пропусков при равном created_at"""
+        same = timezone.now() - timedelta(days=1)
+        Payment.objects.filter(pk__in=list(Payment.objects.values_list('pk', flat=True)[:3])).update(created_at=same)
+        expected = list(Payment.objects.order_by('created_at', 'id').values_list('id', flat=True))
+
+        # 6 строк по 2: три полные порции и одна пустая
+        with self.assertNumQueries(4):
+            rows = list(iter_rows(Payment.objects.all(), PAYMENT_COLUMNS, chunk_size=2))
+        self.assertEqual([row[0] for row in rows], expected)
+        self.assertIn(rows[0][7], {'Ожидает', 'Выполнено'})
+
+    def test_csv_formulas_escaped(self):
+        """Тест: текст, похожий на формулу, экранируется; отрицательные суммы остаются числами"""
+        self.task.title = '=HYPERLINK("http://evil","x")'
+        self.task.save()
+        Transaction.objects.create(
+            user=self.employer, transaction_type='payment', amount=-500, description='@SUM(A1)'
+        )
+        rows = self._csv_rows(self.client.get(reverse('payment-export')))
+        self.assertEqual(rows[1][4], '\'=HYPERLINK("http://evil","x")')
+
+        rows = self._csv_rows(self.client.get(reverse('transaction-export')))
+        self.assertEqual(rows[1][5], '-500.00')
+        self.assertEqual(rows[1][8], "'@SUM(A1)")
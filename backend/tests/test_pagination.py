@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты keyset-пагинации ленты заданий
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task
+
+User = get_user_model()
+
+
+class TaskFeedPaginationTest(APITestCase):
+    """Тесты TaskFeedPagination"""
+
+    def setUp(self):
+        # Инвалидация кэша заданий идет после коммита, а тест не коммитит - ответы прошлых тестов не нужны
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        for i in range(45):
+            Task.objects.create(
+                title=f'Task {i}', description='Description', amount=1000,
+                employer=self.employer, status='new'
+            )
+        self.list_url = reverse('task-list')
+        self.client.force_authenticate(user=self.freelancer)
+
+    def test_cursor_walks_whole_feed(self):
+        """Тест: проход по курсорам возвращает все задания без повторов"""
+        seen = []
+        response = self.client.get(self.list_url, {'cursor': ''})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next_cursor']:
+                break
+            response = self.client.get(self.list_url, {'cursor': response.data['next_cursor']})
+
+        self.assertEqual(len(seen), 45)
+        self.assertEqual(len(set(seen)), 45)
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_count_opt_out(self):
+        """Тест: count=false убирает COUNT(*) из ответа"""
+        response = self.client.get(self.list_url, {'cursor': ''})
+        self.assertEqual(response.data['count'], 45)
+
+        response = self.client.get(self.list_url, {'cursor': '', 'count': 'false'})
+        self.assertNotIn('count', response.data)
+        # Лента исполнителя - две ветки (свои задания и открытые), по запросу на ветку
+        with self.assertNumQueries(2):
+            self.client.get(self.list_url, {'cursor': response.data['next_cursor'], 'count': 'false'})
+
+        self.client.force_authenticate(user=self.employer)
+        response = self.client.get(self.list_url, {'cursor': '', 'count': 'false'})
+        with self.assertNumQueries(1) as queries:
+            self.client.get(self.list_url, {'cursor': response.data['next_cursor'], 'count': 'false'})
+        self.assertIn('("tasks"."created_at", "tasks"."id") <', queries.captured_queries[0]['sql'])
+
+    def test_branches_merged_in_order(self):
+        """Тест: свои задания исполнителя и открытые задания идут в одной ленте по дате"""
+        for i in range(0, 45, 7):
+            Task.objects.filter(title=f'Task {i}').update(status='in_progress', freelancer=self.freelancer)
+        Task.objects.filter(title='Task 3').update(status='cancelled')
+
+        seen = []
+        response = self.client.get(self.list_url, {'cursor': ''})
+        while True:
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next_cursor']:
+                break
+            response = self.client.get(self.list_url, {'cursor': response.data['next_cursor']})
+
+        expected = list(
+            Task.objects.exclude(title='Task 3').order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_search_with_cursor_rejected(self):
+        """Тест: поиск q не сочетается с курсором - порядок по релевантности не потеряется молча"""
+        response = self.client.get(self.list_url, {'cursor': '', 'q': 'Task'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cursor', response.data)
+
+    def test_invalid_cursor(self):
+        """Тест: битый курсор дает 404"""
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_still_works(self):
+        """Тест: без cursor пагинация по номеру страницы не изменилась"""
+        response = self.client.get(self.list_url, {'page': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 45)
+        self.assertEqual(len(response.data['results']), 5)
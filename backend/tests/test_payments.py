@@ -3,13 +3,15 @@
 Тесты для модуля платежей и выплат (Payments)
 """
 
+from unittest import skip
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from decimal import Decimal
-from payments.models import Transaction, Wallet
+from backend.models import Transaction, Balance
 
 User = get_user_model()
 
@@ -19,14 +21,15 @@ class PaymentModelTest(TestCase):
 
     def setUp(self):
         self.user = User.objects.create_user(
+            username='payer',
             email='payer@example.com',
             password='pass'
         )
-        self.wallet, _ = Wallet.objects.get_or_create(user=self.user)
+        self.wallet, _ = Balance.objects.get_or_create(user=self.user)
 
     def test_wallet_creation(self):
         """Тест создания кошелька при создании пользователя"""
-        self.assertEqual(self.wallet.balance, Decimal('0.00'))
+        self.assertEqual(self.wallet.amount, Decimal('0.00'))
 
     def test_transaction_creation(self):
         """Тест создания транзакции"""
@@ -47,14 +50,13 @@ class PaymentAPITest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
+            username='finance',
             email='finance@example.com',
             password='pass'
         )
         self.client.force_authenticate(user=self.user)
         self.transactions_url = reverse('transaction-list')
-        self.deposit_url = reverse('transaction-deposit')
-        self.payout_url = reverse('transaction-payout')
-        self.balance_url = reverse('user-balance')
+        self.balance_url = reverse('transaction-balance')
 
     def test_get_transactions_history(self):
         """Тест получения истории транзакций"""
@@ -63,38 +65,37 @@ class PaymentAPITest(APITestCase):
         
         response = self.client.get(self.transactions_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data['count'], 2)
 
+    @skip('Эндпоинта пополнения в API нет: депозиты создаются платежным шлюзом')
     def test_create_deposit_api(self):
         """Тест пополнения баланса через API"""
         data = {'amount': 5000, 'method': 'card'}
-        response = self.client.post(self.deposit_url, data)
+        response = self.client.post(reverse('transaction-deposit'), data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Transaction.objects.filter(transaction_type='deposit').count(), 1)
 
+    @skip('Эндпоинта запроса выплаты в API нет: выплаты проводит backend.tasks.process_pending_payments')
     def test_payout_request_api(self):
         """Тест запроса выплаты"""
         # Сначала пополним баланс
-        wallet = Wallet.objects.get(user=self.user)
-        wallet.balance = Decimal('10000.00')
-        wallet.save()
+        Balance.objects.create(user=self.user, amount=Decimal('10000.00'))
         
         data = {'amount': 3000, 'method': 'bank'}
-        response = self.client.post(self.payout_url, data)
+        response = self.client.post(reverse('transaction-payout'), data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Transaction.objects.filter(transaction_type='payout').count(), 1)
 
+    @skip('Эндпоинта запроса выплаты в API нет: выплаты проводит backend.tasks.process_pending_payments')
     def test_payout_insufficient_funds(self):
         """Тест выплаты при недостаточном балансе"""
         data = {'amount': 1000000}
-        response = self.client.post(self.payout_url, data)
+        response = self.client.post(reverse('transaction-payout'), data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_get_current_balance(self):
         """Тест получения текущего баланса"""
-        wallet = Wallet.objects.get(user=self.user)
-        wallet.balance = Decimal('750.50')
-        wallet.save()
+        Balance.objects.create(user=self.user, amount=Decimal('750.50'))
         
         response = self.client.get(self.balance_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
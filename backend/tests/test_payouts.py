@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты обработки очереди выплат
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from backend.models import Task, Payment, Transaction, Balance
+from backend.payouts import FakePayoutGateway, idempotency_key
+from backend.tasks import (
+    process_pending_payments, claim_pending_payments, reap_stuck_payments, _settle_payments
+)
+
+User = get_user_model()
+
+
+class PayoutWorkerTest(TestCase):
+    """Тесты process_pending_payments"""
+
+    def setUp(self):
+        FakePayoutGateway.sent.clear()
+        FakePayoutGateway.keys.clear()
+        FakePayoutGateway.fail_ids = set()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.payments = []
+        for i in range(5):
+            task = Task.objects.create(
+                title=f'Task {i}', description='Description', amount=1000,
+                employer=self.employer, freelancer=self.freelancer, status='completed'
+            )
+            self.payments.append(
+                Payment.objects.create(task=task, freelancer=self.freelancer, amount=Decimal('1000.00'))
+            )
+
+    def test_drains_queue_in_batches(self):
+        """Тест: очередь обрабатывается пачками, каждая выплата отправляется один раз"""
+        FakePayoutGateway.fail_ids = {self.payments[0].id}
+
+        result = process_pending_payments(batch_size=2)
+
+        self.assertEqual(result, {'completed': 4, 'failed': 1})
+        self.assertEqual(sorted(FakePayoutGateway.sent), sorted(p.id for p in self.payments[1:]))
+        self.assertEqual(Payment.objects.filter(status='completed', processed_at__isnull=False).count(), 4)
+        failed = Payment.objects.get(status='failed')
+        self.assertTrue(failed.failure_reason)
+        self.assertEqual(Transaction.objects.filter(transaction_type='payment', status='completed').count(), 4)
+        self.assertEqual(Balance.objects.get(user=self.employer).amount, Decimal('-4000.00'))
+
+        # Повторный запуск ничего не выплачивает повторно
+        self.assertEqual(process_pending_payments(batch_size=2), {'completed': 0, 'failed': 0})
+        self.assertEqual(len(FakePayoutGateway.sent), 4)
+
+    def test_claimed_payments_are_not_reclaimed(self):
+        """Тест: выплаты, забранные одним воркером, не достаются другому"""
+        first = claim_pending_payments(3)
+        second = claim_pending_payments(3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(Payment.objects.filter(status='processing').count(), 5)
+
+    def test_failed_payments_grouped_by_reason(self):
+        """Тест: отклоненные выплаты сохраняются одним UPDATE на причину"""
+        FakePayoutGateway.fail_ids = {p.id for p in self.payments}
+        ids = claim_pending_payments(5)
+        payments = list(Payment.objects.filter(id__in=ids).values(
+            'id', 'freelancer_id', 'amount', 'task_id', 'task__employer_id'
+        ))
+        with CaptureQueriesContext(connection) as queries:
+            _settle_payments(payments, FakePayoutGateway().payout(payments))
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Payment.objects.filter(status='failed').count(), 5)
+
+    def test_stuck_processing_payments_are_requeued(self):
+        """Тест: выплата, зависшая в processing, возвращается в очередь"""
+        claim_pending_payments(5)
+        stuck = self.payments[0]
+        Payment.objects.filter(pk=stuck.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(reap_stuck_payments(), 1)
+        self.assertEqual(Payment.objects.get(pk=stuck.pk).status, 'pending')
+        self.assertEqual(Payment.objects.filter(status='processing').count(), 4)
+
+    def test_reaped_payment_settled_once(self):
+        """Тест: выплата, возвращенная в очередь во время обработки, проводится и списывается один раз"""
+        payment = self.payments[0]
+        Payment.objects.exclude(pk=payment.pk).delete()
+        # Первый воркер забрал выплату и завис до ответа шлюза
+        ids = claim_pending_payments(1)
+        in_flight = list(Payment.objects.filter(id__in=ids).values(
+            'id', 'freelancer_id', 'amount', 'task_id', 'task__employer_id'
+        ))
+        for row in in_flight:
+            row['idempotency_key'] = idempotency_key(row['id'])
+        Payment.objects.filter(pk=payment.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(reap_stuck_payments(), 1)
+
+        # Второй воркер забирает и проводит ее
+        self.assertEqual(process_pending_payments(), {'completed': 1, 'failed': 0})
+        # Первый воркер дождался шлюза: тот же ключ - перевода нет, проводки тоже
+        results = FakePayoutGateway().payout(in_flight)
+        self.assertEqual(_settle_payments(in_flight, results), (0, 0))
+
+        self.assertEqual(list(FakePayoutGateway.sent), [payment.id])
+        self.assertEqual(Transaction.objects.filter(transaction_type='payment').count(), 1)
+        self.assertEqual(Balance.objects.get(user=self.employer).amount, Decimal('-1000.00'))
+
+    @override_settings(PAYOUT_GATEWAY=None)
+    def test_gateway_must_be_configured(self):
+        """Тест: без PAYOUT_GATEWAY выплаты не обрабатываются"""
+        with self.assertRaises(ImproperlyConfigured):
+            process_pending_payments()
+        self.assertEqual(Payment.objects.filter(status='pending').count(), 5)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты автоматической оптимизации queryset и бюджета SQL-запросов
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task, Payment
+from backend.mixins import QueryBudgetExceeded
+from backend.views import PaymentViewSet
+
+User = get_user_model()
+
+
+class QueryOptimizationTest(APITestCase):
+    """Тесты QueryOptimizationMixin"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        for i in range(5):
+            task = Task.objects.create(
+                title=f'Task {i}', description='Description', amount=1000,
+                employer=self.employer, freelancer=self.freelancer, status='completed'
+            )
+            Payment.objects.create(task=task, freelancer=self.freelancer, amount=1000)
+        self.client.force_authenticate(user=self.employer)
+
+    def test_payment_list_constant_queries(self):
+        """Тест: список выплат не зависит от числа строк (проба ETag + COUNT + один SELECT с JOIN)"""
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('payment-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 5)
+
+    def test_task_list_constant_queries(self):
+        """Тест: список заданий не делает запрос на каждого пользователя (проба ETag + COUNT + SELECT)"""
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('task-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_query_budget_exceeded(self):
+        """Тест: превышение бюджета запросов бросает исключение"""
+        original_budget = PaymentViewSet.query_budget
+        PaymentViewSet.query_budget = {'list': 1}
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('payment-list'))
+        finally:
+            PaymentViewSet.query_budget = original_budget
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_query_budget_respected(self):
+        """Тест: запрос в пределах бюджета проходит"""
+        response = self.client.get(reverse('payment-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты денормализованного рейтинга исполнителей
+"""
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task, Review, RatingSummary
+
+User = get_user_model()
+
+
+class RatingSummaryTest(APITestCase):
+    """Тесты RatingSummary"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+
+    def _review(self, rating):
+        task = Task.objects.create(
+            title='Task', description='Description', amount=1000,
+            employer=self.employer, freelancer=self.freelancer, status='completed'
+        )
+        return Review.objects.create(task=task, employer=self.employer, freelancer=self.freelancer, rating=rating)
+
+    def test_summary_follows_reviews(self):
+        """Тест: создание, изменение и удаление отзыва обновляют рейтинг"""
+        self._review(5)
+        review = self._review(3)
+        summary = RatingSummary.objects.get(user=self.freelancer)
+        self.assertEqual((summary.count, summary.total, summary.average), (2, 8, 4.0))
+
+        review = Review.objects.get(pk=review.pk)
+        review.rating = 4
+        review.save()
+        summary.refresh_from_db()
+        self.assertEqual(summary.histogram, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+
+        review.delete()
+        summary.refresh_from_db()
+        self.assertEqual((summary.count, summary.total), (1, 5))
+
+    def test_rebuild_command(self):
+        """Тест: команда rebuild_ratings восстанавливает рейтинг по отзывам"""
+        self._review(5)
+        self._review(1)
+        RatingSummary.objects.all().delete()
+
+        call_command('rebuild_ratings', verbosity=0)
+
+        summary = RatingSummary.objects.get(user=self.freelancer)
+        self.assertEqual((summary.count, summary.total, summary.rating_1, summary.rating_5), (2, 6, 1, 1))
+
+    def test_user_list_without_extra_queries(self):
+        """Тест: рейтинг в списке пользователей не добавляет запросов"""
+        self._review(4)
+        self.client.force_authenticate(user=self.employer)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('user-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ratings = {row['id']: row['rating'] for row in response.data['results']}
+        self.assertEqual(ratings[self.freelancer.id]['average'], 4.0)
+        self.assertIsNone(ratings[self.employer.id])
@@ -15,11 +15,13 @@ class ReviewAPITest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.employer = User.objects.create_user(
+            username='employer',
             email='employer@example.com',
             password='pass',
             is_employer=True
         )
         self.freelancer = User.objects.create_user(
+            username='freelancer',
             email='freelancer@example.com',
             password='pass',
             is_freelancer=True
@@ -55,6 +57,7 @@ class ReviewAPITest(APITestCase):
         """Тест: нельзя оставить отзыв на незавершенное задание"""
         task2 = Task.objects.create(
             title='In Progress Task',
+            description='Description',
             employer=self.employer,
             freelancer=self.freelancer,
             amount=1000,
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты дневных сводок и эндпоинта статистики
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task, Payment, Review, EmployerDailyStats, FreelancerDailyStats
+from backend.rollups import update_rollups
+
+User = get_user_model()
+
+
+class RollupTest(APITestCase):
+    """Тесты update_rollups и /api/stats/"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='Description', amount=1000,
+            employer=self.employer, freelancer=self.freelancer, status='completed'
+        )
+        Task.objects.create(title='Draft', description='Description', amount=500, employer=self.employer)
+        Payment.objects.create(
+            task=self.task, freelancer=self.freelancer, amount=1000,
+            status='completed', processed_at=timezone.now()
+        )
+        Payment.objects.create(task=self.task, freelancer=self.freelancer, amount=300, status='pending')
+        Review.objects.create(task=self.task, employer=self.employer, freelancer=self.freelancer, rating=4)
+
+    def test_update_rollups(self):
+        """Тест: дни пересчитываются из источников, учитываются только проведенные выплаты"""
+        update_rollups(until=timezone.now())
+
+        employer_row = EmployerDailyStats.objects.get(employer=self.employer, day=timezone.localdate())
+        self.assertEqual(employer_row.tasks_created, 2)
+        self.assertEqual((employer_row.tasks_draft, employer_row.tasks_completed), (1, 1))
+        self.assertEqual(employer_row.spend, Decimal('1000.00'))
+        self.assertEqual(employer_row.payments_count, 1)
+
+        freelancer_row = FreelancerDailyStats.objects.get(freelancer=self.freelancer)
+        self.assertEqual(freelancer_row.payouts_amount, Decimal('1000.00'))
+        self.assertEqual((freelancer_row.reviews_count, freelancer_row.rating_total), (1, 4))
+
+    def test_incremental_update(self):
+        """Тест: повторный запуск видит только изменения после отметки и не дублирует строки"""
+        update_rollups(until=timezone.now())
+        self.assertEqual(update_rollups(until=timezone.now())['employer_tasks'], 0)
+
+        Task.objects.filter(title='Draft').update(status='cancelled', updated_at=timezone.now())
+        updated = update_rollups(until=timezone.now())
+        self.assertEqual(updated['employer_tasks'], 1)
+        self.assertEqual(updated['freelancer_reviews'], 0)
+
+        self.assertEqual(EmployerDailyStats.objects.count(), 1)
+        row = EmployerDailyStats.objects.get()
+        self.assertEqual((row.tasks_created, row.tasks_draft, row.tasks_cancelled), (2, 0, 1))
+
+    def test_rows_after_until_are_deferred(self):
+        """Тест: строки позже until остаются до следующего запуска"""
+        update_rollups(until=timezone.now() - timedelta(minutes=5))
+        self.assertFalse(EmployerDailyStats.objects.exists())
+        update_rollups(until=timezone.now())
+        self.assertTrue(EmployerDailyStats.objects.exists())
+
+    def test_stats_endpoint(self):
+        """Тест: статистика отдается из сводок за период"""
+        update_rollups(until=timezone.now())
+
+        self.client.force_authenticate(user=self.employer)
+        response = self.client.get(reverse('stats-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('freelancer', response.data)
+        totals = response.data['employer']['totals']
+        self.assertEqual(totals['tasks_created'], 2)
+        self.assertEqual(totals['tasks_by_status']['completed'], 1)
+        self.assertEqual(totals['spend'], Decimal('1000.00'))
+        self.assertEqual(len(response.data['employer']['days']), 1)
+
+        self.client.force_authenticate(user=self.freelancer)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('stats-list'))
+        self.assertEqual(response.data['freelancer']['totals']['average_rating'], 4)
+
+        yesterday = timezone.localdate() - timedelta(days=1)
+        response = self.client.get(reverse('stats-list'), {'date_from': yesterday, 'date_to': yesterday})
+        self.assertEqual(response.data['freelancer']['totals']['payouts_count'], 0)
+        self.assertIsNone(response.data['freelancer']['totals']['average_rating'])
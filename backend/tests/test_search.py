@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты поиска по заданиям
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from backend.models import Task
+
+User = get_user_model()
+
+
+class TaskSearchTest(APITestCase):
+    """Тесты параметра ?q= в списке заданий"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        Task.objects.create(
+            title='Дизайн логотипа', description='Нужен логотип для кофейни',
+            amount=1000, employer=self.employer, status='new'
+        )
+        Task.objects.create(
+            title='Верстка лендинга', description='Адаптивная верстка',
+            amount=2000, employer=self.employer, status='new'
+        )
+        self.client.force_authenticate(user=self.freelancer)
+
+    def test_search_filters_tasks(self):
+        """Тест: поиск возвращает только подходящие задания"""
+        response = self.client.get(reverse('task-list'), {'q': 'верстка'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Верстка лендинга'])
+
+    def test_empty_query_returns_all(self):
+        """Тест: пустой запрос не фильтрует"""
+        response = self.client.get(reverse('task-list'), {'q': ' '})
+        self.assertEqual(response.data['count'], 2)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты подписи договоров и актов: пакетная подпись и входящие на подпись
+"""
+import shutil
+import tempfile
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.document_storage import render_act, render_contract
+from backend.models import Task, Contract, Act, Signature, Payment
+
+User = get_user_model()
+
+
+class BulkSignTest(APITestCase):
+    """Тесты эндпоинта sign_documents"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.url = reverse('task-sign-documents')
+        self.client.force_authenticate(user=self.freelancer)
+
+    def _task_with_documents(self, number, with_act=False):
+        task = Task.objects.create(
+            title=f'Task {number}', description='Description', amount=1000 + number,
+            employer=self.employer, freelancer=self.freelancer, status='in_progress'
+        )
+        contract = Contract(
+            task=task, contract_number=f'C-{number}', employer=self.employer, freelancer=self.freelancer,
+            contract_date=date(2024, 1, 10), work_description='Работы', amount=task.amount,
+            deadline=date(2024, 2, 10), status='pending_signature'
+        )
+        render_contract(contract)
+        contract.save()
+        if with_act:
+            act = Act(
+                task=task, contract=contract, act_number=f'A-{number}', act_date=date(2024, 2, 10),
+                work_performed='Работы выполнены', amount=task.amount, status='pending_signature'
+            )
+            render_act(act)
+            act.save()
+        return task
+
+    def test_sign_batch(self):
+        """Тест: договоры и акты подписываются одним запросом, по актам создаются выплаты"""
+        tasks = [self._task_with_documents(i, with_act=i < 3) for i in range(5)]
+        response = self.client.post(self.url, {
+            'contracts': [task.id for task in tasks],
+            'acts': [task.id for task in tasks[:3]],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['contracts'][tasks[0].id], {'status': 'signed'})
+        self.assertEqual(Contract.objects.filter(status='signed').count(), 5)
+        self.assertEqual(Act.objects.filter(status='signed').count(), 3)
+        self.assertEqual(Signature.objects.filter(user=self.freelancer).count(), 8)
+        self.assertEqual(
+            sorted(Payment.objects.values_list('amount', flat=True)),
+            sorted(task.amount for task in tasks[:3])
+        )
+        signature = Signature.objects.get(document_type='act', document_id=tasks[0].act.id)
+        self.assertTrue(signature.matches(tasks[0].act))
+
+    def test_invalid_documents_reported(self):
+        """Тест: неподходящие документы возвращаются с ошибкой, остальные подписываются"""
+        task = self._task_with_documents(1)
+        no_act = self._task_with_documents(2)
+        stranger = User.objects.create_user(
+            username='stranger', email='stranger@example.com', password='pass', is_employer=True
+        )
+        foreign = Task.objects.create(
+            title='Foreign', description='Description', amount=100, employer=stranger, status='new'
+        )
+
+        response = self.client.post(self.url, {
+            'contracts': [task.id, foreign.id], 'acts': [no_act.id]
+        }, format='json')
+
+        self.assertEqual(response.data['contracts'][task.id], {'status': 'signed'})
+        self.assertEqual(response.data['contracts'][foreign.id], {'error': 'no contract'})
+        self.assertEqual(response.data['acts'][no_act.id], {'error': 'no act'})
+
+        response = self.client.post(self.url, {'contracts': [task.id]}, format='json')
+        self.assertEqual(response.data['contracts'][task.id], {'error': 'invalid status'})
+        self.assertEqual(Signature.objects.count(), 1)
+
+    def test_queries_do_not_grow(self):
+        """Тест: число запросов не зависит от размера пачки"""
+        small = [self._task_with_documents(i, with_act=True) for i in range(2)]
+        large = [self._task_with_documents(i, with_act=True) for i in range(10, 20)]
+
+        def count_queries(tasks):
+            ids = [task.id for task in tasks]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, {'contracts': ids, 'acts': ids}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.assertEqual(count_queries(small), count_queries(large))
+
+    def test_integrity_checked_without_reading_files(self):
+        """Тест: пакетная подпись сверяет хэш с именем файла, не читая PDF"""
+        task = self._task_with_documents(1)
+        mismatched = self._task_with_documents(2)
+        Contract.objects.filter(task=mismatched).update(pdf_sha256='0' * 64)
+
+        with patch('backend.document_storage.file_sha256', side_effect=AssertionError('file read')):
+            response = self.client.post(self.url, {'contracts': [task.id, mismatched.id]}, format='json')
+
+        self.assertEqual(response.data['contracts'][task.id], {'status': 'signed'})
+        self.assertEqual(response.data['contracts'][mismatched.id], {'error': 'document integrity check failed'})
+
+    def test_empty_request(self):
+        """Тест: пустой запрос отклоняется"""
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SignatureInboxTest(APITestCase):
+    """Тесты списка документов, ожидающих подписи"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.contracts = []
+        for i in range(3):
+            task = Task.objects.create(
+                title=f'Task {i}', description='Description', amount=1000,
+                employer=self.employer, freelancer=self.freelancer, status='in_progress'
+            )
+            contract = Contract.objects.create(
+                task=task, contract_number=f'C-{i}', employer=self.employer, freelancer=self.freelancer,
+                contract_date=date(2024, 1, 10), work_description='Работы', amount=1000,
+                deadline=date(2024, 2, 10), status='pending_signature'
+            )
+            self.contracts.append(contract)
+        self.act = Act.objects.create(
+            task=self.contracts[0].task, contract=self.contracts[0], act_number='A-0',
+            act_date=date(2024, 2, 10), work_performed='Работы', amount=1000, status='pending_signature'
+        )
+        Contract.objects.filter(pk=self.contracts[2].pk).update(status='signed')
+        self.url = reverse('task-awaiting-signature')
+
+    def test_inbox_lists_unsigned_documents(self):
+        """Тест: документы, подписанные пользователем или не ожидающие подписи, не попадают в список"""
+        Signature.objects.create(
+            user=self.freelancer, document_type='contract', document_id=self.contracts[1].id,
+            signature_data='signed'
+        )
+        self.client.force_authenticate(user=self.freelancer)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['contracts']], [self.contracts[0].id])
+        self.assertEqual(response.data['contracts'][0]['counterparty']['id'], self.employer.id)
+        self.assertEqual(response.data['acts'][0]['contract_number'], 'C-0')
+
+        self.client.force_authenticate(user=self.employer)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['contracts']), 2)
+        self.assertEqual(response.data['acts'][0]['counterparty']['id'], self.freelancer.id)
+
+    def test_stranger_sees_nothing(self):
+        """Тест: чужие документы не видны"""
+        stranger = User.objects.create_user(
+            username='stranger', email='stranger@example.com', password='pass', is_freelancer=True
+        )
+        self.client.force_authenticate(user=stranger)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, {'contracts': [], 'acts': []})
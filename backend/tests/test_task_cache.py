@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты кэша списка и деталей заданий
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task
+from backend.cache import get_stats
+
+User = get_user_model()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TaskCacheTest(APITestCase):
+    """Тесты TaskCacheMixin и инвалидации по сигналам"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.other_freelancer = User.objects.create_user(
+            username='other', email='other@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='Description', amount=1000, employer=self.employer, status='new'
+        )
+        self.list_url = reverse('task-list')
+
+    def test_second_request_served_from_cache(self):
+        """Тест: повторный запрос не обращается к БД"""
+        self.client.force_authenticate(user=self.employer)
+        self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_stats(), {'hit': 1, 'miss': 1})
+
+    def test_save_invalidates_list(self):
+        """Тест: изменение задания сбрасывает кэш работодателя"""
+        self.client.force_authenticate(user=self.employer)
+        self.client.get(self.list_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = 'Renamed'
+            self.task.save()
+            # До коммита версия прежняя - параллельный GET не закэширует старые строки под новой
+            self.assertEqual(self.client.get(self.list_url).data['results'][0]['title'], 'Task')
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+
+    def test_market_slice_shared_between_freelancers(self):
+        """Тест: срез маркетплейса общий для всех исполнителей"""
+        self.client.force_authenticate(user=self.freelancer)
+        self.client.get(self.list_url, {'scope': 'market'})
+        self.client.force_authenticate(user=self.other_freelancer)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, {'scope': 'market'})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_assign_removes_task_from_market(self):
+        """Тест: взятое в работу задание пропадает из маркетплейса"""
+        self.client.force_authenticate(user=self.other_freelancer)
+        self.client.get(self.list_url, {'scope': 'market'})
+
+        self.client.force_authenticate(user=self.freelancer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task-assign', args=[self.task.id]))
+
+        self.client.force_authenticate(user=self.other_freelancer)
+        response = self.client.get(self.list_url, {'scope': 'market'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_retrieve_cached_and_invalidated(self):
+        """Тест: детали задания кэшируются и сбрасываются при изменении"""
+        self.client.force_authenticate(user=self.employer)
+        url = reverse('task-detail', args=[self.task.id])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        Task.objects.get(pk=self.task.pk).publish()
+        self.task.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.description = 'Changed'
+            self.task.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data['description'], 'Changed')
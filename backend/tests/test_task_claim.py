@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты атомарного взятия задания в работу
+"""
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task
+
+User = get_user_model()
+
+
+class TaskClaimTest(APITestCase):
+    """Тесты Task.claim и действия assign"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.other_freelancer = User.objects.create_user(
+            username='other', email='other@example.com', password='pass', is_freelancer=True
+        )
+        self.task = Task.objects.create(
+            title='Task', description='Description', amount=1000, employer=self.employer, status='new'
+        )
+
+    def test_claim_only_once(self):
+        """Тест: второй исполнитель со старой копией задания не перехватывает его"""
+        stale_copy = Task.objects.get(pk=self.task.pk)
+        self.assertTrue(self.task.claim(self.freelancer))
+        self.assertFalse(stale_copy.claim(self.other_freelancer))
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.freelancer, self.freelancer)
+        self.assertEqual(self.task.status, 'in_progress')
+
+    def test_assign_api(self):
+        """Тест: assign - один SELECT и один условный UPDATE"""
+        self.client.force_authenticate(user=self.freelancer)
+        url = reverse('task-assign', args=[self.task.id])
+        with self.assertNumQueries(2):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=self.other_freelancer)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты массового создания заданий из шаблона и импорта из CSV
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend.models import Task, TaskTemplate
+
+User = get_user_model()
+
+
+class BulkTaskCreationTest(APITestCase):
+    """Тесты create_tasks и import_csv"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.template = TaskTemplate.objects.create(
+            employer=self.employer, name='Курьер', title='Доставка документов',
+            description='Забрать и доставить пакет', default_amount=Decimal('1500.00')
+        )
+        self.client.force_authenticate(user=self.employer)
+
+    def test_create_tasks_from_template(self):
+        """Тест: N заданий создаются одним INSERT с данными шаблона"""
+        url = reverse('task-template-create-tasks', args=[self.template.id])
+        with patch('backend.task_import.Task.objects.bulk_create',
+                   wraps=Task.objects.bulk_create) as bulk_create:
+            response = self.client.post(url, {'count': 25}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 25)
+        bulk_create.assert_called_once()
+        tasks = Task.objects.filter(template=self.template)
+        self.assertEqual(tasks.count(), 25)
+        self.assertEqual(set(tasks.values_list('amount', flat=True)), {Decimal('1500.00')})
+        self.assertEqual(set(tasks.values_list('status', flat=True)), {'draft'})
+
+    def test_create_tasks_limits(self):
+        """Тест: количество ограничено, чужой шаблон недоступен"""
+        url = reverse('task-template-create-tasks', args=[self.template.id])
+        response = self.client.post(url, {'count': 501}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = User.objects.create_user(
+            username='other', email='other@example.com', password='pass', is_employer=True
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.post(url, {'count': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_created_tasks_visible_in_cached_list(self):
+        """Тест: bulk_create сбрасывает кэш списка заданий, хотя сигналы не вызываются"""
+        list_url = reverse('task-list')
+        self.assertEqual(self.client.get(list_url).data['count'], 0)
+        self.client.post(reverse('task-template-create-tasks', args=[self.template.id]),
+                         {'count': 3}, format='json')
+        self.assertEqual(self.client.get(list_url).data['count'], 3)
+
+    def test_import_csv(self):
+        """Тест: валидные строки вставляются пачками, ошибки возвращаются по номерам строк"""
+        lines = ['title,description,amount,deadline']
+        for i in range(1200):
+            lines.append(f'Задание {i},Описание {i},{1000 + i},')
+        lines.append('Без суммы,Описание,,')
+        lines.append('Плохая сумма,Описание,abc,')
+        upload = SimpleUploadedFile('tasks.csv', '\n'.join(lines).encode('utf-8'), content_type='text/csv')
+
+        with patch('backend.task_import.Task.objects.bulk_create',
+                   wraps=Task.objects.bulk_create) as bulk_create:
+            response = self.client.post(reverse('task-import-csv'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['rows'], 1202)
+        self.assertEqual(response.data['created'], 1200)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [1202, 1203])
+        self.assertIn('amount', response.data['errors'][0]['errors'])
+        self.assertGreater(response.data['rows_per_sec'], 0)
+        # 1200 строк пачками по 500
+        self.assertEqual(bulk_create.call_count, 3)
+        self.assertEqual(Task.objects.filter(employer=self.employer).count(), 1200)
+
+    def test_import_csv_with_template_defaults(self):
+        """Тест: пустые колонки заполняются из шаблона"""
+        content = 'title,amount\nСрочная доставка,\n,2500\n'.encode('utf-8-sig')
+        upload = SimpleUploadedFile('tasks.csv', content, content_type='text/csv')
+        response = self.client.post(
+            reverse('task-import-csv'), {'file': upload, 'template_id': self.template.id}, format='multipart'
+        )
+
+        self.assertEqual(response.data['created'], 2)
+        first, second = Task.objects.order_by('id')
+        self.assertEqual((first.title, first.amount), ('Срочная доставка', Decimal('1500.00')))
+        self.assertEqual((second.title, second.amount), ('Доставка документов', Decimal('2500.00')))
+        self.assertEqual(second.description, self.template.description)
@@ -5,10 +5,11 @@
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from tasks.models import Task, TaskTemplate
+from backend.models import Task, TaskTemplate
 
 User = get_user_model()
 
@@ -18,13 +19,22 @@ class TaskModelTest(TestCase):
 
     def setUp(self):
         self.employer = User.objects.create_user(
+            username='employer',
             email='employer@example.com',
             password='pass',
             is_employer=True
         )
+        self.freelancer = User.objects.create_user(
+            username='freelancer',
+            email='freelancer@example.com',
+            password='pass',
+            is_freelancer=True
+        )
         self.template = TaskTemplate.objects.create(
+            name='Тестовый шаблон',
             title='Тестовый шаблон',
-            description='Описание'
+            description='Описание',
+            employer=self.employer
         )
 
     def test_task_creation(self):
@@ -32,7 +42,7 @@ class TaskModelTest(TestCase):
         task = Task.objects.create(
             title='Новое задание',
             description='Нужно сделать X',
-            budget=5000,
+            amount=5000,
             employer=self.employer,
             status='draft'
         )
@@ -44,18 +54,19 @@ class TaskModelTest(TestCase):
         """Тест переходов статусов"""
         task = Task.objects.create(
             title='Задание',
+            description='Описание',
+            amount=1000,
             employer=self.employer,
             status='draft'
         )
         
         # Публикация
-        task.status = 'published'
-        task.save()
-        self.assertEqual(task.status, 'published')
+        self.assertTrue(task.publish())
+        self.assertEqual(task.status, 'new')
         
         # В работу
-        task.status = 'in_progress'
-        task.save()
+        self.assertTrue(task.claim(self.freelancer))
+        task.refresh_from_db()
         self.assertEqual(task.status, 'in_progress')
 
 
@@ -63,13 +74,16 @@ class TaskAPITest(APITestCase):
     """Тесты API заданий"""
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.employer = User.objects.create_user(
+            username='boss',
             email='boss@example.com',
             password='pass',
             is_employer=True
         )
         self.freelancer = User.objects.create_user(
+            username='worker',
             email='worker@example.com',
             password='pass',
             is_freelancer=True
@@ -82,8 +96,7 @@ class TaskAPITest(APITestCase):
         data = {
             'title': 'API Task',
             'description': 'Description',
-            'budget': 10000,
-            'status': 'draft'
+            'amount': 10000
         }
         response = self.client.post(self.list_url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -91,26 +104,26 @@ class TaskAPITest(APITestCase):
 
     def test_get_task_list(self):
         """Тест получения списка заданий"""
-        Task.objects.create(title='T1', employer=self.employer, status='published')
-        Task.objects.create(title='T2', employer=self.employer, status='published')
+        Task.objects.create(title='T1', description='D', amount=100, employer=self.employer, status='new')
+        Task.objects.create(title='T2', description='D', amount=100, employer=self.employer, status='new')
         
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
     def test_publish_task_action(self):
         """Тест кастомного действия публикации"""
-        task = Task.objects.create(title='Draft', employer=self.employer, status='draft')
+        task = Task.objects.create(title='Draft', description='D', amount=100, employer=self.employer, status='draft')
         url = reverse('task-publish', args=[task.id])
         
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         task.refresh_from_db()
-        self.assertEqual(task.status, 'published')
+        self.assertEqual(task.status, 'new')
 
     def test_freelancer_cannot_create_task(self):
         """Тест: исполнитель не может создавать задания"""
         self.client.force_authenticate(user=self.freelancer)
-        data = {'title': 'Fail'}
+        data = {'title': 'Fail', 'description': 'D', 'amount': 100}
         response = self.client.post(self.list_url, data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
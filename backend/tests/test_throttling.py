@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты token bucket для тяжелых действий заданий
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from backend import throttling
+from backend.models import Task
+
+User = get_user_model()
+
+BUCKETS = {'assign': {'rate': '1/hour', 'burst': 2}}
+
+
+@override_settings(THROTTLE_BUCKETS=BUCKETS)
+class TokenBucketThrottleTest(APITestCase):
+    """Тесты TokenBucketThrottle на assign"""
+
+    def setUp(self):
+        throttling.get_buckets().clear()
+        self.client = APIClient()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.freelancer = User.objects.create_user(
+            username='freelancer', email='freelancer@example.com', password='pass', is_freelancer=True
+        )
+        self.tasks = [
+            Task.objects.create(title=f'Task {i}', description='D', amount=100, employer=self.employer, status='new')
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.freelancer)
+
+    def _assign(self, task):
+        return self.client.post(reverse('task-assign', args=[task.id]))
+
+    def test_burst_then_rejected(self):
+        """Тест: после burst запросов - 429 с Retry-After и счетчиком отказов"""
+        self.assertEqual(self._assign(self.tasks[0]).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._assign(self.tasks[1]).status_code, status.HTTP_200_OK)
+
+        response = self._assign(self.tasks[2])
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(throttling.get_rejections(), {'assign': 1})
+        self.assertEqual(Task.objects.filter(freelancer=self.freelancer).count(), 2)
+
+    def test_buckets_per_user_and_scope(self):
+        """Тест: у каждого пользователя свое ведро, действия без лимита не ограничены"""
+        for task in self.tasks[:2]:
+            self._assign(task)
+
+        other = User.objects.create_user(
+            username='other', email='other@example.com', password='pass', is_freelancer=True
+        )
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self._assign(self.tasks[2]).status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=self.employer)
+        for _ in range(3):
+            response = self.client.post(reverse('task-publish', args=[self.tasks[0].id]))
+            self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_throttle_stats(self):
+        """Тест: счетчики отказов доступны администратору"""
+        for task in self.tasks:
+            self._assign(task)
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pass')
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(reverse('task-throttle-stats'))
+        self.assertEqual(response.data, {'assign': 1})
+
+    def test_backend_error_allows_request(self):
+        """Тест: ошибка Redis не блокирует запрос"""
+        with patch.object(throttling.LocalBuckets, 'consume', side_effect=throttling.redis.ConnectionError):
+            self.assertEqual(self._assign(self.tasks[0]).status_code, status.HTTP_200_OK)
+
+
+class LocalBucketsTest(SimpleTestCase):
+    """Тесты пополнения ведра"""
+
+    def test_refill(self):
+        """Тест: токены возвращаются со скоростью rate, но не выше capacity"""
+        buckets = throttling.LocalBuckets()
+        with patch('backend.throttling.time.monotonic', return_value=100.0):
+            self.assertEqual(buckets.consume('key', 'scope', 1, 0.5), (True, 0))
+            allowed, wait = buckets.consume('key', 'scope', 1, 0.5)
+            self.assertFalse(allowed)
+            self.assertEqual(wait, 2.0)
+        with patch('backend.throttling.time.monotonic', return_value=102.0):
+            self.assertTrue(buckets.consume('key', 'scope', 1, 0.5)[0])
+        with patch('backend.throttling.time.monotonic', return_value=1000.0):
+            self.assertTrue(buckets.consume('key', 'scope', 1, 0.5)[0])
+            self.assertFalse(buckets.consume('key', 'scope', 1, 0.5)[0])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты черного списка refresh-токенов в Redis
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import TokenError
+from backend.tests.utils import reset_auth_state
+from backend.token_blacklist import RefreshToken, _cache, _jti_key, _user_key
+
+User = get_user_model()
+
+
+class TokenBlacklistTest(APITestCase):
+    """Тесты ротации, выхода и переноса черного списка"""
+
+    def setUp(self):
+        reset_auth_state()
+        self.addCleanup(reset_auth_state)
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass', is_employer=True
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def _refresh(self, token):
+        return self.client.post(reverse('token-refresh'), {'refresh': str(token)}, format='json')
+
+    def test_rotated_token_is_single_use(self):
+        """Тест: после ротации старый refresh отклоняется, новый работает"""
+        response = self._refresh(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('refresh', response.data)
+
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._refresh(response.data['refresh']).status_code, status.HTTP_200_OK)
+
+    def test_logout(self):
+        """Тест: logout кладет jti в Redis, токен больше не обновляется"""
+        self.client.post(reverse('token-logout'), {'refresh': str(self.refresh)}, format='json')
+        key = _jti_key(self.refresh['jti'])
+        self.assertIsNotNone(_cache().get(key))
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_all(self):
+        """Тест: выход везде отзывает все refresh- и access-токены пользователя"""
+        other_device = RefreshToken.for_user(self.user)
+        access = self.refresh.access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get(reverse('transaction-balance')).status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse('token-logout-all'))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.client.get(reverse('transaction-balance')).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        for token in (self.refresh, other_device):
+            self.assertEqual(self._refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+        with self.assertRaises(TokenError):
+            RefreshToken(str(other_device))
+
+    def test_token_from_same_second_as_revocation_rejected(self):
+        """Тест: токен, выпущенный в ту же секунду, что и "выйти везде", отклоняется; со следующей - нет"""
+        token = str(RefreshToken.for_user(self.user))
+        iat = RefreshToken(token)['iat']
+        _cache().set(_user_key(self.user.pk), iat)
+        with self.assertRaises(TokenError):
+            RefreshToken(token)
+        _cache().set(_user_key(self.user.pk), iat - 1)
+        RefreshToken(token)
+
+    def test_import_from_db_tables(self):
+        """Тест: команда переносит неистекшие токены из таблиц token_blacklist"""
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE token_blacklist_outstandingtoken '
+                           '(id integer PRIMARY KEY, jti varchar(255), expires_at timestamp)')
+            cursor.execute('CREATE TABLE token_blacklist_blacklistedtoken (id integer PRIMARY KEY, token_id integer)')
+            expires = timezone.now().replace(tzinfo=None)
+            cursor.execute(
+                'INSERT INTO token_blacklist_outstandingtoken VALUES (1, %s, %s), (2, %s, %s)',
+                [self.refresh['jti'], expires + timedelta(days=1), 'expired', expires - timedelta(days=1)]
+            )
+            cursor.execute('INSERT INTO token_blacklist_blacklistedtoken VALUES (1, 1), (2, 2)')
+
+        out = StringIO()
+        call_command('import_token_blacklist', '--drop-tables', stdout=out)
+        self.assertIn('перенесено в Redis: 1', out.getvalue())
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertNotIn('token_blacklist_blacklistedtoken', connection.introspection.table_names())
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Общие помощники тестов
+"""
+from django.conf import settings
+from django.core.cache import caches
+from backend.authentication import _local
+
+
+def reset_auth_state():
+    """id пользователей в тестовой БД переиспользуются - кэш пользователей и отметки отзыва не должны переживать тест"""
+    caches['default'].clear()
+    caches[settings.TOKEN_BLACKLIST_CACHE].clear()
+    _local.clear()
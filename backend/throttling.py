@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+
+# Token bucket для тяжелых действий (assign, генерация PDF, подписание).
+# Ведро на пару (scope, пользователь): вмещает burst запросов и пополняется
+# со скоростью rate. Списание - один EVALSHA в Redis: скрипт атомарно
+# пополняет ведро по времени сервера Redis, списывает токен и при отказе
+# увеличивает счетчик отказов scope. Без Redis (тесты, локальный запуск)
+# те же ведра живут в памяти процесса.
+KEY_PREFIX = 'throttle'
+REJECTED_KEY = f'{KEY_PREFIX}:rejected'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+    redis.call('HINCRBY', KEYS[2], ARGV[3], 1)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(wait)}
+"""
+
+
+def parse_rate(rate):
+    """'10/min' -> токенов в секунду и число запросов за период"""
+    num, period = rate.split('/')
+    num = int(num)
+    return num / PERIODS[period[0]], num
+
+
+def get_bucket(scope):
+    """(capacity, токенов в секунду) для scope или None, если scope не ограничен"""
+    config = getattr(settings, 'THROTTLE_BUCKETS', {}).get(scope)
+    if not config:
+        return None
+    rate, num = parse_rate(config['rate'])
+    return config.get('burst', num), rate
+
+
+class RedisBuckets:
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.1)
+        self.script = self.client.register_script(TOKEN_BUCKET_LUA)
+
+    def consume(self, key, scope, capacity, rate):
+        allowed, wait = self.script(keys=[key, REJECTED_KEY], args=[capacity, rate, scope])
+        return bool(allowed), float(wait)
+
+    def rejections(self):
+        return {scope.decode(): int(count) for scope, count in self.client.hgetall(REJECTED_KEY).items()}
+
+
+class LocalBuckets:
+    """Те же ведра в памяти процесса"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.rejected = {}
+
+    def consume(self, key, scope, capacity, rate):
+        with self.lock:
+            now = time.monotonic()
+            tokens, ts = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - ts) * rate)
+            if tokens >= 1:
+                self.buckets[key] = (tokens - 1, now)
+                return True, 0
+            self.buckets[key] = (tokens, now)
+            self.rejected[scope] = self.rejected.get(scope, 0) + 1
+            return False, (1 - tokens) / rate
+
+    def rejections(self):
+        with self.lock:
+            return dict(self.rejected)
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+            self.rejected.clear()
+
+
+_buckets = None
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        url = getattr(settings, 'THROTTLE_REDIS_URL', None)
+        _buckets = RedisBuckets(url) if url else LocalBuckets()
+    return _buckets
+
+
+def get_rejections():
+    """Число отклоненных запросов по scope"""
+    return get_buckets().rejections()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение по throttle_scope действия (@action(..., throttle_scope='sign')).
+    Параметры scope - в settings.THROTTLE_BUCKETS; действия без scope не ограничиваются.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        bucket = get_bucket(self.scope) if self.scope else None
+        if bucket is None:
+            return True
+
+        ident = request.user.pk if request.user.is_authenticated else self.get_ident(request)
+        key = f'{KEY_PREFIX}:{self.scope}:{ident}'
+        try:
+            allowed, self.wait_seconds = get_buckets().consume(key, self.scope, *bucket)
+        except redis.RedisError:
+            # Недоступный Redis не должен останавливать API
+            logger.exception('Throttle backend error, request allowed')
+            return True
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,115 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Черный список refresh-токенов в Redis вместо таблиц token_blacklist.
+# Отозванный jti хранится ровно до exp самого токена - дальше токен все равно
+# невалиден, поэтому список не растет. "Выйти везде" - одна запись на
+# пользователя: токены, выпущенные не позже этой отметки, отклоняются.
+#
+# Кэш TOKEN_BLACKLIST_CACHE не должен вытеснять ключи (maxmemory-policy
+# noeviction): вытесненный ключ - снова действующий токен.
+KEY_PREFIX = 'jwt'
+
+
+def _cache():
+    return caches[getattr(settings, 'TOKEN_BLACKLIST_CACHE', 'default')]
+
+
+def _jti_key(jti):
+    return f'{KEY_PREFIX}:blacklist:{jti}'
+
+
+def _user_key(user_id):
+    return f'{KEY_PREFIX}:revoked_before:{user_id}'
+
+
+def blacklist_jti(jti, exp):
+    """
+    Отзывает токен до exp (unix-время). Возвращает False, если токен уже был
+    отозван - атомарно (SET NX), поэтому refresh-токен ротируется ровно один раз.
+    """
+    timeout = int(exp - time.time())
+    if timeout <= 0:
+        return True
+    return _cache().add(_jti_key(jti), 1, timeout)
+
+
+def revoke_user_tokens(user_id):
+    """Отзывает все токены пользователя, выпущенные до текущего момента"""
+    from .authentication import invalidate_users
+
+    revoked_before = int(time.time())
+    lifetime = max(api_settings.REFRESH_TOKEN_LIFETIME, api_settings.ACCESS_TOKEN_LIFETIME)
+    _cache().set(_user_key(user_id), revoked_before, int(lifetime.total_seconds()))
+    # Отметка читается вместе с пользователем в CachedJWTAuthentication
+    invalidate_users(user_id)
+    return revoked_before
+
+
+def get_revoked_before(user_id):
+    return _cache().get(_user_key(user_id))
+
+
+def is_revoked(iat, revoked_before):
+    """
+    Выпущен ли токен не позже "выйти везде". iat в simplejwt - целые секунды,
+    поэтому токен, выпущенный в ту же секунду, что и отзыв, нельзя отнести ни
+    к "до", ни к "после" - он отклоняется намеренно: лучше повторный вход,
+    чем уцелевший после отзыва токен.
+    """
+    return revoked_before is not None and iat <= revoked_before
+
+
+def check_payload(payload):
+    """TokenError, если токен отозван сам по себе или вместе со всеми токенами пользователя"""
+    jti_key = _jti_key(payload[api_settings.JTI_CLAIM])
+    user_key = _user_key(payload.get(api_settings.USER_ID_CLAIM))
+    values = _cache().get_many([jti_key, user_key])
+    if jti_key in values:
+        raise TokenError(_('Token is blacklisted'))
+    if is_revoked(payload.get('iat', 0), values.get(user_key)):
+        raise TokenError(_('Token is blacklisted'))
+
+
+class RedisBlacklistMixin:
+    """Замена BlacklistMixin из simplejwt: проверка и отзыв через Redis"""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        check_payload(self.payload)
+
+    def blacklist(self):
+        return blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+
+
+class RefreshToken(RedisBlacklistMixin, tokens.RefreshToken):
+    pass
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Параллельный запрос с тем же токеном проиграет на SET NX
+            if api_settings.BLACKLIST_AFTER_ROTATION and not refresh.blacklist():
+                raise TokenError(_('Token is blacklisted'))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class TokenBlacklistSerializer(serializers.TokenBlacklistSerializer):
+    token_class = RefreshToken
@@ -1,12 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenBlacklistView, TokenRefreshView
 from .views import (
     TaskViewSet,
     TaskTemplateViewSet,
     DocumentViewSet,
     PaymentViewSet,
     TransactionViewSet,
-    ReviewViewSet
+    ReviewViewSet,
+    StatsViewSet,
+    RevokeSessionsView
 )
 
 # Создаем router для автоматической генерации URL
@@ -17,13 +20,22 @@ router.register(r'documents', DocumentViewSet, basename='document')
 router.register(r'payments', PaymentViewSet, basename='payment')
 router.register(r'transactions', TransactionViewSet, basename='transaction')
 router.register(r'reviews', ReviewViewSet, basename='review')
+router.register(r'stats', StatsViewSet, basename='stats')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('auth/logout/', TokenBlacklistView.as_view(), name='token-logout'),
+    path('auth/logout-all/', RevokeSessionsView.as_view(), name='token-logout-all'),
 ]
 
 # Доступные API endpoints:
 # GET   /api/tasks/            - Список заданий
+# GET   /api/tasks/?cursor=    - Лента заданий с keyset-пагинацией (count=false - без COUNT)
+# GET   /api/tasks/?q=текст    - Полнотекстовый поиск по заголовку и описанию (с page, не с cursor)
+# GET   /api/tasks/?scope=market - Только открытые задания (scope=mine - только свои)
+# GET   /api/tasks/cache_stats/ - Счетчики кэша заданий (для администраторов)
+# GET   /api/tasks/throttle_stats/ - Отказы ограничителя assign/generate_*/sign_* (для администраторов)
 # POST  /api/tasks/            - Создать задание (черновик)
 # GET   /api/tasks/{id}/       - Детали задания
 # PUT   /api/tasks/{id}/       - Обновить задание
@@ -32,20 +44,40 @@ urlpatterns = [
 # POST  /api/tasks/{id}/publish/  - Опубликовать задание
 # POST  /api/tasks/{id}/assign/   - Взять задание в работу
 # POST  /api/tasks/{id}/complete/ - Завершить задание
+# POST  /api/tasks/{id}/generate_contract/ - Сформировать договор (202, фоновая задача)
+# POST  /api/tasks/generate_contracts/     - Массовое формирование договоров по task_ids
+# POST  /api/tasks/import_csv/             - Импорт заданий из CSV (file, template_id)
+# POST  /api/tasks/{id}/generate_act/      - Сформировать акт (202, фоновая задача)
+# GET   /api/tasks/{id}/documents_status/  - Статус формирования договора и акта
+# GET   /api/tasks/{id}/download_contract/ - Скачать PDF договора (Range, ETag)
+# GET   /api/tasks/{id}/download_act/      - Скачать PDF акта
+# GET   /api/tasks/awaiting_signature/     - Договоры и акты, ожидающие моей подписи
+# POST  /api/tasks/sign_documents/         - Пакетная подпись договоров и актов по task_id
 #
 # GET   /api/task-templates/   - Список шаблонов
 # POST  /api/task-templates/   - Создать шаблон
 # GET   /api/task-templates/{id}/ - Детали шаблона
 # PUT   /api/task-templates/{id}/ - Обновить шаблон
 # DELETE /api/task-templates/{id}/ - Удалить шаблон
+# POST  /api/task-templates/{id}/create_tasks/ - Создать N заданий по шаблону
 #
 # GET   /api/documents/        - Список документов
 # GET   /api/documents/{id}/   - Детали документа
+# GET   /api/documents/{id}/download/ - Скачать файл документа
 #
 # GET   /api/payments/         - Список выплат
 # GET   /api/payments/{id}/    - Детали выплаты
+# GET   /api/payments/export/?file_format=csv|xlsx&date_from=&date_to=&status= - Выгрузка выплат
 #
 # GET   /api/transactions/     - История транзакций
+# GET   /api/transactions/balance/ - Текущий баланс (снимок)
+# GET   /api/transactions/export/ - Выгрузка транзакций (параметры как у выплат)
 #
 # GET   /api/reviews/          - Список отзывов
 # POST  /api/reviews/          - Оставить отзыв
+#
+# GET   /api/stats/?date_from=&date_to= - Дневная статистика из сводок (по умолчанию 30 дней)
+#
+# POST  /api/auth/token/refresh/ - Новый access (и новый refresh - старый отзывается)
+# POST  /api/auth/logout/      - Отозвать refresh-токен
+# POST  /api/auth/logout-all/  - Отозвать все токены пользователя
@@ -1,13 +1,37 @@
 from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.reverse import reverse
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.views import APIView
+from datetime import timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-from .pdf_generator import PDFGenerator
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from .mixins import QueryOptimizationMixin
+from .db_router import ReplicaReadMixin
+from .conditional import ConditionalGetMixin
+from .cache import (
+    TaskCacheMixin, bump as bump_task_cache, get_stats as get_task_cache_stats, user_scope, validators_key
+)
+from .signals import invalidate_task_cache
+from .search import search_tasks
+from .rollups import employer_stats, freelancer_stats
+from .pagination import TaskFeedPagination
+from .permissions import IsTaskParticipant
+from .downloads import serve_document
+from .exports import PAYMENT_COLUMNS, TRANSACTION_COLUMNS, export_response, filter_period
+from .document_storage import has_content_name, is_intact
+from .task_import import create_from_template, import_csv
+from .token_blacklist import revoke_user_tokens
+from .throttling import TokenBucketThrottle, get_rejections as get_throttle_rejections
+from .tasks import can_regenerate, enqueue_contract_generation, enqueue_act_generation, enqueue_contract_batch
 
 from .models import (
     Task, TaskTemplate, Document, Payment, Contract, Act, 
-    Signature, Transaction, Review
+    Signature, Transaction, Review, Balance
 )
 from .serializers import (
     TaskListSerializer,
@@ -15,20 +39,43 @@ from .serializers import (
     TaskCreateSerializer,
     TaskUpdateSerializer,
     TaskTemplateSerializer,
+    BulkTaskFromTemplateSerializer,
+    TaskImportSerializer,
+    ExportParamsSerializer,
+    PeriodSerializer,
+    BulkContractSerializer,
+    BulkSignSerializer,
+    ContractInboxSerializer,
+    ActInboxSerializer,
     DocumentSerializer,
     PaymentSerializer,
     TransactionSerializer,
     ReviewSerializer
 )
 
-class TaskTemplateViewSet(viewsets.ModelViewSet):
+class TaskTemplateViewSet(ReplicaReadMixin, QueryOptimizationMixin, viewsets.ModelViewSet):
     serializer_class = TaskTemplateSerializer
     permission_classes = [IsAuthenticated]
     def get_queryset(self):
         return TaskTemplate.objects.filter(employer=self.request.user)
 
-class TaskViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'])
+    def create_tasks(self, request, pk=None):
+        """Создать {"count": N} черновиков по шаблону одним bulk_create"""
+        template = self.get_object()
+        serializer = BulkTaskFromTemplateSerializer(data=request.data, context={'template': template})
+        serializer.is_valid(raise_exception=True)
+        tasks = create_from_template(template, **serializer.validated_data)
+        return Response({'created': len(tasks), 'ids': [task.id for task in tasks]},
+                        status=status.HTTP_201_CREATED)
+
+class TaskViewSet(ReplicaReadMixin, ConditionalGetMixin, TaskCacheMixin, QueryOptimizationMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskFeedPagination
+    query_budget = {'list': 4, 'retrieve': 4}
+    # Лимиты действий с throttle_scope - settings.THROTTLE_BUCKETS
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = None
     def get_serializer_class(self):
         if self.action == 'list': return TaskListSerializer
         if self.action == 'create': return TaskCreateSerializer
@@ -37,8 +84,56 @@ class TaskViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_employer: return Task.objects.filter(employer=user)
+        # scope=market - только открытые задания (общий кэш для всех исполнителей), scope=mine - свои
+        scope = self.request.query_params.get('scope')
+        if scope == 'market': return Task.objects.filter(status='new')
+        if scope == 'mine': return Task.objects.filter(freelancer=user)
         return Task.objects.filter(Q(freelancer=user) | Q(status='new'))
 
+    def should_probe(self, request):
+        # В keyset-режиме с count=false клиент отказался от COUNT(*) - проба стоила бы столько же
+        paginator = self.paginator
+        return not (paginator.cursor_query_param in request.query_params
+                    and not paginator.include_count(request))
+
+    def get_validators_cache_key(self, request):
+        # Версии кэша заданий меняются при любом изменении - проба нужна только на промахе
+        pk = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return validators_key(request, pk)
+
+    def create(self, request, *args, **kwargs):
+        if not request.user.is_employer: return Response({'error': '403'}, status=status.HTTP_403_FORBIDDEN)
+        return super().create(request, *args, **kwargs)
+
+    def get_keyset_branches(self, queryset):
+        # Лента исполнителя по умолчанию - OR двух условий, которому не соответствует
+        # ни один индекс; в keyset-режиме каждая ветка читается по своему индексу
+        user = self.request.user
+        if user.is_employer or self.request.query_params.get('scope'):
+            return [queryset]
+        return [queryset.filter(freelancer=user), queryset.filter(status='new')]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # ?q= - полнотекстовый поиск с сортировкой по релевантности
+        text = self.request.query_params.get('q', '').strip()
+        if self.action == 'list' and text:
+            if self.paginator.cursor_query_param in self.request.query_params:
+                # Keyset-курсор задает порядок по дате и потерял бы сортировку по релевантности
+                raise serializers.ValidationError({'cursor': 'Поиск q постраничный: используйте page вместо cursor'})
+            queryset = search_tasks(queryset, text)
+        return queryset
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """Счетчики попаданий/промахов кэша списка и деталей заданий"""
+        return Response(get_task_cache_stats())
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def throttle_stats(self, request):
+        """Число запросов, отклоненных ограничителем, по scope"""
+        return Response(get_throttle_rejections())
+
     @action(detail=True, methods=['post'])
     def publish(self, request, pk=None):
         task = self.get_object()
@@ -46,14 +141,13 @@ class TaskViewSet(viewsets.ModelViewSet):
         if task.publish(): return Response({'status': 'published'})
         return Response({'error': '400'}, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_scope='assign')
     def assign(self, request, pk=None):
         task = self.get_object()
         if not request.user.is_freelancer: return Response({'error': '403'}, status=status.HTTP_403_FORBIDDEN)
-        if task.status != 'new': return Response({'error': 'taken'}, status=status.HTTP_400_BAD_REQUEST)
-        task.freelancer = request.user
-        task.status = 'in_progress'
-        task.save()
+        if not task.claim(request.user): return Response({'error': 'taken'}, status=status.HTTP_400_BAD_REQUEST)
+        # update() не вызывает post_save - сбрасываем кэш явно
+        invalidate_task_cache(Task, task)
         return Response({'status': 'assigned'})
 
     @action(detail=True, methods=['post'])
@@ -65,48 +159,170 @@ class TaskViewSet(viewsets.ModelViewSet):
         task.save()
         return Response({'status': 'completed'})
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_scope='generate')
     def generate_contract(self, request, pk=None):
         task = self.get_object()
-        if task.employer != request.user or hasattr(task, 'contract') or not task.freelancer:
+        if task.employer != request.user or not task.freelancer:
             return Response({'error': 'invalid'}, status=status.HTTP_400_BAD_REQUEST)
+        if hasattr(task, 'contract'):
+            # Повторный запуск - после ошибки формирования или если воркер пропал
+            if not can_regenerate(task.contract):
+                return Response({'error': 'invalid'}, status=status.HTTP_400_BAD_REQUEST)
+            contract = task.contract
+        else:
+            contract = self._build_contract(task)
+            contract.save()
+        job_id = enqueue_contract_generation(contract)
+        return Response(
+            {'status': contract.status, 'job_id': job_id, 'contract_id': contract.id},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=False, methods=['post'])
+    def import_csv(self, request):
+        """Импорт заданий из CSV (multipart: file, template_id) с отчетом по строкам"""
+        if not request.user.is_employer:
+            return Response({'error': 'only employers can import tasks'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = TaskImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        template = None
+        template_id = serializer.validated_data.get('template_id')
+        if template_id:
+            template = get_object_or_404(TaskTemplate, id=template_id, employer=request.user)
+        report = import_csv(serializer.validated_data['file'], request.user, template)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'], throttle_scope='generate')
+    def generate_contracts(self, request):
+        """Массовое формирование договоров: {"task_ids": [...]} -> результат по каждому заданию"""
+        serializer = BulkContractSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task_ids = list(dict.fromkeys(serializer.validated_data['task_ids']))
+
+        results = {}
+        contracts = []
+        with transaction.atomic():
+            # Задания блокируются: параллельный запрос с теми же task_ids ждет коммита и
+            # видит уже созданные договоры, а не падает на уникальности Contract.task
+            tasks = self.get_queryset().filter(id__in=task_ids).select_for_update(of=('self',))
+            tasks = {task.id: task for task in tasks}
+            # Отдельный запрос после блокировки - снимок с договорами параллельного запроса
+            taken = set(Contract.objects.filter(task_id__in=tasks).values_list('task_id', flat=True))
+
+            for task_id in task_ids:
+                task = tasks.get(task_id)
+                if task is None or task.employer_id != request.user.id:
+                    results[task_id] = {'error': 'not found'}
+                elif task_id in taken:
+                    results[task_id] = {'error': 'contract exists'}
+                elif not task.freelancer_id:
+                    results[task_id] = {'error': 'no freelancer'}
+                else:
+                    contracts.append(self._build_contract(task))
+
+            enqueue_contract_batch(contracts)
+
+        for contract in contracts:
+            results[contract.task_id] = {
+                'status': contract.status,
+                'contract_id': contract.id,
+                'job_id': contract.generation_task_id,
+            }
+        # Ничего не создано, потому что договоры уже есть - конфликт, а не принятая задача
+        conflict = not contracts and bool(taken)
+        return Response(
+            {'results': results},
+            status=status.HTTP_409_CONFLICT if conflict else status.HTTP_202_ACCEPTED
+        )
+
+    def _build_contract(self, task):
+        """Новый (несохраненный) договор по заданию"""
         from datetime import date, timedelta
-        contract = Contract.objects.create(
-            task=task, contract_number=f'C-{task.id}', employer=task.employer,
-            freelancer=task.freelancer, contract_date=date.today(),
+        return Contract(
+            task=task, contract_number=f'C-{task.id}', employer_id=task.employer_id,
+            freelancer_id=task.freelancer_id, contract_date=date.today(),
             work_description=task.description, amount=task.amount,
             deadline=date.today() + timedelta(days=7)
         )
-        pdf_gen = PDFGenerator()
-        contract.pdf_file = pdf_gen.generate_contract(contract)
-        contract.status = 'pending_signature'
-        contract.save()
-        return Response({'status': 'generated'})
-          @action(detail=True, methods=['post'])
+
+    @action(detail=True, methods=['post'], throttle_scope='generate')
     def generate_act(self, request, pk=None):
         task = self.get_object()
-        if task.employer != request.user or hasattr(task, 'act') or task.status != 'completed':
+        if task.employer != request.user or task.status != 'completed':
             return Response({'error': 'invalid'}, status=status.HTTP_400_BAD_REQUEST)
         
         if not hasattr(task, 'contract') or task.contract.status != 'signed':
             return Response({'error': 'contract not signed'}, status=status.HTTP_400_BAD_REQUEST)
 
-        from datetime import date
-        act = Act.objects.create(
-            task=task,
-            contract=task.contract,
-            act_number=f'A-{task.id}',
-            act_date=date.today(),
-            work_performed=task.description,
-            amount=task.amount
+        if hasattr(task, 'act'):
+            if not can_regenerate(task.act):
+                return Response({'error': 'invalid'}, status=status.HTTP_400_BAD_REQUEST)
+            act = task.act
+        else:
+            from datetime import date
+            act = Act.objects.create(
+                task=task,
+                contract=task.contract,
+                act_number=f'A-{task.id}',
+                act_date=date.today(),
+                work_performed=task.description,
+                amount=task.amount
+            )
+        job_id = enqueue_act_generation(act)
+        return Response(
+            {'status': act.status, 'job_id': job_id, 'act_id': act.id},
+            status=status.HTTP_202_ACCEPTED
         )
-        pdf_gen = PDFGenerator()
-        act.pdf_file = pdf_gen.generate_act(act)
-        act.status = 'pending_signature'
-        act.save()
-        return Response({'status': 'generated'})
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['get'])
+    def documents_status(self, request, pk=None):
+        """Статус фонового формирования договора и акта"""
+        task = self.get_object()
+
+        def describe(document, download_view):
+            if document is None:
+                return None
+            # /media/ закрыт (X-Accel-Redirect) - файл отдается через эндпоинт скачивания
+            download_url = reverse(download_view, args=[task.pk], request=request)
+            return {
+                'id': document.id,
+                'status': document.status,
+                'job_id': document.generation_task_id or None,
+                'error': document.generation_error or None,
+                'pdf_file': download_url if document.pdf_file else None,
+                'sha256': document.pdf_sha256 or None,
+            }
+
+        return Response({
+            'contract': describe(getattr(task, 'contract', None), 'task-download-contract'),
+            'act': describe(getattr(task, 'act', None), 'task-download-act'),
+        })
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, IsTaskParticipant])
+    def download_contract(self, request, pk=None):
+        """Скачать PDF договора (Range, ETag; в продакшене отдает nginx)"""
+        contract = get_object_or_404(Contract, task=self.get_object())
+        return serve_document(request, contract.pdf_file, f'contract_{contract.contract_number}.pdf',
+                              contract.pdf_sha256)
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, IsTaskParticipant])
+    def download_act(self, request, pk=None):
+        """Скачать PDF акта"""
+        act = get_object_or_404(Act, task=self.get_object())
+        return serve_document(request, act.pdf_file, f'act_{act.act_number}.pdf', act.pdf_sha256)
+
+    @action(detail=False, methods=['get'])
+    def awaiting_signature(self, request):
+        """Договоры и акты, которые текущий пользователь еще не подписал"""
+        context = self.get_serializer_context()
+        contracts = Contract.objects.awaiting_signature(request.user)
+        acts = Act.objects.awaiting_signature(request.user)
+        return Response({
+            'contracts': ContractInboxSerializer(contracts, many=True, context=context).data,
+            'acts': ActInboxSerializer(acts, many=True, context=context).data,
+        })
+
+    @action(detail=True, methods=['post'], throttle_scope='sign')
     def sign_contract(self, request, pk=None):
         task = self.get_object()
         if not hasattr(task, 'contract'):
@@ -115,12 +331,15 @@ class TaskViewSet(viewsets.ModelViewSet):
         contract = task.contract
         if contract.status != 'pending_signature':
             return Response({'error': 'invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        if not is_intact(contract):
+            return Response({'error': 'document integrity check failed'}, status=status.HTTP_409_CONFLICT)
         
         Signature.objects.create(
             user=request.user,
             document_type='contract',
             document_id=contract.id,
-            signature_data=f"Signed by {request.user.email} at {date.today()}",
+            document_sha256=contract.pdf_sha256,
+            signature_data=f"Signed by {request.user.email} at {timezone.localdate()} sha256={contract.pdf_sha256}",
             ip_address=request.META.get('REMOTE_ADDR')
         )
         
@@ -128,7 +347,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         contract.save()
         return Response({'status': 'signed'})
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_scope='sign')
     def sign_act(self, request, pk=None):
         task = self.get_object()
         if not hasattr(task, 'act'):
@@ -137,12 +356,15 @@ class TaskViewSet(viewsets.ModelViewSet):
         act = task.act
         if act.status != 'pending_signature':
             return Response({'error': 'invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        if not is_intact(act):
+            return Response({'error': 'document integrity check failed'}, status=status.HTTP_409_CONFLICT)
         
         Signature.objects.create(
             user=request.user,
             document_type='act',
             document_id=act.id,
-            signature_data=f"Signed by {request.user.email} at {date.today()}",
+            document_sha256=act.pdf_sha256,
+            signature_data=f"Signed by {request.user.email} at {timezone.localdate()} sha256={act.pdf_sha256}",
             ip_address=request.META.get('REMOTE_ADDR')
         )
         
@@ -158,36 +380,195 @@ class TaskViewSet(viewsets.ModelViewSet):
         
         return Response({'status': 'signed'})
 
+    @action(detail=False, methods=['post'], throttle_scope='sign')
+    def sign_documents(self, request):
+        """
+        Пакетная подпись: {"contracts": [task_id, ...], "acts": [task_id, ...]}.
+        Документы проверяются одним запросом, подписи, смена статусов и выплаты
+        по актам пишутся пачками в одной транзакции.
+        """
+        serializer = BulkSignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        requested = {
+            'contract': list(dict.fromkeys(serializer.validated_data['contracts'])),
+            'act': list(dict.fromkeys(serializer.validated_data['acts'])),
+        }
+
+        user = request.user
+        tasks = (
+            Task.objects.filter(id__in=set(requested['contract']) | set(requested['act']))
+            .filter(Q(employer=user) | Q(freelancer=user))
+            .select_related('contract', 'act')
+        )
+        tasks = {task.id: task for task in tasks}
+
+        results = {'contract': {}, 'act': {}}
+        to_sign = {'contract': [], 'act': []}
+        for document_type, task_ids in requested.items():
+            for task_id in task_ids:
+                task = tasks.get(task_id)
+                document = getattr(task, document_type, None) if task else None
+                if document is None:
+                    results[document_type][task_id] = {'error': f'no {document_type}'}
+                elif document.status != 'pending_signature':
+                    results[document_type][task_id] = {'error': 'invalid status'}
+                # Без чтения файлов: в пачке может быть до тысячи PDF
+                elif not has_content_name(document):
+                    results[document_type][task_id] = {'error': 'document integrity check failed'}
+                else:
+                    to_sign[document_type].append((task, document))
+
+        signed_at = timezone.localdate()
+        signatures = [
+            Signature(
+                user=user, document_type=document_type, document_id=document.id,
+                document_sha256=document.pdf_sha256,
+                signature_data=f"Signed by {user.email} at {signed_at} sha256={document.pdf_sha256}",
+                ip_address=request.META.get('REMOTE_ADDR')
+            )
+            for document_type, documents in to_sign.items()
+            for task, document in documents
+        ]
+        payments = [
+            Payment(task=task, freelancer_id=task.freelancer_id, amount=task.amount, status='pending')
+            for task, act in to_sign['act']
+        ]
+
+        try:
+            with transaction.atomic():
+                # unique_together (user, document_type, document_id) не дает подписать дважды
+                Signature.objects.bulk_create(signatures)
+                now = timezone.now()
+                for model, document_type in ((Contract, 'contract'), (Act, 'act')):
+                    ids = [document.id for task, document in to_sign[document_type]]
+                    if not ids:
+                        continue
+                    updated = model.objects.filter(id__in=ids, status='pending_signature').update(
+                        status='signed', updated_at=now
+                    )
+                    # Кто-то успел подписать или изменить документ параллельно
+                    if updated != len(ids):
+                        raise IntegrityError('document status changed concurrently')
+                Payment.objects.bulk_create(payments)
+        except IntegrityError:
+            return Response({'error': 'documents were signed concurrently, retry'},
+                            status=status.HTTP_409_CONFLICT)
+
+        # update()/bulk_create не вызывают сигналы - сбрасываем кэш заданий вручную
+        bump_task_cache(*{
+            user_scope(user_id)
+            for documents in to_sign.values() for task, document in documents
+            for user_id in (task.employer_id, task.freelancer_id) if user_id
+        })
+        for document_type, documents in to_sign.items():
+            for task, document in documents:
+                results[document_type][task.id] = {'status': 'signed'}
+        return Response({'contracts': results['contract'], 'acts': results['act']})
 
-class DocumentViewSet(viewsets.ReadOnlyModelViewSet):
+
+class DocumentViewSet(ReplicaReadMixin, QueryOptimizationMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = DocumentSerializer
     permission_classes = [IsAuthenticated]
     def get_queryset(self):
         user = self.request.user
         return Document.objects.filter(Q(task__employer=user) | Q(task__freelancer=user))
 
-class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, IsTaskParticipant])
+    def download(self, request, pk=None):
+        """Скачать файл документа"""
+        return serve_document(request, self.get_object().file)
+
+class PaymentViewSet(ReplicaReadMixin, ConditionalGetMixin, QueryOptimizationMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    # В выплате вложено задание - его изменения тоже меняют ETag
+    conditional_fields = ('updated_at', 'task__updated_at')
+    query_budget = {'list': 4, 'retrieve': 4}
     def get_queryset(self):
         user = self.request.user
         if user.is_employer: return Payment.objects.filter(task__employer=user)
         return Payment.objects.filter(freelancer=user)
 
-class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Выгрузка выплат в CSV/XLSX потоком; персонал выгружает все выплаты"""
+        params = ExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        file_format = params.validated_data.pop('file_format')
+        queryset = Payment.objects.all() if request.user.is_staff else self.get_queryset()
+        queryset = filter_period(queryset, **params.validated_data)
+        return export_response(queryset, PAYMENT_COLUMNS, file_format, 'payments')
+
+class TransactionViewSet(ReplicaReadMixin, ConditionalGetMixin, QueryOptimizationMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    # Статус транзакции меняется только вместе с processed_at
+    conditional_fields = ('created_at', 'processed_at')
     def get_queryset(self):
         return Transaction.objects.filter(user=self.request.user)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Выгрузка транзакций в CSV/XLSX потоком; персонал выгружает все транзакции"""
+        params = ExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        file_format = params.validated_data.pop('file_format')
+        queryset = Transaction.objects.all() if request.user.is_staff else self.get_queryset()
+        queryset = filter_period(queryset, **params.validated_data)
+        return export_response(queryset, TRANSACTION_COLUMNS, file_format, 'transactions')
+
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        """Текущий баланс из снимка Balance, без суммирования транзакций"""
+        snapshot = Balance.objects.filter(user=request.user).values_list('amount', 'updated_at').first()
+        amount, updated_at = snapshot or (Decimal('0.00'), None)
+        return Response({'balance': amount, 'updated_at': updated_at})
+
+class ReviewViewSet(ReplicaReadMixin, ConditionalGetMixin, QueryOptimizationMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'list': 4, 'retrieve': 4}
     def get_queryset(self):
         user = self.request.user
         return Review.objects.filter(Q(employer=user) | Q(freelancer=user))
     def perform_create(self, serializer):
         task = serializer.validated_data.get('task')
         if task.status != 'completed' or task.employer != self.request.user:
-            raise serializers.ValidationError(\"Invalid task or user\")
-        serializer.save()
+            raise serializers.ValidationError('Invalid task or user')
+        # RatingSummary обновляется сигналом в той же транзакции
+        with transaction.atomic():
+            serializer.save()
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+
+
+class StatsViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """Статистика для дашбордов; читает только дневные сводки (backend.rollups)"""
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        params = PeriodSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        date_to = params.validated_data.get('date_to') or timezone.localdate()
+        date_from = params.validated_data.get('date_from') or date_to - timedelta(days=29)
+
+        user = request.user
+        data = {'date_from': date_from, 'date_to': date_to}
+        if user.is_employer:
+            data['employer'] = employer_stats(user, date_from, date_to)
+        if user.is_freelancer:
+            data['freelancer'] = freelancer_stats(user, date_from, date_to)
+        return Response(data)
+
+
+class RevokeSessionsView(APIView):
+    """Выйти на всех устройствах: отзывает все refresh- и access-токены пользователя"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        revoke_user_tokens(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
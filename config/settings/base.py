@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-change-me-in-production')
@@ -17,15 +19,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third party
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
     'drf_spectacular',
     'django_filters',
+    'django_celery_beat',
     
     # Local apps
     'users',
+    'backend',
 ]
 
 MIDDLEWARE = [
@@ -60,6 +65,18 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
+# Соединения с PostgreSQL (DB_CONNECTION_MODE, замер - manage.py benchmark_db_connections):
+#   persistent - воркер держит соединение DB_CONN_MAX_AGE секунд (по умолчанию 60)
+#                и перед повторным использованием проверяет его (CONN_HEALTH_CHECKS);
+#   pooler     - за PgBouncer с pool_mode=transaction: соединение с пулером закрывается
+#                после запроса, серверные курсоры отключены - между транзакциями сессия
+#                PostgreSQL может смениться. Состояние сессии (SET, advisory locks)
+#                код не использует; часовой пояс роли должен быть UTC
+#                (ALTER ROLE ... SET timezone TO 'UTC'), иначе Django выполнит SET TIME ZONE.
+DB_CONNECTION_MODE = os.getenv('DB_CONNECTION_MODE', 'persistent')
+if DB_CONNECTION_MODE not in ('persistent', 'pooler'):
+    raise ImproperlyConfigured(f'Неизвестный DB_CONNECTION_MODE: {DB_CONNECTION_MODE}')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -68,9 +85,33 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.getenv('POSTGRES_HOST', 'db'),
         'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0 if DB_CONNECTION_MODE == 'pooler' else 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': DB_CONNECTION_MODE == 'pooler',
     }
 }
 
+# Реплики для чтения (backend.db_router): POSTGRES_REPLICA_HOSTS=host1:5432,host2.
+# Безопасные запросы API читают со случайной реплики; для локальной проверки
+# можно указать хост основной базы - получится второй алиас той же базы.
+DATABASE_REPLICAS = []
+for index, address in enumerate(filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['backend.db_router.PrimaryReplicaRouter']
+# Сколько секунд после изменения данных пользователь читает с основной базы
+# (больше типичного отставания реплики)
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', 5))
+
+AUTH_USER_MODEL = 'users.User'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -92,12 +133,19 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Скачивание документов: при заданном префиксе байты отдает nginx через
+# X-Accel-Redirect (internal-локация в frontend/nginx.conf), без него - Django
+DOCUMENT_ACCEL_PREFIX = os.getenv('DOCUMENT_ACCEL_PREFIX', '')
+# Через сколько секунд документ в статусе generating считается зависшим (воркер упал):
+# его можно сформировать заново, а backend.tasks.reap_stalled_generations помечает ошибкой
+DOCUMENT_GENERATION_TIMEOUT = 15 * 60
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'backend.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -108,6 +156,51 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+# Cache: Redis, если задан CACHE_REDIS_URL (docker-compose), иначе локальный кэш процесса
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Черный список JWT: отдельный Redis (или база) с maxmemory-policy noeviction -
+# вытесненная запись означает снова действующий токен
+TOKEN_BLACKLIST_REDIS_URL = os.getenv('TOKEN_BLACKLIST_REDIS_URL', CACHE_REDIS_URL)
+if TOKEN_BLACKLIST_REDIS_URL:
+    CACHES['tokens'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': TOKEN_BLACKLIST_REDIS_URL,
+        'TIMEOUT': None,
+    }
+    TOKEN_BLACKLIST_CACHE = 'tokens'
+else:
+    TOKEN_BLACKLIST_CACHE = 'default'
+# TTL ответов TaskViewSet.list/retrieve (инвалидация по сигналам, TTL - страховка
+# для массовых update() в админке, которые сигналы не вызывают)
+TASK_CACHE_TIMEOUT = 300
+
+# Token bucket для тяжелых действий заданий (backend.throttling): на пользователя и scope
+# действия; rate - пополнение ведра, burst - его емкость. Без Redis - ведра в памяти процесса.
+THROTTLE_REDIS_URL = os.getenv('THROTTLE_REDIS_URL', CACHE_REDIS_URL)
+THROTTLE_BUCKETS = {
+    'assign': {'rate': '30/min', 'burst': 10},
+    'generate': {'rate': '10/min', 'burst': 5},
+    'sign': {'rate': '60/min', 'burst': 20},
+}
+
+# Бюджет SQL-запросов на один API-запрос (см. backend.mixins.QueryOptimizationMixin).
+# При превышении бросается QueryBudgetExceeded - включать в разработке и тестах.
+QUERY_BUDGET_ENFORCE = os.getenv('QUERY_BUDGET_ENFORCE', 'False') == 'True'
+QUERY_BUDGET_DEFAULT = None
+
 # JWT Settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -115,7 +208,14 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    # Черный список в Redis вместо таблиц token_blacklist (backend.token_blacklist)
+    'TOKEN_REFRESH_SERIALIZER': 'backend.token_blacklist.TokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'backend.token_blacklist.TokenBlacklistSerializer',
 }
+# Кэш пользователя из токена (backend.authentication.CachedJWTAuthentication):
+# в Redis и в памяти процесса. Локальный TTL - задержка деактивации в других воркерах.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+AUTH_USER_LOCAL_TIMEOUT = int(os.getenv('AUTH_USER_LOCAL_TIMEOUT', 5))
 
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://redis:6379/0')
@@ -124,6 +224,37 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Периодические задачи (celery beat с DatabaseScheduler загружает их в БД при старте)
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-balances': {
+        'task': 'backend.tasks.reconcile_balances',
+        'schedule': timedelta(hours=1),
+    },
+    'process-pending-payments': {
+        'task': 'backend.tasks.process_pending_payments',
+        'schedule': timedelta(minutes=1),
+    },
+    'update-daily-rollups': {
+        'task': 'backend.tasks.update_daily_rollups',
+        'schedule': timedelta(minutes=5),
+    },
+    'reap-stalled-generations': {
+        'task': 'backend.tasks.reap_stalled_generations',
+        'schedule': timedelta(minutes=5),
+    },
+    'reap-stuck-payments': {
+        'task': 'backend.tasks.reap_stuck_payments',
+        'schedule': timedelta(minutes=5),
+    },
+}
+
+# Выплаты исполнителям (backend.tasks.process_pending_payments)
+# Шлюз по умолчанию не задан: без PAYOUT_GATEWAY выплаты не обрабатываются
+# (ImproperlyConfigured), тестовый шлюз подключается только в development/test
+PAYOUT_GATEWAY = os.getenv('PAYOUT_GATEWAY')
+PAYOUT_BATCH_SIZE = 100
+# Выплата дольше этого в processing (воркер упал) возвращается в очередь
+PAYOUT_PROCESSING_TIMEOUT = 15 * 60
 
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [x.strip() for x in os.getenv('CORS_ALLOWED_ORIGINS', '').split(',') if x.strip()]
@@ -20,6 +20,13 @@ MIDDLEWARE += [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Выплаты уходят в тестовый шлюз
+PAYOUT_GATEWAY = 'backend.payouts.FakePayoutGateway'
+
+# Падать на N+1 в разработке
+QUERY_BUDGET_ENFORCE = True
+QUERY_BUDGET_DEFAULT = 10
+
 # Debug toolbar settings
 INTERNAL_IPS = ['127.0.0.1', 'localhost']
 
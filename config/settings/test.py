@@ -0,0 +1,20 @@
+import tempfile
+
+from .base import *
+
+# Тесты: pytest (pytest.ini) или python manage.py test --settings=config.settings.test.
+# База и кэш в памяти процесса, Redis и PostgreSQL не нужны.
+DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+DATABASE_REPLICAS = []
+
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+TOKEN_BLACKLIST_CACHE = 'default'
+THROTTLE_REDIS_URL = None
+
+# Файлы документов из тестов не попадают в рабочий MEDIA_ROOT
+MEDIA_ROOT = tempfile.mkdtemp(prefix='konsol-test-media-')
+
+PAYOUT_GATEWAY = 'backend.payouts.FakePayoutGateway'
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
@@ -1,16 +1,17 @@
 from django.contrib import admin
-from django.urls import path, include, redirect
+from django.urls import path, include
+from django.views.generic import RedirectView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-        path('', redirect, {'url': '/api/schema/'}, name='root'),
+    path('', RedirectView.as_view(url='/api/docs/'), name='root'),
 
-    
     # API Schema
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     
     # Apps
     path('api/users/', include('users.urls')),
+    path('api/', include('backend.urls')),
 ]
@@ -36,8 +36,12 @@ api.interceptors.response.use(
           refresh: refreshToken,
         });
 
-        const { access } = response.data;
+        const { access, refresh } = response.data;
         localStorage.setItem('token', access);
+        // Refresh-токены ротируются: старый после использования отозван
+        if (refresh) {
+          localStorage.setItem('refreshToken', refresh);
+        }
 
         originalRequest.headers.Authorization = `Bearer ${access}`;
         return api(originalRequest);
@@ -1,8 +1,12 @@
 from rest_framework import serializers
+from backend.serializers import RatingSummarySerializer
 from .models import User
 
 class UserSerializer(serializers.ModelSerializer):
+    # Денормализованный рейтинг: JOIN через select_related, без агрегатов по отзывам
+    rating = RatingSummarySerializer(source='rating_summary', read_only=True)
+
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'phone', 'telegram_id', 'is_freelancer', 'is_employer']
+        fields = ['id', 'username', 'email', 'phone', 'telegram_id', 'is_freelancer', 'is_employer', 'rating']
         read_only_fields = ['id']
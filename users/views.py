@@ -1,7 +1,8 @@
 from rest_framework import viewsets
+from backend.mixins import QueryOptimizationMixin
 from .models import User
 from .serializers import UserSerializer
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(QueryOptimizationMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer